@@ -0,0 +1,750 @@
+#!/usr/bin/python
+# Filename: benchmark.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Werkstatt Python Benchmarks
+Measure hot paths of the Werkstatt python scripts
+
+Usage: benchmark.py [name] [iterations]
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Add jsonPath benchmark
+20261018      Orchestrator          Add project config benchmark
+20261018      Orchestrator          Add secret store benchmark
+20261018      Orchestrator          Add import time benchmark with budget
+20261018      Orchestrator          Add streaming csv report benchmark
+20261018      Orchestrator          Add job log tokenizer benchmark
+20261018      Orchestrator          Add alert transform golden corpus check
+20261018      Orchestrator          Add BHOM event mapping benchmark
+20261018      Orchestrator          Add raw Automation API response benchmark
+20261018      Orchestrator          Add Automation API connection pool benchmark
+
+"""
+
+# Fix module import issues
+import sys
+import os
+import json
+import time
+import tempfile
+import subprocess
+import statistics
+import tracemalloc
+import re
+import threading
+import concurrent.futures
+import http.server
+
+# handle dev environment vs. production
+try:
+    import w3rkstatt as w3rkstatt
+except:
+    # fix import issues for modules
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    from src import w3rkstatt as w3rkstatt
+
+from jsonpath_ng.ext import parse
+
+_iterations = 2000
+# ms, cold import of the alert entry point
+_importBudget = 250
+_importRuns = 5
+_alertCorpus = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            "samples", "ctm_alerts_golden.json")
+_aapiResponses = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                              "samples", "ctm_aapi_responses.json")
+_aapiAgents = 5000
+# concurrent requests of the connection pool benchmark
+_poolWorkers = 16
+
+
+def timeIt(func, iterations):
+    '''
+    Measure the average cost of a call
+
+    :param function func: function without arguments
+    :param int iterations: number of calls
+    :return: microseconds per call
+    :rtype: float
+    '''
+    start = time.perf_counter()
+    for i in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1000000
+
+
+def printResult(name, before, after):
+    '''
+    Print one benchmark result line
+
+    :param str name: benchmark case
+    :param float before: microseconds per call before
+    :param float after: microseconds per call after
+    '''
+    if after > 0:
+        speedup = before / after
+    else:
+        speedup = 0
+    print(f"{name:<48} {before:>12.2f} {after:>12.2f} {speedup:>8.1f}x")
+
+
+def printHeader(title):
+    '''
+    Print a benchmark table header
+
+    :param str title: benchmark name
+    '''
+    print(title)
+    print(f"{'case':<48} {'before us':>12} {'after us':>12} {'speedup':>9}")
+
+
+def benchJsonPath(iterations):
+    '''
+    Per call cost of getJsonValue, uncached parse vs. compiled cache
+
+    :param int iterations: number of calls per case
+    '''
+    jData = {
+        "DEFAULT": {
+            "log_folder": "/opt/w3rkstatt/logs",
+            "config_folder": "/opt/w3rkstatt/configs",
+            "loglevel": "INFO"
+        },
+        "CTM": {
+            "host":
+            "ctm-em",
+            "datacenter": [{
+                "name": "dc" + str(i),
+                "host": "ctm-srv-" + str(i)
+            } for i in range(10)] + [{
+                "name": "x",
+                "host": "ctm-srv-x"
+            }]
+        }
+    }
+    paths = [
+        "$.CTM.datacenter[?(@.name=='x')].host", "$.DEFAULT.*",
+        "$.DEFAULT.log_folder"
+    ]
+
+    def uncached(path):
+        match = parse(path).find(jData)
+        try:
+            return match[0].value
+        except:
+            return ""
+
+    printHeader("jsonPath: getJsonValue")
+    for path in paths:
+        assert uncached(path) == w3rkstatt.getJsonValue(path=path, data=jData)
+        before = timeIt(lambda: uncached(path), iterations)
+        after = timeIt(lambda: w3rkstatt.getJsonValue(path=path, data=jData),
+                       iterations)
+        printResult(path, before, after)
+
+
+def benchConfig(iterations):
+    '''
+    Project config, read per module vs. shared typed config
+
+    :param int iterations: number of calls per case
+    '''
+    paths = [
+        "$.DEFAULT.log_folder", "$.CTM.host", "$.CTM.port", "$.CTM.aapi",
+        "$.ITSM.host", "$.ITSM.api_namespace"
+    ]
+
+    def load():
+        jData = w3rkstatt.loadProjectConfig()
+        return [
+            w3rkstatt.getJsonValue(path=path, data=jData) for path in paths
+        ]
+
+    def shared():
+        cfg = w3rkstatt.getConfig()
+        return [
+            cfg.default.log_folder, cfg.ctm.host, cfg.ctm.port, cfg.ctm.aapi,
+            cfg.itsm.host, cfg.itsm.api_namespace
+        ]
+
+    jData = w3rkstatt.getProjectConfig()
+
+    def lookup():
+        return [
+            w3rkstatt.getJsonValue(path=path, data=jData) for path in paths
+        ]
+
+    assert load() == shared()
+    printHeader("config: module import / per alert access")
+    printResult("module import, read config", timeIt(load, iterations),
+                timeIt(shared, iterations))
+    printResult("per alert access", timeIt(lookup, iterations),
+                timeIt(shared, iterations))
+
+
+def benchSecrets(iterations):
+    '''
+    Password decryption, key file and AES per call vs. secret store
+
+    :param int iterations: number of calls per case
+    '''
+    with tempfile.TemporaryDirectory() as folder:
+        sKeyFileName = os.path.join(folder, "benchmark.bin")
+        with open(sKeyFileName, "wb") as keyfile:
+            keyfile.write(os.urandom(16))
+        sPwd = w3rkstatt.encryptPwd(data="benchmark",
+                                    sKeyFileName=sKeyFileName)
+
+        def uncached():
+            key = w3rkstatt.getCryptoKey(sKeyFileName)
+            return w3rkstatt.decryptData(data=sPwd, key=key)
+
+        def cached():
+            return w3rkstatt.decryptPwd(data=sPwd, sKeyFileName=sKeyFileName)
+
+        assert uncached() == cached()
+        printHeader("secrets: decryptPwd")
+        printResult("decrypt password", timeIt(uncached, iterations),
+                    timeIt(cached, iterations))
+        w3rkstatt.getSecretStore().clear()
+
+
+def getPeakMemory(func):
+    '''
+    Peak python memory of a call
+
+    :param function func: function without arguments
+    :return: MB, result of func
+    :rtype: tuple
+    '''
+    tracemalloc.start()
+    try:
+        result = func()
+        size, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1048576, result
+
+
+def benchCsvReport(iterations):
+    '''
+    Report ingestion, pandas csv to json vs. streaming record batches
+
+    :param int iterations: report rows are iterations * 100
+    '''
+    rows = iterations * 100
+    with tempfile.TemporaryDirectory() as folder:
+        csvFile = os.path.join(folder, "report.csv")
+        ndjsonFile = os.path.join(folder, "report.ndjson")
+        with open(csvFile, "w") as report:
+            report.write("JobName,Folder,Host,RunAs,Cyclic,Priority,"
+                         "Critical,MaxWait,Owner,Description\n")
+            for i in range(rows):
+                # every 10th row repeats its predecessor
+                n = i - 1 if i % 10 == 9 else i
+                # bool column, int column with missing values, mixed column
+                maxWait = "NaN" if n % 7 == 0 else str(n % 3)
+                owner = "ctmuser" if n % 11 == 0 else str(n % 4)
+                report.write(f"job{n},folder{n % 50},host{n % 20},ctmuser,"
+                             f"N,{n % 5},{n % 2 == 0},{maxWait},{owner},"
+                             f"\"Job {n}, service model\"\n")
+
+        def pandas():
+            with open(csvFile) as report:
+                data = report.read()
+            return w3rkstatt.convertCsv2Json(data=data, keepDuplicate="last")
+
+        def streaming():
+            return w3rkstatt.writeNdjsonFile(file=ndjsonFile,
+                                             batches=w3rkstatt.iterCsvFile(
+                                                 file=csvFile,
+                                                 keepDuplicate="last"))
+
+        before, pandasJson = getPeakMemory(pandas)
+        after, streamRows = getPeakMemory(streaming)
+        pandasRecords = json.loads(pandasJson)
+        with open(ndjsonFile) as ndjson:
+            streamRecords = [json.loads(line) for line in ndjson]
+        matching = sum(1 for x, y in zip(pandasRecords, streamRecords)
+                       if x == y)
+        status = matching == len(pandasRecords) == streamRows
+        print("csvreport: " + str(rows) + " rows, " + str(streamRows) +
+              " unique, peak memory")
+        print(f"{'case':<48} {'before MB':>12} {'after MB':>12} {'ratio':>9}")
+        printResult("csv report to json", before, after)
+        print(f"{'matching records':<48} {matching:>12}")
+        if not status:
+            print(f"{'pandas records':<48} {len(pandasRecords):>12}")
+    return status
+
+
+def benchJobLog(iterations):
+    '''
+    Job log transform, split per line vs. compiled single pass tokenizer
+
+    :param int iterations: log lines are iterations * 50
+    '''
+    import core_ctm as ctm
+
+    lines = []
+    for i in range(iterations * 50 // 3):
+        run = i + 1
+        lines += [
+            "12:48:07 2-Apr-2021  ORDERED JOB:24; DAILY FORCED, ODATE "
+            "20210402   \t5065",
+            "12:48:08 2-Apr-2021  SUBMITTED TO ctm-agent-1   \t5120",
+            "12:48:09 2-Apr-2021  ENDED AT 20210402124809. OSCOMPSTAT 0. "
+            "RUNCNT " + str(run) + "   \t5100"
+        ]
+    data = "\n".join(lines)
+
+    def split():
+        # previous implementation, several splits per line
+        log_list = []
+        yList = [s.strip() for s in data.splitlines(True) if s.strip("\r\n")]
+        for i, item in enumerate(yList):
+            log_data = {}
+            sTemp = re.split(r'\s{2,}', item)
+            sMessage = sTemp[1].split("\t")[0]
+            sCtmCode = item.split("\t")[1]
+            if sCtmCode == "5100":
+                xTemp = sMessage.split()
+                log_data['oscompstat'] = xTemp[4].replace(".", "")
+                log_data['run_count'] = xTemp[6]
+                log_data['ended'] = ctm.extractCtmAlertDate(
+                    data=xTemp[2].replace(".", ""))
+            log_data['time'] = item.split()[0]
+            log_data['date'] = item.split()[1]
+            log_data['message'] = sMessage
+            log_data['code'] = sCtmCode
+            log_list.append({'entry-' + str(i).zfill(4): log_data})
+        jData = '{"count":' + str(len(log_list)) + ',"status":true,"entries":[' + \
+            json.dumps(log_list) + ']}'
+        return json.loads(jData)
+
+    def tokenizer():
+        return ctm.transformCtmJobLog(data=data)
+
+    assert split() == tokenizer()
+    printHeader("joblog: transformCtmJobLog, " + str(len(lines)) + " lines")
+    printResult("full job log", timeIt(split, 3), timeIt(tokenizer, 3))
+    printResult(
+        "run counter filter, mini job log", timeIt(split, 3),
+        timeIt(
+            lambda: ctm.transformCtmJobLogMini(data=data, runCounter="00042"),
+            3))
+
+
+def benchEvents(iterations):
+    '''
+    BHOM event mapping, reparsed JSON record vs. in-memory record
+
+    :param int iterations: job log lines are iterations * 25
+    '''
+    import core_ctm as ctm
+
+    jCtmAlert = {
+        "severity": "V",
+        "host_id": "ctm-agent-1",
+        "host_ip": "10.0.0.1",
+        "data_center": "ctm-em",
+        "order_id": "0001a",
+        "run_counter": "1",
+        "job_name": "JOB-1",
+        "message_summary": "Job JOB-1 failed",
+        "message_notes": "CTRL-M Job JOB-1 failed."
+    }
+    jJobInfo = {
+        "count":
+        1,
+        "entries": [{
+            "folder": "FOLDER-1",
+            "folder_id": "ctm-em:0001a",
+            "held": False,
+            "type": "Job",
+            "cyclic": False
+        }]
+    }
+    jJobConfig = {"count": 1, "entries": [{"FOLDER-1": {"CreatedBy": "ctm"}}]}
+
+    printHeader("events: transformCtmBHOM, job alert")
+    for lines in (10, iterations * 25):
+        data = {
+            "jobAlert": [jCtmAlert],
+            "jobInfo": [jJobInfo],
+            "jobConfig": [jJobConfig],
+            "jobLog": [{
+                "count":
+                lines,
+                "status":
+                True,
+                "entries": [[{
+                    "entry-" + str(i).zfill(4): {
+                        "time": "12:48:08",
+                        "date": "2-Apr-2021",
+                        "message": "SUBMITTED TO ctm-agent-1",
+                        "code": "5120"
+                    }
+                } for i in range(lines)]]
+            }]
+        }
+        sData = json.dumps(data)
+        assert ctm.transformCtmBHOM(data=sData, category="job") == \
+            ctm.transformCtmBHOM(data=data, category="job")
+        printResult(
+            "job log " + str(lines) + " lines",
+            timeIt(lambda: ctm.transformCtmBHOM(data=sData, category="job"),
+                   10),
+            timeIt(lambda: ctm.transformCtmBHOM(data=data, category="job"),
+                   iterations))
+
+
+def benchAapi(iterations):
+    '''
+    Automation API responses, model str() round trip vs. raw JSON decoding
+
+    :param int iterations: number of decodes
+    :return: raw decoding matches the recorded model results
+    :rtype: bool
+    '''
+    import core_ctm as ctm
+
+    with open(_aapiResponses) as responseFile:
+        responses = json.load(responseFile)
+    jAgents = responses["config/server/{server}/agents"]
+    for key in ["response", "expected"]:
+        lAgents = jAgents[key]["agents"]
+        jAgents[key]["agents"] = [
+            dict(lAgents[i % len(lAgents)],
+                 nodeid="ctm-agent-" + str(i).zfill(5) + ".example.com")
+            for i in range(_aapiAgents)
+        ]
+
+    class Response(object):
+        # RESTResponse as passed to ApiClient.deserialize
+        def __init__(self, body):
+            self.data = body
+
+    def before(body, type):
+        # previous implementation, deserialize, str() and repair to JSON
+        results = str(ctm.ctm.ApiClient().deserialize(Response(body), type))
+        results = results.replace("\n", '')
+        results = results.replace("'", '"')
+        results = results.replace("None", '"None"')
+        return json.loads(results)
+
+    printHeader("aapi: decodeCtmApiResponse, " + str(_aapiAgents) + " agents")
+    status = True
+    for (endpoint, data) in responses.items():
+        if endpoint == "description":
+            continue
+        body = json.dumps(data["response"]).encode()
+        try:
+            model = getattr(ctm.ctm.models, data["type"], None)
+        except ImportError:
+            model = None
+        if model is None:
+            # no generated models, nothing to compare with
+            print(f"{endpoint:<48} {'NO MODEL':>12}")
+            continue
+        if ctm.decodeCtmApiResponse(body, data["type"]) != data["expected"]:
+            print(f"{endpoint:<48} {'DIFFERS':>12}")
+            status = False
+            continue
+        count = max(1, iterations // (len(body) // 1000 + 1))
+        printResult(
+            endpoint, timeIt(lambda: before(body, data["type"]), count),
+            timeIt(lambda: ctm.decodeCtmApiResponse(body, data["type"]),
+                   count))
+    return status
+
+
+class StubAapiHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Stub Automation API, GET config/servers with keep-alive
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = json.dumps([{
+        "name": "ctm-em",
+        "host": "ctm-em.example.com",
+        "state": "Up",
+        "message": "Connected",
+        "version": "9.0.21.000"
+    }]).encode()
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        # server side processing time
+        time.sleep(0.001)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def benchPool(iterations):
+    '''
+    Automation API requests from concurrent workers against a local stub,
+    small default pool vs. pool of CTM.connection
+
+    :param int iterations: number of requests
+    '''
+    import urllib3
+    import core_ctm as ctm
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubAapiHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:" + str(server.server_port) + \
+        "/automation-api/config/servers"
+
+    def run(pool):
+        server.connections = 0
+        with concurrent.futures.ThreadPoolExecutor(_poolWorkers) as workers:
+            start = time.perf_counter()
+            for response in workers.map(lambda i: pool.request("GET", url),
+                                        range(iterations)):
+                assert response.status == 200
+            cost = (time.perf_counter() - start) * 1000000 / iterations
+        pool.clear()
+        return (cost, server.connections)
+
+    options = ctm.getCtmPoolOptions()
+    (before, beforeConnections) = run(urllib3.PoolManager(maxsize=4))
+    (after, afterConnections) = run(
+        urllib3.PoolManager(maxsize=options["maxsize"],
+                            retries=options["retries"],
+                            socket_options=options["socket_options"],
+                            timeout=urllib3.Timeout(
+                                connect=options["timeout"][0],
+                                read=options["timeout"][1])))
+    server.shutdown()
+    server.server_close()
+
+    printHeader("pool: " + str(_poolWorkers) + " workers, " + str(iterations) +
+                " requests, local stub Automation API")
+    printResult("pool 4 vs. pool " + str(options["maxsize"]), before, after)
+    print(f"{'connections opened':<48} {beforeConnections:>12} "
+          f"{afterConnections:>12}")
+
+
+def pinAlertCorpus(ctm, corpus):
+    '''
+    Resolve hosts and data centers from the corpus instead of DNS and config
+
+    :param module ctm: core_ctm
+    :param dict corpus: golden corpus
+    :return: function to restore the original lookups
+    :rtype: function
+    '''
+    saved = (w3rkstatt.getHostIP, w3rkstatt.getHostFqdn,
+             ctm.getCtmDataCenterHost, ctm.jCfgData, ctm.ctm_host,
+             ctm.ctm_port)
+    hosts = corpus["hosts"]
+    datacenters = {
+        datacenter["name"]: datacenter["host"]
+        for datacenter in corpus["config"]["datacenter"]
+    }
+
+    def host(hostname):
+        return hosts.get(str(hostname), {"ip": "", "fqdn": str(hostname)})
+
+    w3rkstatt.getHostIP = lambda hostname: host(hostname)["ip"]
+    w3rkstatt.getHostFqdn = lambda hostname: host(hostname)["fqdn"]
+    ctm.getCtmDataCenterHost = lambda name: datacenters.get(str(name), "")
+    ctm.jCfgData = {"CTM": {"datacenter": corpus["config"]["datacenter"]}}
+    ctm.ctm_host = corpus["config"]["host"]
+    ctm.ctm_port = corpus["config"]["port"]
+
+    def restore():
+        (w3rkstatt.getHostIP, w3rkstatt.getHostFqdn, ctm.getCtmDataCenterHost,
+         ctm.jCfgData, ctm.ctm_host, ctm.ctm_port) = saved
+
+    return restore
+
+
+def updateAlertCorpus():
+    '''
+    Record the current trasnformtCtmAlert output as expected records,
+    only after an intended change of the alert transform
+    '''
+    import core_ctm as ctm
+
+    with open(_alertCorpus) as corpusFile:
+        corpus = json.load(corpusFile)
+    restore = pinAlertCorpus(ctm, corpus)
+    try:
+        for case in corpus["alerts"]:
+            case["expected"] = ctm.trasnformtCtmAlert(data=dict(case["alert"]))
+    finally:
+        restore()
+    with open(_alertCorpus, "w") as corpusFile:
+        json.dump(corpus, corpusFile, indent=2)
+        corpusFile.write("\n")
+
+
+def benchAlerts(iterations):
+    '''
+    Alert transform, golden corpus check and cost per alert
+
+    :param int iterations: number of passes over the corpus
+    :return: all records match the corpus
+    :rtype: bool
+    '''
+    import core_ctm as ctm
+
+    with open(_alertCorpus) as corpusFile:
+        corpus = json.load(corpusFile)
+    restore = pinAlertCorpus(ctm, corpus)
+    try:
+        failed = []
+        for case in corpus["alerts"]:
+            jCtmAlert = ctm.trasnformtCtmAlert(data=dict(case["alert"]))
+            # same values and key order as the recorded record
+            if json.dumps(jCtmAlert) != json.dumps(case["expected"]):
+                failed.append(case["name"])
+
+        def transform():
+            for case in corpus["alerts"]:
+                ctm.trasnformtCtmAlert(data=dict(case["alert"]))
+
+        cost = timeIt(transform, max(1, iterations // 100))
+    finally:
+        restore()
+
+    cases = len(corpus["alerts"])
+    print("alerts: trasnformtCtmAlert, " + str(cases) + " golden records")
+    for name in failed:
+        print(f"{name:<48} {'DIFFERS':>12}")
+    print(f"{'us per alert':<48} {cost / cases:>12.2f}")
+    print(f"{'matching records':<48} {cases - len(failed):>12}")
+    return len(failed) == 0
+
+
+def getImportTime(module):
+    '''
+    Import a module in a new interpreter with python -X importtime
+
+    :param str module: module name
+    :return: total ms, ms per top level import
+    :rtype: tuple
+    '''
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        cwd=os.path.dirname(os.path.realpath(__file__)),
+        capture_output=True,
+        text=True)
+    total = 0
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(fields[1]) / 1000
+        except ValueError:
+            continue
+        name = fields[2]
+        level = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        if name == module and level == 0:
+            total = cumulative
+        elif level == 1:
+            imports[name] = cumulative
+    return total, imports
+
+
+def benchImportTime(iterations):
+    '''
+    Cold start of the alert entry point, ctm_alerts, against a budget
+
+    :param int iterations: number of interpreter starts, max. 5
+    :return: within budget
+    :rtype: bool
+    '''
+    runs = max(1, min(iterations, _importRuns))
+    totals = []
+    imports = {}
+    for i in range(runs):
+        total, imports = getImportTime(module="ctm_alerts")
+        totals.append(total)
+    total = statistics.median(totals)
+
+    print("importtime: import ctm_alerts, median of " + str(runs))
+    for name, cumulative in sorted(imports.items(),
+                                   key=lambda item: item[1],
+                                   reverse=True)[:10]:
+        print(f"{name:<48} {cumulative:>12.2f} ms")
+    status = total <= _importBudget
+    if status:
+        print(
+            f"{'total':<48} {total:>12.2f} ms, budget {_importBudget} ms: OK")
+    else:
+        print(f"{'total':<48} {total:>12.2f} ms, "
+              f"budget {_importBudget} ms: EXCEEDED")
+    return status
+
+
+benchmarks = {
+    "jsonpath": benchJsonPath,
+    "config": benchConfig,
+    "secrets": benchSecrets,
+    "csvreport": benchCsvReport,
+    "joblog": benchJobLog,
+    "alerts": benchAlerts,
+    "events": benchEvents,
+    "aapi": benchAapi,
+    "pool": benchPool,
+    "importtime": benchImportTime
+}
+
+if __name__ == "__main__":
+    names = list(benchmarks)
+    iterations = _iterations
+    if len(sys.argv) > 1:
+        if sys.argv[1] not in benchmarks:
+            print("Usage: benchmark.py [" + "|".join(benchmarks) +
+                  "] [iterations]")
+            sys.exit(1)
+        names = [sys.argv[1]]
+    if len(sys.argv) > 2:
+        iterations = int(sys.argv[2])
+
+    status = True
+    for name in names:
+        if benchmarks[name](iterations) is False:
+            status = False
+        print()
+    if not status:
+        sys.exit(1)
@@ -34,6 +34,7 @@ Date (YMD)    Name                  What
 20210204      Volker Scheithauer    Add TrueSight Orchestrator for WCM
 20220701      Volker Scheithauer    Migrate to W3rkstatt project
 20220801      Volker Scheithauer    UAT for Helix
+20261018      Orchestrator          Hot reload of project config
 """
 
 import os
@@ -55,33 +56,26 @@ from flasgger.utils import swag_from
 # pip install werkzeug flask flask_restful flask-restplus flask-marshmallow flask-restplus-marshmallow flask_restx flasgger
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
 
 # Define global variables from w3rkstatt.ini file
-ctm_bridge_host = w3rkstatt.getJsonValue(
-    path="$.CTM_BRIDGE.host", data=jCfgData)
-ctm_bridge_port = w3rkstatt.getJsonValue(
-    path="$.CTM_BRIDGE.port", data=jCfgData)
-ctm_bridge_html = w3rkstatt.getJsonValue(
-    path="$.CTM_BRIDGE.html", data=jCfgData)
-ctm_bridge_api = w3rkstatt.getJsonValue(path="$.CTM_BRIDGE.api", data=jCfgData)
-ctm_tso_process = w3rkstatt.getJsonValue(
-    path="$.CTM_BRIDGE.tso_process", data=jCfgData)
+ctm_bridge_host = cfg.ctm_bridge.host
+ctm_bridge_port = cfg.ctm_bridge.port
+ctm_bridge_html = cfg.ctm_bridge.html
+ctm_bridge_api = cfg.ctm_bridge.api
+ctm_tso_process = cfg.ctm_bridge.tso_process
 
 # itsm_smrtit_host = w3rkstatt.getJsonValue(path="$.SMARTIT.host",data=jCfgData)
 # itsm_smrtit_port = w3rkstatt.getJsonValue(path="$.SMARTIT.port",data=jCfgData)
 # itsm_smrtit      = "http://" + itsm_smrtit_host + ":" + itsm_smrtit_port + "/smartit/app/#/change/displayid/"
 
 # ITSM template IDs
-itsm_tmpl_crq = w3rkstatt.getJsonValue(
-    path="$.ITSM.change.template_id", data=jCfgData)
+itsm_tmpl_crq = cfg.itsm.get("change.template_id")
 
 
 # Assign module defaults
@@ -90,11 +84,10 @@ _timeFormat = '%Y-%m-%dT%H:%M:%S'
 _localDebug = jCfgData["DEFAULT"]["debug"]["api"]
 _localDebugAdvanced = jCfgData["DEFAULT"]["debug"]["advanced"]
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 WSGIRequestHandler.protocol_version = "HTTP/1.1"
 
 # OpenAPI Info
@@ -848,6 +841,24 @@ def ctmBridge():
     ctmBridgeApp.run(debug=True, host=ctm_bridge_host, port=ctm_bridge_port)
 
 
+def reloadConfig(cfg):
+    '''
+    Apply a reloaded project config, requests in flight finish with the
+    previous settings
+    '''
+    global jCfgData, ctm_tso_process, itsm_tmpl_crq
+    global _localDebug, _localDebugAdvanced
+
+    jCfgData = cfg.data
+    ctm_tso_process = cfg.ctm_bridge.tso_process
+    itsm_tmpl_crq = cfg.itsm.get("change.template_id")
+    _localDebug = cfg.default.get("debug.api")
+    _localDebugAdvanced = cfg.default.get("debug.advanced")
+
+
+w3rkstatt.onConfigReload(reloadConfig)
+
+
 if __name__ == "__main__":
     logging.basicConfig(filename=logFile, filemode='w', level=logging.DEBUG,
                         format='%(asctime)s - %(levelname)s # %(message)s', datefmt='%d-%b-%y %H:%M:%S')
@@ -864,6 +875,8 @@ if __name__ == "__main__":
     with open('./ctm-wcm.pid', 'w', encoding='utf-8') as f:
         f.write(str(os.getpid()))
 
+    # pick up config changes without a restart
+    w3rkstatt.watchConfig()
     ctmBridge()
 
     logger.info('Flask: CTM WCM Bridge: "End"')
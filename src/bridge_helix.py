@@ -29,6 +29,7 @@ Date (YMD)    Name                  What
 20200730      Volker Scheithauer    Modify json handling for WCM
 20201009      Volker Scheithauer    Externalize Helix functions
 20220701      Volker Scheithauer    Migrate to W3rkstatt project
+20261018      Orchestrator          Hot reload of project config
 """
 
 import logging
@@ -42,14 +43,12 @@ import core_itsm as helix
 # pip install flask, flask_restful, flask-restplus, flask-marshmallow, flask-restplus-marshmallow
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
 
 # ITSM Details
 itsm_smrtit_host = w3rkstatt.getJsonValue(path="$.SMARTIT.host", data=jCfgData)
@@ -58,8 +57,7 @@ itsm_smrtit = "http://" + itsm_smrtit_host + ":" + \
     itsm_smrtit_port + "/smartit/app/#/change/displayid/"
 
 # ITSM template IDs
-itsm_tmpl_crq = w3rkstatt.getJsonValue(
-    path="$.ITSM.change.template_id", data=jCfgData)
+itsm_tmpl_crq = cfg.itsm.get("change.template_id")
 
 
 # Assign module defaults
@@ -68,11 +66,10 @@ _timeFormat = '%Y-%m-%dT%H:%M:%S'
 _localDebug = False
 _localDbgAdv = False
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 
 # CTM WCM variables
 STATE_REQUESTER_WORKS = "RequesterWorks"
@@ -210,6 +207,26 @@ def translateCrqStatus(status):
     return httpResponseCode
 
 
+def reloadConfig(cfg):
+    '''
+    Apply a reloaded project config
+    '''
+    global jCfgData, itsm_smrtit_host, itsm_smrtit_port, itsm_smrtit
+    global itsm_tmpl_crq
+
+    jCfgData = cfg.data
+    itsm_smrtit_host = w3rkstatt.getJsonValue(path="$.SMARTIT.host",
+                                              data=jCfgData)
+    itsm_smrtit_port = w3rkstatt.getJsonValue(path="$.SMARTIT.port",
+                                              data=jCfgData)
+    itsm_smrtit = "http://" + itsm_smrtit_host + ":" + \
+        itsm_smrtit_port + "/smartit/app/#/change/displayid/"
+    itsm_tmpl_crq = cfg.itsm.get("change.template_id")
+
+
+w3rkstatt.onConfigReload(reloadConfig)
+
+
 if __name__ == "__main__":
     logging.basicConfig(filename=logFile, filemode='w', level=logging.DEBUG,
                         format='%(asctime)s - %(levelname)s # %(message)s', datefmt='%d-%b-%y %H:%M:%S')
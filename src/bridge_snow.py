@@ -27,6 +27,7 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20201001      Volker Scheithauer    Initial Development
 20220701      Volker Scheithauer    Migrate to W3rkstatt project
+20261018      Orchestrator          Hot reload of project config
 """
 
 import w3rkstatt as w3rkstatt
@@ -42,18 +43,15 @@ from jsonpath_ng.ext import parse
 import jsonpath_rw_ext as jp
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
 
 # SNOW template IDs
-snow_tmpl_req = w3rkstatt.getJsonValue(
-    path="$.SNOW.request.template_id", data=jCfgData)
+snow_tmpl_req = cfg.snow.get("request.template_id")
 
 
 # https://dev81866.service-now.com/api/now/table/{tableName}
@@ -66,11 +64,10 @@ _timeFormat = '%Y-%m-%dT%H:%M:%S'
 _localDebug = False
 _localDbgAdv = False
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 
 
 # Versioned URL: /api/now/{api_version}/table/{tableName}/{sys_id}
@@ -150,6 +147,19 @@ def translateSnowReqStatus(data):
     return httpResponseCode
 
 
+def reloadConfig(cfg):
+    '''
+    Apply a reloaded project config
+    '''
+    global jCfgData, snow_tmpl_req
+
+    jCfgData = cfg.data
+    snow_tmpl_req = cfg.snow.get("request.template_id")
+
+
+w3rkstatt.onConfigReload(reloadConfig)
+
+
 if __name__ == "__main__":
     logging.basicConfig(filename=logFile, filemode='w', level=logging.DEBUG,
                         format='%(asctime)s - %(levelname)s # %(message)s', datefmt='%d-%b-%y %H:%M:%S')
@@ -158,7 +168,7 @@ if __name__ == "__main__":
     logger.info('System Platform: "%s" ', w3rkstatt.platform.system())
     logger.info('Log Level: "%s"', loglevel)
     logger.info('Host Name: "%s"', hostName)
-    logger.info('Host IP: "%s"', hostIP)
+    logger.info('Host IP: "%s"', w3rkstatt.getHostIP(hostName))
     logger.info('Epoch: %s', epoch)
 
     logger.info('SNOW: ITSM Management End')
@@ -28,6 +28,7 @@ Date (YMD)    Name                  What
 20210204      Volker Scheithauer    Initial Development 
 20210204      Volker Scheithauer    TrusSight Orchestrator Integration for WCM
 20220701      Volker Scheithauer    Migrate to W3rkstatt project
+20261018      Orchestrator          Hot reload of project config
 """
 
 import logging
@@ -44,20 +45,16 @@ import core_tso as tso
 # pip install flask, flask_restful, flask-restplus, flask-marshmallow, flask-restplus-marshmallow
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
-workflow = w3rkstatt.getJsonValue(
-    path="$.TSO.ctm.wcm", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
+workflow = cfg.tso.get("ctm.wcm")
 
 # ITSM template IDs
-itsm_tmpl_crq = w3rkstatt.getJsonValue(
-    path="$.ITSM.change.template_id", data=jCfgData)
+itsm_tmpl_crq = cfg.itsm.get("change.template_id")
 
 # Assign module defaults
 _modVer = "20.22.07.00"
@@ -65,11 +62,10 @@ _timeFormat = '%Y-%m-%dT%H:%M:%S'
 _localDebug = False
 _localDbgAdv = False
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 
 
 def createTsoCrq(data):
@@ -215,6 +211,20 @@ def translateCrqStatus(status):
     return httpResponseCode
 
 
+def reloadConfig(cfg):
+    '''
+    Apply a reloaded project config
+    '''
+    global jCfgData, workflow, itsm_tmpl_crq
+
+    jCfgData = cfg.data
+    workflow = cfg.tso.get("ctm.wcm")
+    itsm_tmpl_crq = cfg.itsm.get("change.template_id")
+
+
+w3rkstatt.onConfigReload(reloadConfig)
+
+
 if __name__ == "__main__":
     logging.basicConfig(filename=logFile, filemode='w', level=logging.DEBUG,
                         format='%(asctime)s - %(levelname)s # %(message)s', datefmt='%d-%b-%y %H:%M:%S')
@@ -26,6 +26,11 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20220715      Volker Scheithauer    Initial Development
 20230522      Volker Scheithauer    Update API key issues
+20261018      Orchestrator          Batched event follow-up operations
+20261018      Orchestrator          Hot reload of project config
+20261018      Orchestrator          Faster start, lazy imports, no DNS at import
+20261018      Orchestrator          Retry event follow-up of accepted calls only
+20261018      Orchestrator          Settings from one applyConfig, also on reload
 
 See also: https://realpython.com/python-send-email/
 """
@@ -36,9 +41,11 @@ import logging
 import requests
 import urllib3
 import time
+import heapq
 import datetime
 import sys
 import getopt
+import threading
 
 # handle dev environment vs. production
 try:
@@ -51,56 +58,94 @@ except:
 
 # Define global variables from w3rkstatt.ini file
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.config_folder",
-                                   data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.template_folder",
-                                   data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(path="$.DEFAULT.crypto_file",
-                                    data=jCfgData)
-
-bhom_host = w3rkstatt.getJsonValue(path="$.BHOM.host", data=jCfgData)
-bhom_api_ver = w3rkstatt.getJsonValue(path="$.BHOM.api_version", data=jCfgData)
-bhom_api_ns = w3rkstatt.getJsonValue(path="$.BHOM.api_namespace",
-                                     data=jCfgData)
-bhom_ssl_ver = w3rkstatt.getJsonValue(path="$.BHOM.ssl_ignore", data=jCfgData)
-
-bhom_api_key = w3rkstatt.getJsonValue(path="$.BHOM.api_key", data=jCfgData)
-bhom_api_secret = w3rkstatt.getJsonValue(path="$.BHOM.api_secret",
-                                         data=jCfgData)
-bhom_tenant = w3rkstatt.getJsonValue(path="$.BHOM.tenant", data=jCfgData)
-
-# Compute Url's
-# /ims/api/v1
-bhom_url_ims = 'https://' + bhom_host + '/ims/api/v1/'
-
-# /events-service/api/v1.0/events
-bhom_url_event = 'https://' + bhom_host + '/events-service/api/v1.0/'
-
-# ITSM configuration
-itsm_operational_category1 = w3rkstatt.getJsonValue(path="$.ITSM.opcat_1",
-                                                    data=jCfgData)
-itsm_operational_category2 = w3rkstatt.getJsonValue(path="$.ITSM.opcat_2",
-                                                    data=jCfgData)
-itsm_operational_category3 = w3rkstatt.getJsonValue(path="$.ITSM.opcat_3",
-                                                    data=jCfgData)
-
-# Ignore HTTPS Insecure Request Warnings
-if bhom_ssl_ver:
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+cfg = w3rkstatt.getConfig()
+bhomFollowUp = None
+
+
+def applyConfig(cfg):
+    '''
+    Set the module settings from the project config, at import and after a
+    reload
+
+    :param ProjectConfig cfg: project config
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global jCfgData, cfgFolder, logFolder, tmpFolder, cryptoFile
+    global bhom_host, bhom_api_ver, bhom_api_ns, bhom_ssl_ver
+    global bhom_api_key, bhom_api_secret, bhom_tenant, bhom_url_ims
+    global bhom_url_event, bhom_followup_delay, bhom_followup_interval
+    global bhom_followup_batch, bhom_followup_deadline, bhom_followup_wait
+    global itsm_operational_category1, itsm_operational_category2
+    global itsm_operational_category3, _localDebug
+
+    jCfgData = cfg.data
+    cfgFolder = cfg.default.config_folder
+    logFolder = cfg.default.log_folder
+    tmpFolder = cfg.default.template_folder
+    cryptoFile = cfg.default.crypto_file
+
+    bhom_host = cfg.bhom.host
+    bhom_api_ver = cfg.bhom.api_version
+    bhom_api_ns = cfg.bhom.api_namespace
+    bhom_ssl_ver = cfg.bhom.ssl_ignore
+
+    bhom_api_key = cfg.bhom.api_key
+    bhom_api_secret = cfg.bhom.api_secret
+    bhom_tenant = cfg.bhom.tenant
+
+    # Compute Url's
+    # /ims/api/v1
+    bhom_url_ims = cfg.bhom.url_ims
+
+    # /events-service/api/v1.0/events
+    bhom_url_event = cfg.bhom.url_event
+
+    # Event follow-up operations (assign, note), seconds
+    bhom_followup_delay = cfg.bhom.get("followup.delay")
+    if not bhom_followup_delay:
+        bhom_followup_delay = 1
+    bhom_followup_interval = cfg.bhom.get("followup.interval")
+    if not bhom_followup_interval:
+        bhom_followup_interval = 1
+    bhom_followup_batch = cfg.bhom.get("followup.batch_size")
+    if not bhom_followup_batch:
+        bhom_followup_batch = 100
+    bhom_followup_deadline = cfg.bhom.get("followup.deadline")
+    if not bhom_followup_deadline:
+        bhom_followup_deadline = 120
+    # ctm_alerts.py waits this long for open operations before it exits
+    bhom_followup_wait = cfg.bhom.get("followup.wait")
+    if not bhom_followup_wait:
+        bhom_followup_wait = 20
+    if bhomFollowUp is not None:
+        bhomFollowUp.delay = float(bhom_followup_delay)
+        bhomFollowUp.interval = float(bhom_followup_interval)
+        bhomFollowUp.batch_size = int(bhom_followup_batch)
+        bhomFollowUp.deadline = float(bhom_followup_deadline)
+
+    # ITSM configuration
+    itsm_operational_category1 = cfg.itsm.get("opcat_1")
+    itsm_operational_category2 = cfg.itsm.get("opcat_2")
+    itsm_operational_category3 = cfg.itsm.get("opcat_3")
+
+    # Ignore HTTPS Insecure Request Warnings
+    if bhom_ssl_ver:
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+    _localDebug = cfg.bhom.debug
+
+
+applyConfig(cfg)
 
 # Assign module defaults
 _modVer = "20.23.05.00"
 _timeFormat = '%d %b %Y %H:%M:%S,%f'
-_localDebug = jCfgData["BHOM"]["debug"]
 logger = w3rkstatt.logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
-domain = w3rkstatt.getHostDomain(w3rkstatt.getHostFqdn(hostName))
 
 
 def createEvent(token, event_data):
@@ -437,6 +482,227 @@ def addNoteEvent(token, event_id, event_note):
     return bhom_event_status
 
 
+def updateEvents(token, operation, event_ids, slots):
+    # https://{{server}}:{{port}}/events-service/api/v1.0/events/operations/{operation}
+    # one call for many events with the same slots
+    # status: HTTP status code, None if BHOM was not reached
+    jResult = {"passedIds": [], "failedIds": list(event_ids), "status": None}
+    authToken = token
+    url = bhom_url_event + 'events/operations/' + operation
+    headers = {
+        'content-type': "application/json",
+        'cache-control': "no-cache",
+        'Authorization': 'Bearer ' + authToken,
+    }
+
+    # Create a dictionary for the request body
+    request_body = {'eventIds': list(event_ids), 'slots': slots}
+
+    # Load the request body into the payload in JSON format.
+    payload = json.dumps(request_body)
+
+    # Make the call to the API
+    if _localDebug:
+        logger.debug('HTTP API Url: %s', url)
+        logger.debug('HTTP Headers: %s', headers)
+        logger.debug('HTTP Payload: %s', payload)
+
+    try:
+        response = requests.post(url,
+                                 data=payload,
+                                 headers=headers,
+                                 verify=False)
+    except requests.RequestException as e:
+        logger.error('HTTP Response Error: %s', e)
+        return jResult
+
+    rsc = response.status_code
+    jResult["status"] = rsc
+    if rsc != 202:
+        logger.error('HTTP Response Status: %s', rsc)
+    else:
+        rst = response.text
+        json_data = json.loads(rst)
+        lPassed = json_data.get('passedIds', [])
+        jResult["passedIds"] = lPassed
+        jResult["failedIds"] = [x for x in event_ids if x not in lPassed]
+
+        if _localDebug:
+            logger.debug('HTTP Response Text: %s', rst)
+            logger.info('BHOM: event %s: %s', operation, jResult)
+    return jResult
+
+
+class EventFollowUp(object):
+    """
+    Queue for event operations after createEvent, sent off the alert path
+    Operations with identical slots are combined into one call. Events not
+    yet known to BHOM (failedIds of an accepted call) are retried with
+    backoff until the deadline. Rejected calls and login failures are not
+    retried.
+    """
+
+    def __init__(self,
+                 delay=bhom_followup_delay,
+                 interval=bhom_followup_interval,
+                 batch_size=bhom_followup_batch,
+                 deadline=bhom_followup_deadline):
+        self.delay = float(delay)
+        self.interval = float(interval)
+        self.batch_size = int(batch_size)
+        self.deadline = float(deadline)
+        self.items = []
+        self.active = 0
+        self.seq = 0
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def add(self, operation, event_id, slots):
+        '''
+        Queue an event operation
+
+        :param str operation: events/operations/{operation}, e.g. assign, addNote
+        :param str event_id: BHOM event id
+        :param dict slots: event slots
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        now = time.monotonic()
+        item = {
+            "operation": operation,
+            "event_id": event_id,
+            "slots": slots,
+            "attempt": 0,
+            "expires": now + self.deadline
+        }
+        with self.cond:
+            self.active += 1
+            self._push(now + self.delay, item)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run,
+                                               name="bhom-followup",
+                                               daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def _push(self, due, item):
+        self.seq += 1
+        heapq.heappush(self.items, (due, self.seq, item))
+
+    def _take(self):
+        # wait for the first due item plus the batch interval,
+        # then take everything that is due
+        with self.cond:
+            while True:
+                if len(self.items) < 1:
+                    self.cond.wait()
+                    continue
+                due = self.items[0][0] + self.interval - time.monotonic()
+                if due > 0:
+                    self.cond.wait(due)
+                    continue
+                break
+
+            lItems = []
+            now = time.monotonic()
+            while len(self.items) > 0 and self.items[0][0] <= now:
+                lItems.append(heapq.heappop(self.items)[2])
+        return lItems
+
+    def _send(self, items):
+        jBatches = {}
+        for item in items:
+            key = (item["operation"], json.dumps(item["slots"],
+                                                 sort_keys=True))
+            jBatches.setdefault(key, []).append(item)
+
+        authToken = authenticate()
+        lFailed = []
+        for lBatch in jBatches.values():
+            for start in range(0, len(lBatch), self.batch_size):
+                lChunk = lBatch[start:start + self.batch_size]
+                lIds = [item["event_id"] for item in lChunk]
+                if authToken is None:
+                    jResult = {"passedIds": [], "failedIds": lIds}
+                else:
+                    jResult = updateEvents(token=authToken,
+                                           operation=lChunk[0]["operation"],
+                                           event_ids=lIds,
+                                           slots=lChunk[0]["slots"])
+                if jResult.get("status") != 202:
+                    # not accepted, retrying does not help
+                    for id in jResult["failedIds"]:
+                        logger.error('BHOM: event %s failed: %s',
+                                     lChunk[0]["operation"], id)
+                    continue
+                # accepted, failed events are not yet known to BHOM
+                lFailed.extend(item for item in lChunk
+                               if item["event_id"] in jResult["failedIds"])
+        return lFailed
+
+    def _retry(self, items):
+        # event not found yet, retry with backoff until the deadline
+        now = time.monotonic()
+        with self.cond:
+            for item in items:
+                item["attempt"] += 1
+                wait = w3rkstatt.getBackoffDelay(attempt=item["attempt"],
+                                                 delay=self.delay,
+                                                 limit=self.deadline / 4)
+                if now + wait > item["expires"]:
+                    logger.error('BHOM: event %s failed: %s',
+                                 item["operation"], item["event_id"])
+                    self.active -= 1
+                else:
+                    self._push(now + wait, item)
+            self.cond.notify_all()
+
+    def _run(self):
+        while True:
+            lItems = self._take()
+            try:
+                lFailed = self._send(lItems)
+            except Exception as exp:
+                logger.error('BHOM: event follow-up error: %s', exp)
+                lFailed = lItems
+            self._retry(lFailed)
+            with self.cond:
+                self.active -= len(lItems) - len(lFailed)
+                self.cond.notify_all()
+
+    def join(self, timeout=None):
+        '''
+        Wait until all queued operations are sent or given up
+
+        :param float timeout: max. seconds to wait, None waits forever
+        :return: all operations done
+        :rtype: bool
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        with self.cond:
+            return self.cond.wait_for(lambda: self.active < 1, timeout)
+
+
+def getEventFollowUp():
+    '''
+    Get shared event follow-up queue
+
+    :return: follow-up queue
+    :rtype: EventFollowUp
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global bhomFollowUp
+    if bhomFollowUp is None:
+        bhomFollowUp = EventFollowUp(delay=bhom_followup_delay,
+                                     interval=bhom_followup_interval,
+                                     batch_size=bhom_followup_batch,
+                                     deadline=bhom_followup_deadline)
+    return bhomFollowUp
+
+
 # Main function
 
 
@@ -498,6 +764,8 @@ def authenticate():
     return authToken
 
 
+w3rkstatt.onConfigReload(applyConfig)
+
 if __name__ == "__main__":
     logging.basicConfig(filename=logFile,
                         filemode='w',
@@ -509,7 +777,7 @@ if __name__ == "__main__":
     logger.info('System Platform: %s ', w3rkstatt.platform.system())
     logger.info('Log Level: %s', loglevel)
     logger.info('Host Name: %s', hostName)
-    logger.info('Host IP: %s', hostIP)
+    logger.info('Host IP: %s', w3rkstatt.getHostIP(hostName))
     logger.info('BMC Helix Operation Manager: %s', bhom_host)
     logger.info('BHOM API Version: %s', bhom_api_ver)
     logger.info('BHOM Url Login: %s', bhom_url_ims)
@@ -25,6 +25,26 @@ Change Log
 Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210311      Volker Scheithauer    Tranfer Development from bmcs_core project
+20261018      Orchestrator          Concurrent alert host resolution
+20261018      Orchestrator          Batched alert status and comment updates
+20261018      Orchestrator          Job info and BHOM transform on dicts
+20261018      Orchestrator          Hot reload of project config
+20261018      Orchestrator          Data center registry, cached host resolution
+20261018      Orchestrator          Faster start, lazy imports, no DNS at import
+20261018      Orchestrator          Streaming report download and csv parsing
+20261018      Orchestrator          Concurrent reports, backoff polling with deadline
+20261018      Orchestrator          Single pass compiled job log tokenizer
+20261018      Orchestrator          Bounded head / tail job output capture
+20261018      Orchestrator          Table driven alert transform
+20261018      Orchestrator          Declarative BHOM and TSIM event mapping
+20261018      Orchestrator          Decode raw Automation API responses
+20261018      Orchestrator          Shared Automation API session tokens
+20261018      Orchestrator          Connection pool, timeouts and cached API objects
+20261018      Orchestrator          Decode AAPI responses by controlm_py model attributes
+20261018      Orchestrator          Alert transform returns the alert dict
+20261018      Orchestrator          Event slots fall back to the default on transform errors
+20261018      Orchestrator          Settings from one applyConfig, also on reload
+20261018      Orchestrator          Report sent alert comments per caller
 
 """
 
@@ -36,9 +56,17 @@ import time
 import datetime
 import sys
 import getopt
+import tempfile
+import threading
+import weakref
+import queue
+import socket
+import gzip
+import hashlib
+import concurrent.futures
 import requests
 import urllib3
-from collections import OrderedDict
+from collections import OrderedDict, deque
 import urllib3
 from urllib3 import disable_warnings
 from urllib3.exceptions import NewConnectionError, MaxRetryError, InsecureRequestWarning
@@ -46,77 +74,300 @@ from urllib3.exceptions import NewConnectionError, MaxRetryError, InsecureReques
 # Control-M Python support
 # python3 -m pip install git+https://github.com/dcompane/controlm_py.git
 
-import controlm_py as ctm
-from controlm_py.rest import ApiException
+# controlm_py loads on first use, see w3rkstatt.lazyImport
 # from controlm_py.models.run_report_info import RunReportInfo
 
 # handle dev environment vs. production
 try:
     import w3rkstatt as w3rkstatt
+    import ctm_session as session
 except:
     # fix import issues for modules
     sys.path.append(
         os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
     from src import w3rkstatt as w3rkstat
+    from src import ctm_session as session
+
+ctm = w3rkstatt.lazyImport("controlm_py")
 
 # To Handle CTM JSON with '
 # https://pypi.org/project/demjson/
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.config_folder",
-                                   data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.template_folder",
-                                   data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(path="$.DEFAULT.crypto_file",
-                                    data=jCfgData)
-
-ctm_host = w3rkstatt.getJsonValue(path="$.CTM.host", data=jCfgData)
-ctm_port = w3rkstatt.getJsonValue(path="$.CTM.port", data=jCfgData)
-ctm_aapi = w3rkstatt.getJsonValue(path="$.CTM.aapi", data=jCfgData)
-ctm_user = w3rkstatt.getJsonValue(path="$.CTM.user", data=jCfgData)
-ctm_pwd = w3rkstatt.getJsonValue(path="$.CTM.pwd", data=jCfgData)
-ctm_ssl = w3rkstatt.getJsonValue(path="$.CTM.ssl", data=jCfgData)
-ctm_ssl_ver = w3rkstatt.getJsonValue(path="$.CTM.ssl_verification",
-                                     data=jCfgData)
-ctm_url = 'https://' + ctm_host + ':' + ctm_port + ctm_aapi + '/'
-ctm_rpt_jsm = w3rkstatt.getJsonValue(path="$.CTM.service_model_rpt_job",
-                                     data=jCfgData)
-# CTM Report Name to get job definitions for service model
-
-# Compute CTM Server Name
-ctm_server = w3rkstatt.getHostFromFQDN(ctm_host)
-ctm_agent = ctm_server
-
-# Assign module defaults
-_localDebug = jCfgData["DEFAULT"]["debug"]["api"]
-_localDebugFunctions = jCfgData["DEFAULT"]["debug"]["functions"]
-_localDebugData = jCfgData["DEFAULT"]["debug"]["data"]
-_localDebugAdvanced = jCfgData["DEFAULT"]["debug"]["advanced"]
-_localQA = jCfgData["DEFAULT"]["debug"]["qa"]
+cfg = w3rkstatt.getConfig()
+
+# Shared helpers, created on first use
+ctmTaskPool = None
+ctmTaskPoolWorkers = None
+ctmReportScheduler = None
+ctmAlertUpdates = None
+# Bearer tokens shared across processes, see ctm_session.py
+ctmSessionCache = None
+# API objects are kept on their api client, see getCtmApi
+ctmApiObjectsLock = threading.Lock()
+# Report states, anything else is still running
+ctmReportDone = ("SUCCEEDED", )
+ctmReportFailed = ("FAILED", "ERROR", "CANCELLED", "CANCELED")
+
+
+def applyConfig(cfg):
+    '''
+    Set the module settings from the project config, at import and after a
+    reload. Shared helpers already created take over the new settings
+
+    :param ProjectConfig cfg: project config
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global jCfgData, cfgFolder, logFolder, tmpFolder, cryptoFile, dataFolder
+    global ctm_host, ctm_port, ctm_aapi, ctm_user, ctm_pwd, ctm_ssl
+    global ctm_ssl_ver, ctm_url, ctm_rpt_jsm, ctm_server, ctm_agent
+    global ctm_job_workers, ctm_job_timeout, ctm_rpt_chunk_size
+    global ctm_rpt_batch_size, ctm_rpt_retry, ctm_rpt_deadline
+    global ctm_job_output, ctm_connection, ctm_alert_batch_size
+    global ctm_alert_batch_interval, ctmTaskPool, ctmSessionCache
+    global _localDebug, _localDebugFunctions, _localDebugData
+    global _localDebugAdvanced, _localQA
+
+    jCfgData = cfg.data
+    cfgFolder = cfg.default.config_folder
+    logFolder = cfg.default.log_folder
+    tmpFolder = cfg.default.template_folder
+    cryptoFile = cfg.default.crypto_file
+    dataFolder = cfg.default.data_folder
+
+    ctm_host = cfg.ctm.host
+    ctm_port = cfg.ctm.port
+    ctm_aapi = cfg.ctm.aapi
+    ctm_user = cfg.ctm.user
+    ctm_pwd = cfg.ctm.pwd
+    ctm_ssl = cfg.ctm.ssl
+    ctm_ssl_ver = cfg.ctm.ssl_verification
+    ctm_url = cfg.ctm.url
+    # CTM Report Name to get job definitions for service model
+    ctm_rpt_jsm = cfg.ctm.get("service_model_rpt_job")
+
+    # Concurrent job alert enrichment
+    ctm_job_workers = cfg.ctm.get("jobs.workers")
+    if not ctm_job_workers:
+        ctm_job_workers = 8
+    ctm_job_timeout = cfg.ctm.get("jobs.timeout")
+    if not ctm_job_timeout:
+        ctm_job_timeout = 30
+
+    # Streaming reports, download chunk in bytes and records per batch
+    ctm_rpt_chunk_size = cfg.ctm.get("reports.chunk_size")
+    if not ctm_rpt_chunk_size:
+        ctm_rpt_chunk_size = 1048576
+    ctm_rpt_batch_size = cfg.ctm.get("reports.batch_size")
+    if not ctm_rpt_batch_size:
+        ctm_rpt_batch_size = 1000
+
+    # Report status polling, backoff in seconds and deadline for all reports
+    ctm_rpt_retry = {
+        "delay": cfg.ctm.get("reports.delay") or 2,
+        "backoff": cfg.ctm.get("reports.backoff") or 2,
+        "limit": cfg.ctm.get("reports.limit") or 30
+    }
+    ctm_rpt_deadline = cfg.ctm.get("reports.deadline")
+    if not ctm_rpt_deadline:
+        ctm_rpt_deadline = 600
+
+    # Job output capture, lines kept at start and end, max. bytes per line
+    # The full output is written to a gzip file in the data folder
+    ctm_job_output = {
+        "head": cfg.ctm.get("jobs.output.head") or 100,
+        "tail": cfg.ctm.get("jobs.output.tail") or 100,
+        "line_bytes": cfg.ctm.get("jobs.output.line_bytes") or 4096,
+        "spill": cfg.ctm.get("jobs.output.spill", True)
+    }
+    # Automation API connections, pool size per endpoint, seconds, retries of
+    # idempotent requests and TCP keep-alive probes
+    ctm_connection = {
+        "pool_size": cfg.ctm.get("connection.pool_size") or 16,
+        "connect_timeout": cfg.ctm.get("connection.connect_timeout") or 10,
+        "read_timeout": cfg.ctm.get("connection.read_timeout") or 60,
+        "retries": cfg.ctm.get("connection.retries", 3),
+        "backoff": cfg.ctm.get("connection.backoff", 0.5),
+        "keepalive": cfg.ctm.get("connection.keepalive", True),
+        "keepalive_idle": cfg.ctm.get("connection.keepalive_idle") or 60,
+        "keepalive_interval": cfg.ctm.get("connection.keepalive_interval")
+        or 10,
+        "keepalive_count": cfg.ctm.get("connection.keepalive_count") or 6
+    }
+
+    # Batched alert updates, flush on size or after interval seconds
+    ctm_alert_batch_size = cfg.ctm.get("alerts.updates.batch_size")
+    if not ctm_alert_batch_size:
+        ctm_alert_batch_size = 100
+    ctm_alert_batch_interval = cfg.ctm.get("alerts.updates.interval")
+    if not ctm_alert_batch_interval:
+        ctm_alert_batch_interval = 2
+
+    # Compute CTM Server Name
+    ctm_server = cfg.ctm.server
+    ctm_agent = ctm_server
+
+    # Assign module defaults
+    _localDebug = cfg.default.get("debug.api")
+    _localDebugFunctions = cfg.default.get("debug.functions")
+    _localDebugData = cfg.default.get("debug.data")
+    _localDebugAdvanced = cfg.default.get("debug.advanced")
+    _localQA = cfg.default.get("debug.qa")
+
+    # new worker pool for a new size, the old one ends with its last task
+    if ctmTaskPool is not None and \
+            ctmTaskPoolWorkers != int(ctm_job_workers):
+        ctmTaskPool = None
+        if ctmReportScheduler is not None:
+            ctmReportScheduler.executor = getCtmTaskPool()
+    if ctmAlertUpdates is not None:
+        ctmAlertUpdates.batch_size = int(ctm_alert_batch_size)
+        ctmAlertUpdates.interval = float(ctm_alert_batch_interval)
+    # new connections use the new session cache settings
+    ctmSessionCache = None
+
+
+applyConfig(cfg)
 
 _modVer = "20.22.07.00"
 _timeFormat = '%d %b %Y %H:%M:%S,%f'
+# Job log line: 12:48:07 2-Apr-2021  ORDERED JOB:24; DAILY FORCED   \t5065
+_ctmJobLogLine = re.compile(
+    r"^[ \t]*(?!Event Time)(\S+) +(\S+)[ \t]{2,}([^\t\r\n]*)"
+    r"(?:\t[ \t]*(\d+))?", re.M)
+# 5100: ENDED AT 20210402124807. OSCOMPSTAT 0. RUNCNT 1
+_ctmJobLogEnded = re.compile(r"^\S+\s+\S+\s+(\S+)\s+\S+\s+(\S+)\s+\S+\s+(\S+)")
 
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 
 # Ignore HTTPS Insecure Request Warnings
 if ctm_ssl_ver == 'true':
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+def getCtmTaskPool():
+    '''
+    Get shared bounded worker pool for Control-M lookups
+
+    :return: worker pool, CTM.jobs.workers threads
+    :rtype: concurrent.futures.ThreadPoolExecutor
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global ctmTaskPool, ctmTaskPoolWorkers
+    if ctmTaskPool is None:
+        ctmTaskPoolWorkers = int(ctm_job_workers)
+        ctmTaskPool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=ctmTaskPoolWorkers, thread_name_prefix="ctm-task")
+    return ctmTaskPool
+
+
+def getCtmReportScheduler():
+    '''
+    Get shared scheduler for report status polling
+
+    :return: scheduler on the Control-M worker pool
+    :rtype: w3rkstatt.RetryScheduler
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global ctmReportScheduler
+    if ctmReportScheduler is None:
+        ctmReportScheduler = w3rkstatt.RetryScheduler(
+            executor=getCtmTaskPool())
+    return ctmReportScheduler
+
+
+def getCtmPoolOptions():
+    '''
+    Get urllib3 pool settings of CTM.connection
+
+    :return: maxsize, retries, timeout (connect, read) and socket_options
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    socket_options = list(
+        urllib3.connection.HTTPConnection.default_socket_options)
+    if ctm_connection["keepalive"]:
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # probe options are platform specific
+        for (option, key) in (("TCP_KEEPIDLE", "keepalive_idle"),
+                              ("TCP_KEEPINTVL", "keepalive_interval"),
+                              ("TCP_KEEPCNT", "keepalive_count")):
+            if hasattr(socket, option):
+                socket_options.append(
+                    (socket.IPPROTO_TCP, getattr(socket, option),
+                     int(ctm_connection[key])))
+    return {
+        "maxsize":
+        int(ctm_connection["pool_size"]),
+        "retries":
+        urllib3.util.Retry(total=int(ctm_connection["retries"]),
+                           backoff_factor=float(ctm_connection["backoff"]),
+                           status_forcelist=(502, 503, 504),
+                           raise_on_status=False),
+        "timeout": (float(ctm_connection["connect_timeout"]),
+                    float(ctm_connection["read_timeout"])),
+        "socket_options":
+        socket_options
+    }
+
+
+def getCtmApi(ctmApiClient, api):
+    '''
+    Get the API object of an api client, created once per client
+
+    :param ApiClient ctmApiClient: Automation API client
+    :param class api: controlm_py API, e.g. ctm.api.run_api.RunApi
+    :return: API object
+    :rtype: object
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    with ctmApiObjectsLock:
+        # the API objects refer to the client, they go away together
+        apis = getattr(ctmApiClient, "ctm_api_objects", None)
+        if apis is None:
+            apis = {}
+            ctmApiClient.ctm_api_objects = apis
+        ctmApiObject = apis.get(api)
+        if ctmApiObject is None:
+            ctmApiObject = api(api_client=ctmApiClient)
+            apis[api] = ctmApiObject
+    return ctmApiObject
+
+
+def getCtmSessionCache():
+    '''
+    Get shared session token cache
+
+    :return: session cache or None if disabled in CTM.session
+    :rtype: ctm_session.CtmSessionCache
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global ctmSessionCache
+    if ctmSessionCache is None:
+        ctmSessionCache = session.getSessionCache(data=jCfgData)
+    return ctmSessionCache
+
+
 class CtmConnection(object):
     """
     Implements persistent connectivity for the Control-M Automation API
+    With a session cache the bearer token is shared with other processes, it
+    is renewed shortly before it expires or after a 401 response and the
+    session is only logged out by logout().
     :property api_client Implements the connection to the Control-M AAPI endpoint
     """
     logged_in = False
+    session_api = None
 
     def __init__(self,
                  host='',
@@ -126,7 +377,8 @@ class CtmConnection(object):
                  password='',
                  ssl=True,
                  verify_ssl=False,
-                 additional_login_header={}):
+                 additional_login_header={},
+                 session_cache=None):
         """
         Initializes the CtmConnection object and provides the Automation API client.
         :param host: str: Control-M web server host name (preferred fqdn) serving the Automation API.
@@ -138,6 +390,7 @@ class CtmConnection(object):
         :param password: str: Password for the login user
         :param verify_ssl: bool: If the web server uses self signed certificates (default=False)
         :param additionalLoginHeader: dict: login headers to be added to the AAPI headers
+        :param session_cache: CtmSessionCache: shared tokens, None to log in and out per connection
         :return None
         """
         #
@@ -154,32 +407,121 @@ class CtmConnection(object):
 
         configuration.host = configuration.host + host + ':' + port + endpoint
 
+        # pool sized for the worker threads, see CTM.connection
+        pool = getCtmPoolOptions()
+        configuration.connection_pool_maxsize = pool["maxsize"]
+        configuration.retries = pool["retries"]
+        self.timeout = pool["timeout"]
+
         self.api_client = ctm.api_client.ApiClient(configuration=configuration)
+        rest_client = getattr(self.api_client, "rest_client", None)
+        if rest_client is not None:
+            # applies to the pools created on first use
+            rest_client.pool_manager.connection_pool_kw.update(
+                maxsize=pool["maxsize"],
+                retries=pool["retries"],
+                socket_options=pool["socket_options"])
         self.session_api = ctm.api.session_api.SessionApi(
             api_client=self.api_client)
-        credentials = ctm.models.LoginCredentials(username=user,
-                                                  password=password)
+        self.credentials = ctm.models.LoginCredentials(username=user,
+                                                       password=password)
+        self.session_cache = session_cache
+        self.session_key = configuration.host + "|" + user
+        self.token = None
+        self.expires = 0
+        self.lock = threading.Lock()
 
         if additional_login_header is not None:
             for header in additional_login_header.keys():
                 self.api_client.set_default_header(
                     header, additional_login_header[header])
 
+        # every generated API call passes ApiClient.call_api, no reference
+        # cycle so that __del__ still logs out unshared sessions
+        self._call_api = self.api_client.call_api
+        connection = weakref.proxy(self)
+        self.api_client.call_api = lambda *args, **kwargs: \
+            connection.call_api(*args, **kwargs)
+
         try:
-            api_token = self.session_api.do_login(body=credentials)
-            self.api_client.default_headers.setdefault(
-                'Authorization', 'Bearer ' + api_token.token)
+            self.renew()
             self.logged_in = True
             if _localDebugFunctions:
                 logger.debug('CTM: API Login: %s', True)
-                logger.debug('CTM: API Bearer: %s', api_token.token)
+                logger.debug('CTM: API Bearer: %s', self.token)
         except (NewConnectionError, MaxRetryError,
                 ctm.rest.ApiException) as exp:
             logger.error('CTM: connection error occurred: %s', exp)
             exit(42)
 
+    def login(self):
+        '''
+        Log in to the Automation API
+
+        :return: bearer token
+        :rtype: str
+        :raises ApiException: login failed
+        '''
+        api_token = self.session_api.do_login(body=self.credentials)
+        return api_token.token
+
+    def renew(self, token=None, rejected=False):
+        '''
+        Set a valid bearer token, from the session cache if enabled
+
+        :param str token: token to replace, None for the first login
+        :param bool rejected: token was refused by the Automation API
+        :return: None
+        :raises ApiException: login failed
+        '''
+        with self.lock:
+            if token is not None and token != self.token:
+                # renewed by another thread
+                return
+            if self.session_cache is None:
+                self.token = self.login()
+                self.expires = float("inf")
+            else:
+                if rejected:
+                    self.session_cache.invalidate(self.session_key, token)
+                (self.token, self.expires) = self.session_cache.get(
+                    self.session_key, self.login)
+            self.api_client.default_headers['Authorization'] = \
+                'Bearer ' + self.token
+
+    def call_api(self, resource_path, *args, **kwargs):
+        response = self._call_api_session(resource_path, *args, **kwargs)
+        if kwargs.get("_preload_content") is False and \
+                kwargs.get("response_type"):
+            # raw response, decodeCtmApiResponse converts it like the model
+            try:
+                response.ctm_response_type = kwargs["response_type"]
+            except AttributeError:
+                pass
+        return response
+
+    def _call_api_session(self, resource_path, *args, **kwargs):
+        # renew the token before it expires and once after a 401 response
+        if kwargs.get("_request_timeout") is None:
+            kwargs["_request_timeout"] = self.timeout
+        if resource_path.startswith("/session/"):
+            return self._call_api(resource_path, *args, **kwargs)
+        token = self.token
+        if self.session_cache is not None and \
+                self.expires - self.session_cache.refresh <= time.time():
+            self.renew(token=token)
+            token = self.token
+        try:
+            return self._call_api(resource_path, *args, **kwargs)
+        except ctm.rest.ApiException as exp:
+            if getattr(exp, "status", None) != 401:
+                raise
+            logger.debug('CTM: API Token rejected: %s', resource_path)
+            self.renew(token=token, rejected=True)
+            return self._call_api(resource_path, *args, **kwargs)
+
     def __del__(self):
-        if self.session_api is not None:
+        if self.session_api is not None and self.session_cache is None:
             try:
                 self.logout()
             except ImportError:
@@ -197,6 +539,9 @@ class CtmConnection(object):
     def logout(self):
         if self.logged_in:
             try:
+                if self.session_cache is not None:
+                    # other processes must not use the token anymore
+                    self.session_cache.pop(self.session_key)
                 self.session_api.do_logout()
                 self.logged_in = False
                 if _localDebugAdvanced:
@@ -211,6 +556,80 @@ class CtmConnection(object):
 
 # Main function
 
+# controlm_py types, as in the response_type of the generated API methods
+_ctmApiTypeList = re.compile(r"^list\[(.*)\]$")
+_ctmApiTypeDict = re.compile(r"^dict\(([^,]*), (.*)\)$")
+_ctmApiTypeNative = {"int": int, "float": float, "str": str, "bool": bool}
+
+
+def getCtmApiValue(data, type):
+    '''
+    Convert decoded JSON like ApiClient.deserialize and model.to_dict() would,
+    the keys and defaults come from attribute_map and swagger_types of the model
+
+    :param data: decoded JSON
+    :param str type: controlm_py type, e.g. AgentDetailsList or list[str]
+    :return: value with model attribute names, None as "None"
+    :rtype: dict or list or str
+    '''
+    if data is None:
+        return "None"
+    if not type:
+        return data
+
+    match = _ctmApiTypeList.match(type)
+    if match:
+        return [getCtmApiValue(item, match.group(1)) for item in data]
+    match = _ctmApiTypeDict.match(type)
+    if match:
+        return {
+            key: getCtmApiValue(value, match.group(2))
+            for (key, value) in data.items()
+        }
+
+    native = _ctmApiTypeNative.get(type)
+    if native is not None:
+        try:
+            return native(data)
+        except (TypeError, ValueError):
+            return data
+    model = getattr(ctm.models, type, None)
+    swagger_types = getattr(model, "swagger_types", None)
+    if not swagger_types or not isinstance(data, dict):
+        # object, date, datetime and models without attributes
+        return data
+
+    attribute_map = model.attribute_map
+    return {
+        attr: getCtmApiValue(data.get(attribute_map[attr]), attr_type)
+        for (attr, attr_type) in swagger_types.items()
+    }
+
+
+def decodeCtmApiResponse(response, type=None):
+    '''
+    Decode a raw Automation API response, called with _preload_content=False.
+    The result has the same shape as the former str(model) conversion, no
+    model objects are built
+
+    :param response: urllib3 response or JSON bytes / str
+    :param str type: controlm_py type, default response_type of the API call
+    :return: decoded response
+    :rtype: dict or list
+    '''
+    if type is None:
+        type = getattr(response, "ctm_response_type", None)
+    if hasattr(response, "data"):
+        try:
+            data = response.data
+        finally:
+            response.release_conn()
+    else:
+        data = response
+    if not data:
+        return ""
+    return getCtmApiValue(json.loads(data), type)
+
 
 def getCtmAgents(ctmApiClient, ctmServer):
     """
@@ -221,7 +640,7 @@ def getCtmAgents(ctmApiClient, ctmServer):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
 
@@ -229,15 +648,10 @@ def getCtmAgents(ctmApiClient, ctmServer):
     try:
         logger.debug('CTM: API Function: %s', "get_agents")
         results = ctmCfgAapi.get_agents(server=ctmServer,
-                                        _return_http_data_only=True)
-        results = str(results).replace("\n", '')
-        results = str(results).replace("'", '"')
-        results = str(results).replace("None", '"None"')
-        results = str(results).replace('"                                 "',
-                                       '')
-
+                                        _return_http_data_only=True,
+                                        _preload_content=False)
+        results = decodeCtmApiResponse(results)
         # logger.debug('CTM: API Result:\n%s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -257,19 +671,17 @@ def getCtmServers(ctmApiClient):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
 
     # Call CTM AAPI
     try:
         logger.debug('CTM: API Function: %s', "get_servers")
-        results = ctmCfgAapi.get_servers(_return_http_data_only=True)
-        results = str(results).replace("'", '"')
-        results = str(results).replace("None", '"None"')
-
+        results = ctmCfgAapi.get_servers(_return_http_data_only=True,
+                                         _preload_content=False)
+        results = decodeCtmApiResponse(results)
         logger.debug('CTM: API Result:\n%s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -290,7 +702,7 @@ def getCtmServerParams(ctmApiClient, ctmServer):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
 
@@ -298,12 +710,10 @@ def getCtmServerParams(ctmApiClient, ctmServer):
     try:
         logger.debug('CTM: API Function: %s', "get_server_parameters")
         results = ctmCfgAapi.get_server_parameters(server=ctmServer,
-                                                   _return_http_data_only=True)
-        results = str(results).replace("'", '"')
-        results = str(results).replace("None", '"None"')
-
+                                                   _return_http_data_only=True,
+                                                   _preload_content=False)
+        results = decodeCtmApiResponse(results)
         logger.debug('CTM: API Result:\n%s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -328,7 +738,7 @@ def getCtmAgentConnectionProfile(ctmApiClient, ctmServer, ctmAgent,
     """
 
     # Instantiate the AAPI object
-    ctmDeployAapi = ctm.api.deploy_api.DeployApi(api_client=ctmApiClient)
+    ctmDeployAapi = getCtmApi(ctmApiClient, ctm.api.deploy_api.DeployApi)
     # logger.debug('CTM: API object: %s', ctmDeployAapi)
     results = ""
 
@@ -366,7 +776,7 @@ def getCtmCentralConnectionProfile(ctmApiClient, ctmAppType):
     """
 
     # Instantiate the AAPI object
-    ctmDeployAapi = ctm.api.deploy_api.DeployApi(api_client=ctmApiClient)
+    ctmDeployAapi = getCtmApi(ctmApiClient, ctm.api.deploy_api.DeployApi)
     # logger.debug('CTM: API object: %s', ctmDeployAapi)
     results = ""
 
@@ -403,53 +813,32 @@ def getDeployedAiJobtypes(ctmApiClient,
     """
 
     # Instantiate the AAPI object
-    ctmDeployAapi = ctm.api.deploy_api.DeployApi(api_client=ctmApiClient)
+    ctmDeployAapi = getCtmApi(ctmApiClient, ctm.api.deploy_api.DeployApi)
     # logger.debug('CTM: API object: %s', ctmDeployAapi)
     results = ""
-    jJobTypes = ""
 
     # Call CTM AAPI
     try:
         # logger.debug('CTM: API Function: %s', "get_deployed_connection_profiles")
         results = ctmDeployAapi.get_deployed_ai_jobtypes(
-            _return_http_data_only=True)
-        items = results.jobtypes
-        jJobTypes = ""
-        jJobType = ""
-        for item in items:
-            sTemp = str(item)
-            xTemp = str(sTemp).split("\n")
-            for yTemp in xTemp:
-                xLen = len(xTemp)
-                if xLen == 4:
-                    key = str(yTemp).split("'")[1]
-                    val = str(yTemp).split("'")[3]
-
-                    if "job_type_id" in key:
-                        job_type_id = val
-                    elif "job_type_name" in key:
-                        job_type_name = val
-                    elif "status" in key:
-                        job_status = val
-                    elif "description" in key:
-                        job_description = val
-
+            _return_http_data_only=True, _preload_content=False)
+        items = decodeCtmApiResponse(results).get("jobtypes", [])
+        lJobTypes = []
+        # reverse order of the response, as before
+        for item in reversed(items):
+            job_status = item.get("status", "")
             if ctmAiJobDeployStatus in job_status:
-                jJobType = '{"job_type_id":"' + job_type_id + '","job_type_name":"' + \
-                    job_type_name + '","status":"' + job_status + '"}'
-                jJobTypes = jJobType + "," + jJobTypes
+                lJobTypes.append({
+                    "job_type_id": item.get("job_type_id"),
+                    "job_type_name": item.get("job_type_name"),
+                    "status": job_status
+                })
             if _localDebugAdvanced:
-                logger.debug('CTM: AI Job Type: %s', jJobType)
-
-        jJobTypes = jJobTypes[:-1]
-        jResult = '{"jobtypes":[' + jJobTypes + ']}'
+                logger.debug('CTM: AI Job Type: %s', item)
+        results = {"jobtypes": lJobTypes}
 
         if _localDebugFunctions:
-            logger.debug('CTM: AI Job Types: %s', jResult)
-
-        # Format for function
-        sResult = str(jResult)
-        results = json.loads(sResult)
+            logger.debug('CTM: AI Job Types: %s', results)
 
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
@@ -474,7 +863,7 @@ def getCtmAgentParams(ctmApiClient, ctmServer, ctmAgent):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     # logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
 
@@ -483,29 +872,28 @@ def getCtmAgentParams(ctmApiClient, ctmServer, ctmAgent):
         # logger.debug('CTM: API Function: %s', "get_agent_parameters")
         results = ctmCfgAapi.get_agent_parameters(server=ctmServer,
                                                   agent=ctmAgent,
-                                                  _return_http_data_only=True)
-        results = str(results).replace("'", '"')
-        results = str(results).replace("None", '"None"')
-
+                                                  _return_http_data_only=True,
+                                                  _preload_content=False)
+        results = decodeCtmApiResponse(results)
         # logger.debug('CTM: API Result:\n%s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
 
 
-def getCtmJobOutput(ctmApiClient, ctmJobID, ctmJobRunId):
+def getCtmJobOutput(ctmApiClient, ctmJobID, ctmJobRunId, stream=False):
     """
     Get the output returned from a job
 
     :param async_req bool
     :param str job_id: The job ID (required)
     :param int run_no: The execution number in case of multiple executions (0 will get the last execution's output)
+    :param bool stream: return the unread HTTP response, see captureCtmJobOutput
     :return: str
                 If the method is called asynchronously, returns the request thread.
     """
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.RunApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.RunApi)
     if _localDebugFunctions:
         logger.debug('CTM: AAPI object: %s', ctmCfgAapi)
 
@@ -514,8 +902,13 @@ def getCtmJobOutput(ctmApiClient, ctmJobID, ctmJobRunId):
     try:
         if _localDebugFunctions:
             logger.debug('CTM: AAPI Function: %s', "get_job_output")
-        results = ctmCfgAapi.get_job_output(job_id=ctmJobID,
-                                            run_no=ctmJobRunId)
+        if stream:
+            results = ctmCfgAapi.get_job_output(job_id=ctmJobID,
+                                                run_no=ctmJobRunId,
+                                                _preload_content=False)
+        else:
+            results = ctmCfgAapi.get_job_output(job_id=ctmJobID,
+                                                run_no=ctmJobRunId)
         if _localDebugFunctions:
             logger.debug('CTM: AAPI Result: %s', results)
     except ctm.rest.ApiException as exp:
@@ -555,7 +948,7 @@ def getCtmArchiveJobLog(ctmApiClient, ctmJobID, ctmJobRunCounter):
     :return: list of named tuple: [{'key': 'value'}] access as list[0].key
     """
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.ArchiveApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.ArchiveApi)
     logger.debug('CTM: AAPI object: %s', ctmCfgAapi)
 
     # Call CTM AAPI
@@ -573,23 +966,29 @@ def getCtmArchiveJobLog(ctmApiClient, ctmJobID, ctmJobRunCounter):
     return results
 
 
-def getCtmArchiveJobOutput(ctmApiClient, ctmJobID, ctmJobRunId):
+def getCtmArchiveJobOutput(ctmApiClient, ctmJobID, ctmJobRunId, stream=False):
     """
     Get job output by unique job key
 
     :param api_client: property from CTMConnection object
+    :param bool stream: return the unread HTTP response, see captureCtmJobOutput
     :return: list of named tuple: [{'key': 'value'}] access as list[0].key
     """
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.ArchiveApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.ArchiveApi)
     logger.debug('CTM: AAPI object: %s', ctmCfgAapi)
 
     # Call CTM AAPI
     results = ""
     try:
         logger.debug('CTM: AAPI Function: %s', "get_archive_job_output")
-        results = ctmCfgAapi.get_archive_job_output(job_id=ctmJobID,
-                                                    run_no=ctmJobRunId)
+        if stream:
+            results = ctmCfgAapi.get_archive_job_output(job_id=ctmJobID,
+                                                        run_no=ctmJobRunId,
+                                                        _preload_content=False)
+        else:
+            results = ctmCfgAapi.get_archive_job_output(job_id=ctmJobID,
+                                                        run_no=ctmJobRunId)
         logger.debug('CTM: AAPI Result: %s', results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: AAPI Function: %s', "get_archive_job_output")
@@ -612,7 +1011,7 @@ def getCtmJobLog(ctmApiClient, ctmJobID):
     :return: list of named tuple: [{'key': 'value'}] access as list[0].key
     """
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.RunApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.RunApi)
 
     # Call CTM AAPI
     results = ""
@@ -658,7 +1057,7 @@ def getCtmJobStatus(ctmApiClient, ctmServer, ctmOrderID):
 
     # Instantiate the service aapi_client.api_client
     # ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiCli)
-    ctmCfgAapi = ctm.api.run_api.RunApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.run_api.RunApi)
     results = ""
     if ctmOrderID == "00000":
         if _localDebugFunctions:
@@ -671,7 +1070,7 @@ def getCtmJobStatus(ctmApiClient, ctmServer, ctmOrderID):
             if len(str(results)) > 0:
                 # Tranform to JSON, require result as dict
                 dResults = results.to_dict()
-                jResults = w3rkstatt.dTranslate4Json(data=dResults)
+                jResults = json.dumps(dResults, default=str)
                 if _localDebugFunctions:
                     logger.debug('CTM: API Function: %s', "get_job_status")
                     logger.debug('CTM: API Result: %s', results)
@@ -723,58 +1122,170 @@ def getCtmConnection():
         verify_ssl=ctm_ssl_ver,
         user=ctm_user,
         password=ctm_pwd_decrypted,
-        additional_login_header={'accept': 'application/json'})
+        additional_login_header={'accept': 'application/json'},
+        session_cache=getCtmSessionCache())
     return ctmApiCli
 
 
-def delCtmConnection(ctmApiObj):
-    ctmApiObj.logout()
-
-
-def ctmTest(ctmApiClient):
-    ctmReportInfo = runCtmReport(ctmApiClient=ctmApiClient,
-                                 ctmReportName=ctm_rpt_jsm)
-    ctmReportID = w3rkstatt.jsonExtractSimpleValue(ctmReportInfo, "id")
-    ctmReportInfo = getCtmReportStatus(ctmApiClient=ctmApiClient,
-                                       ctmReportID=ctmReportID)
-    ctmReportStatus = w3rkstatt.jsonExtractSimpleValue(ctmReportInfo, "status")
-
-    while (ctmReportStatus == "PROCESSING") or (
-            ctmReportStatus == "PENDING") or (ctmReportStatus != "SUCCEEDED"):
-        ctmReportInfo = getCtmReportStatus(ctmApiClient=ctmApiClient,
-                                           ctmReportID=ctmReportID)
-        ctmReportStatus = w3rkstatt.jsonExtractSimpleValue(
-            ctmReportInfo, "status")
-        time.sleep(10)
-
-    # ToDo: Review loop
-    # max_attempts = 6
-    # attempts = 0
-    # sleeptime = 10 #in seconds, no reason to continuously try if network is down
-    # while attempts < max_attempts:
-    #     time.sleep(sleeptime)
-    #     try:
-    #         ctmReportInfo   = getCtmReportStatus(ctmApiClient=ctmApiClient,ctmReportID=ctmReportID)
-    #         ctmReportStatus = w3rkstatt.jsonExtractSimpleValue(ctmReportInfo,"status")
-    #         if (ctmReportStatus == "SUCCEEDED"):
-    #             break
-    #     except:
-    #         attempts += 1
-    #         logger.debug('CTM: Report Status Loop: %s', attempts)
-
-    ctmReportUrl = w3rkstatt.jsonExtractSimpleValue(ctmReportInfo, "url")
-    ctmReportData = getCtmReportData(ctmReportUrl)
-    ctmReportJson = w3rkstatt.convertCsv2Json(data=ctmReportData,
-                                              keepDuplicate="last")
-
-    logger.info('CTM Report ID: %s', ctmReportID)
-    logger.info('CTM Report Status: %s', ctmReportStatus)
-    logger.info('CTM Report Url: %s', ctmReportUrl)
-    logger.info('CTM Report JSON: %s', ctmReportJson)
+def delCtmConnection(ctmApiObj, shutdown=False):
+    '''
+    Release a connection, a shared session stays logged in for the next
+    process unless shutdown is set
+
+    :param CtmConnection ctmApiObj: Automation API connection
+    :param bool shutdown: log out the shared session
+    :return: None
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    if shutdown or ctmApiObj.session_cache is None:
+        ctmApiObj.logout()
+
+
+def ctmTest(ctmApiClient, ctmReportNames=None):
+    if ctmReportNames is None:
+        ctmReportNames = [ctm_rpt_jsm]
+
+    for ctmReportInfo in runCtmReports(ctmApiClient=ctmApiClient,
+                                       ctmReportNames=ctmReportNames):
+        ctmReportName = ctmReportInfo["name"]
+        ctmReportStatus = ctmReportInfo["status"]
+        logger.info('CTM Report Name: %s', ctmReportName)
+        logger.info('CTM Report ID: %s', ctmReportInfo["id"])
+        logger.info('CTM Report Status: %s', ctmReportStatus)
+        if ctmReportStatus not in ctmReportDone:
+            continue
+
+        ctmReportUrl = ctmReportInfo["url"]
+        ctmReportFile = w3rkstatt.concatPath(path=dataFolder,
+                                             folder=str(ctmReportName) +
+                                             ".ndjson")
+        ctmReportRecords = w3rkstatt.writeNdjsonFile(
+            file=ctmReportFile,
+            batches=iterCtmReport(ctmReportUrl=ctmReportUrl,
+                                  keepDuplicate="last"))
+
+        logger.info('CTM Report Url: %s', ctmReportUrl)
+        logger.info('CTM Report Records: %s', ctmReportRecords)
+        logger.info('CTM Report File: %s', ctmReportFile)
 
     return
 
 
+def getCtmReportState(data):
+    '''
+    Status of a report info from runCtmReport or getCtmReportStatus
+
+    :param str data: report info in JSON format
+    :return: status, e.g. PROCESSING, SUCCEEDED, FAILED
+    :rtype: str
+    '''
+    try:
+        return str(json.loads(data).get("status", "")).upper()
+    except (ValueError, TypeError, AttributeError):
+        return ""
+
+
+def runCtmReports(ctmApiClient, ctmReportNames, deadline=0):
+    '''
+    Run reports concurrently and yield each report info once it is finished
+
+    Reports are submitted on the Control-M worker pool, the status is polled
+    with exponential backoff, CTM.reports.delay / backoff / limit. Reports not
+    finished before the deadline are yielded with status TIMEOUT, reports that
+    could not be submitted with status FAILED.
+
+    :param ApiClient ctmApiClient: Control-M API client
+    :param list ctmReportNames: report names
+    :param int deadline: seconds for all reports, CTM.reports.deadline
+    :return: generator of report info dicts: type, id, name, format, url, status
+    :rtype: generator
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    if not deadline:
+        deadline = ctm_rpt_deadline
+    expires = time.monotonic() + float(deadline)
+    finished = queue.Queue()
+    scheduler = getCtmReportScheduler()
+
+    def done(ctmReportName, data, status):
+        ctmReportInfo = {
+            "type": "CTM Report Info",
+            "id": "",
+            "name": ctmReportName,
+            "format": "",
+            "url": "",
+            "status": status
+        }
+        try:
+            ctmReportInfo.update(json.loads(data))
+        except (ValueError, TypeError):
+            pass
+        ctmReportInfo["name"] = ctmReportName
+        if status:
+            ctmReportInfo["status"] = status
+        finished.put(ctmReportInfo)
+
+    def polled(ctmReportName, data, status):
+        if status:
+            done(ctmReportName, data, "")
+        else:
+            done(ctmReportName, data, "TIMEOUT")
+
+    def submit(ctmReportName):
+        data = runCtmReport(ctmApiClient=ctmApiClient,
+                            ctmReportName=ctmReportName)
+        ctmReportID = w3rkstatt.jsonExtractSimpleValue(data, "id")
+        if not ctmReportID or getCtmReportState(data) in ctmReportFailed:
+            done(ctmReportName, data, "FAILED")
+            return
+        scheduler.retry(
+            func=getCtmReportStatus,
+            args={
+                "ctmApiClient": ctmApiClient,
+                "ctmReportID": ctmReportID
+            },
+            check=lambda data: getCtmReportState(
+                data) in ctmReportDone + ctmReportFailed,
+            callback=lambda data, status: polled(ctmReportName, data, status),
+            deadline=max(0, expires - time.monotonic()),
+            **ctm_rpt_retry)
+
+    def submitted(future, ctmReportName):
+        if future.exception() is not None:
+            logger.error('CTM: Report Error: %s', future.exception())
+            done(ctmReportName, None, "FAILED")
+
+    pending = set(ctmReportNames)
+    for ctmReportName in pending:
+        future = getCtmTaskPool().submit(submit, ctmReportName)
+        future.add_done_callback(lambda future, ctmReportName=ctmReportName:
+                                 submitted(future, ctmReportName))
+
+    while len(pending) > 0:
+        try:
+            ctmReportInfo = finished.get(
+                timeout=max(0, expires - time.monotonic()) + 1)
+        except queue.Empty:
+            break
+        pending.discard(ctmReportInfo["name"])
+        logger.debug('CTM: Report Finished: %s', ctmReportInfo)
+        yield ctmReportInfo
+
+    # submission or polling did not report back in time
+    for ctmReportName in pending:
+        logger.error('CTM: Report Timeout: %s', ctmReportName)
+        yield {
+            "type": "CTM Report Info",
+            "id": "",
+            "name": ctmReportName,
+            "format": "",
+            "url": "",
+            "status": "TIMEOUT"
+        }
+
+
 def runCtmReport(ctmApiClient, ctmReportName):
     """
     Simple function that uses the ABC service to get a the report of the specified Control-M Server.
@@ -783,7 +1294,7 @@ def runCtmReport(ctmApiClient, ctmReportName):
     :return: list of named tuple: [{'key': 'value'}] access as list[0].key
     """
     # Instantiate the AAPI object
-    ctmRptAapi = ctm.api.reporting_api.ReportingApi(api_client=ctmApiClient)
+    ctmRptAapi = getCtmApi(ctmApiClient, ctm.api.reporting_api.ReportingApi)
     logger.debug('CTM: API object: %s', ctmRptAapi)
     # RunReport | The report generation parameters
     ctmReportRun = ctm.RunReport(name=ctmReportName, format="csv")
@@ -824,7 +1335,7 @@ def getCtmReportStatus(ctmApiClient, ctmReportID):
     :return: list of named tuple: [{'key': 'value'}] access as list[0].key
     """
     # Instantiate the AAPI object
-    ctmRptAapi = ctm.api.reporting_api.ReportingApi(api_client=ctmApiClient)
+    ctmRptAapi = getCtmApi(ctmApiClient, ctm.api.reporting_api.ReportingApi)
     logger.debug('CTM: API object: %s', ctmRptAapi)
     # Call CTM AAPI
     try:
@@ -898,6 +1409,85 @@ def getCtmReportData(ctmReportUrl):
         # exit()
 
 
+def getCtmReportFile(ctmReportUrl, file, chunkSize=0):
+    '''
+    Download a report to a file in chunks, the report is never held in memory
+
+    :param str ctmReportUrl: report url from getCtmReportStatus
+    :param str file: target file name, fully qualified
+    :param int chunkSize: download chunk in bytes
+    :return: file name or None on error
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    if not chunkSize:
+        chunkSize = ctm_rpt_chunk_size
+    headers = {
+        'content-type': "application/json",
+        'cache-control': "no-cache",
+    }
+
+    logger.debug('HTTP API Url: %s', ctmReportUrl)
+    logger.debug('HTTP Headers: %s', headers)
+
+    try:
+        with requests.get(ctmReportUrl,
+                          headers=headers,
+                          verify=False,
+                          stream=True) as response:
+            rsc = response.status_code
+            if rsc != 200:
+                logger.error('HTTP Response Status: %s', rsc)
+                return None
+            size = 0
+            with open(file, "wb") as reportFile:
+                for chunk in response.iter_content(chunk_size=chunkSize):
+                    reportFile.write(chunk)
+                    size += len(chunk)
+    except requests.RequestException as e:
+        logger.error('HTTP Response Error: %s', e)
+        return None
+
+    logger.debug('CTM: Report File: %s', file)
+    logger.debug('CTM: Report Size: %s', size)
+    return file
+
+
+def iterCtmReport(ctmReportUrl,
+                  keepDuplicate=False,
+                  replaceEmpty=False,
+                  batchSize=0):
+    '''
+    Download a csv report and yield typed record batches
+
+    The download is spooled to a temporary file, which is removed when
+    the generator is exhausted or closed.
+
+    :param str ctmReportUrl: report url from getCtmReportStatus
+    :param str keepDuplicate: "first", "last" or False to drop all duplicates
+    :param boolean replaceEmpty: replace empty field with default value
+    :param int batchSize: records per batch
+    :return: generator of record lists
+    :rtype: generator
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    if not batchSize:
+        batchSize = ctm_rpt_batch_size
+    handle, file = tempfile.mkstemp(prefix="ctm-report-", suffix=".csv")
+    os.close(handle)
+    try:
+        if getCtmReportFile(ctmReportUrl=ctmReportUrl, file=file) is None:
+            return
+        yield from w3rkstatt.iterCsvFile(file=file,
+                                         keepDuplicate=keepDuplicate,
+                                         replaceEmpty=replaceEmpty,
+                                         batchSize=batchSize)
+    finally:
+        os.remove(file)
+
+
 def getCtmHostGroupMembers(ctmApiClient, ctmServer, ctmHostGroup):
     """get hostgroup agents  # noqa: E501
 
@@ -914,7 +1504,7 @@ def getCtmHostGroupMembers(ctmApiClient, ctmServer, ctmHostGroup):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     if _localDebugFunctions:
         logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
@@ -925,11 +1515,11 @@ def getCtmHostGroupMembers(ctmApiClient, ctmServer, ctmHostGroup):
             logger.debug('CTM: API Function: %s', "get_hosts_in_group")
         results = ctmCfgAapi.get_hosts_in_group(server=ctmServer,
                                                 hostgroup=ctmHostGroup,
-                                                _return_http_data_only=True)
-        results = str(results).replace("'", '"')
+                                                _return_http_data_only=True,
+                                                _preload_content=False)
+        results = decodeCtmApiResponse(results)
         if _localDebugFunctions:
             logger.debug('CTM: API Result: %s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -950,7 +1540,7 @@ def getCtmHostGroups(ctmApiClient, ctmServer):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     if _localDebugFunctions:
         logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
@@ -960,11 +1550,11 @@ def getCtmHostGroups(ctmApiClient, ctmServer):
         if _localDebugFunctions:
             logger.debug('CTM: API Function: %s', "get_hosts_in_group")
         results = ctmCfgAapi.get_hostgroups(server=ctmServer,
-                                            _return_http_data_only=True)
-        results = str(results).replace("'", '"')
+                                            _return_http_data_only=True,
+                                            _preload_content=False)
+        results = decodeCtmApiResponse(results)
         if _localDebugFunctions:
             logger.debug('CTM: API Result: %s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -985,7 +1575,7 @@ def getCtmRemoteHosts(ctmApiClient, ctmServer):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     if _localDebugFunctions:
         logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
@@ -995,11 +1585,11 @@ def getCtmRemoteHosts(ctmApiClient, ctmServer):
         if _localDebugFunctions:
             logger.debug('CTM: API Function: %s', "get_remote_hosts")
         results = ctmCfgAapi.get_remote_hosts(server=ctmServer,
-                                              _return_http_data_only=True)
-        results = str(results).replace("'", '"')
+                                              _return_http_data_only=True,
+                                              _preload_content=False)
+        results = decodeCtmApiResponse(results)
         if _localDebugFunctions:
             logger.debug('CTM: API Result: %s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -1021,7 +1611,7 @@ def getRemoteHostProperties(ctmApiClient, ctmServer, ctmRemoteHost):
     """
 
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.config_api.ConfigApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.config_api.ConfigApi)
     if _localDebugFunctions:
         logger.debug('CTM: API object: %s', ctmCfgAapi)
     results = ""
@@ -1045,6 +1635,25 @@ def getRemoteHostProperties(ctmApiClient, ctmServer, ctmRemoteHost):
 
 
 def getCtmJobInfo(ctmApiClient, ctmServer, ctmOrderID):
+    jData = getCtmJobInfoData(ctmApiClient=ctmApiClient,
+                              ctmServer=ctmServer,
+                              ctmOrderID=ctmOrderID)
+    sData = json.dumps(jData)
+    return sData
+
+
+def getCtmJobInfoData(ctmApiClient, ctmServer, ctmOrderID):
+    '''
+    Get job info of a job run
+
+    :param ApiClient ctmApiClient: Automation API client
+    :param str ctmServer: Control-M server name
+    :param str ctmOrderID: job order id
+    :return: {"count", "status", "entries": [job info]}
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
     ctmJobInfo = getCtmJobStatus(ctmApiClient=ctmApiClient,
                                  ctmServer=ctmServer,
                                  ctmOrderID=ctmOrderID)
@@ -1060,7 +1669,7 @@ def getCtmJobInfo(ctmApiClient, ctmServer, ctmOrderID):
     iCounter = None
 
     # Assign default
-    jJobInfo = '{"count":' + str(None) + '}'
+    jJobInfo = {"count": None}
 
     if jRecords >= 1:
         sStatus = True
@@ -1097,17 +1706,14 @@ def getCtmJobInfo(ctmApiClient, ctmServer, ctmOrderID):
     elif jRecords == 0:
         sStatus = True
         iCounter = 0
-        jJobInfo = ctmJobInfo
+        jJobInfo = jData
 
-    xData = '{"count":' + str(iCounter) + ',"status":' + \
-        str(sStatus) + ',"entries":[' + str(jJobInfo) + ']}'
-    sData = w3rkstatt.dTranslate4Json(data=xData)
-    # jData = json.loads(sData)
+    jJobData = {"count": iCounter, "status": sStatus, "entries": [jJobInfo]}
 
     if _localDebugFunctions:
-        logger.debug('CTM Job Info: %s', sData)
+        logger.debug('CTM Job Info: %s', jJobData)
 
-    return sData
+    return jJobData
 
 
 def getCtmJobStatusAdv(ctmApiClient, ctmServer, ctmOrderID):
@@ -1152,7 +1758,7 @@ def getCtmDeployedFolder(ctmApiClient, ctmServer, ctmFolder):
                  returns the request thread.
         """
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.DeployApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.DeployApi)
     if _localDebugFunctions:
         logger.debug('CTM: AAPI object: %s', ctmCfgAapi)
 
@@ -1313,260 +1919,376 @@ def extractCtmOrderDate(data):
     return sDate
 
 
+def getCtmDataCenterHost(name):
+    '''
+    Get host of a data center from CTM.datacenter
+
+    :param str name: data center name
+    :return: host, "" if not configured
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    return w3rkstatt.getConfig().ctm.datacenters.get(str(name), "")
+
+
+def prewarmCtmHosts(ctmApiClient=None):
+    '''
+    Resolve data center hosts and their agents in the background
+
+    :param ctmApiClient: Automation API client, agents are skipped if None
+    :return: background thread
+    :rtype: Thread
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    datacenters = w3rkstatt.getConfig().ctm.datacenters
+
+    def prewarm():
+        lHosts = list(datacenters.values())
+        if ctmApiClient is not None:
+            for ctmServer in datacenters:
+                jAgents = getCtmAgents(ctmApiClient=ctmApiClient,
+                                       ctmServer=ctmServer)
+                if isinstance(jAgents, dict):
+                    for jAgent in jAgents.get("agents", []):
+                        lHosts.append(jAgent.get("nodeid"))
+        w3rkstatt.prewarmHosts(hostnames=lHosts,
+                               workers=int(ctm_job_workers)).join()
+
+    thread = threading.Thread(target=prewarm, name="ctm-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def resolveCtmAlertHosts(data):
+    '''
+    Resolve data center and host of a Control-M alert concurrently
+
+    :param dict data: Control-M alert
+    :return: hostname -> {"ip", "fqdn", "domain"}, missing if timed out
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    lHosts = []
+    data_center = data.get("data_center")
+    if data_center is not None:
+        lHosts.append(getCtmDataCenterHost(name=data_center))
+    lHosts.append(data.get("host_id"))
+    if "Component_machine" in data:
+        lHosts.append(data.get("Component_machine"))
+        lHosts.append(jCfgData["CTM"]["datacenter"][0]["host"])
+
+    tasks = {}
+    for hostname in lHosts:
+        if hostname is not None and len(str(hostname)) > 1:
+            tasks[hostname] = {
+                "func": w3rkstatt.getHostDetails,
+                "args": {
+                    "hostname": hostname
+                }
+            }
+
+    jHosts = w3rkstatt.runTaskGraph(tasks=tasks,
+                                    executor=getCtmTaskPool(),
+                                    timeout=ctm_job_timeout)
+    return {key: value for (key, value) in jHosts.items() if value}
+
+
+def getCtmAlertHost(hosts, hostname):
+    '''
+    Get resolved host details, resolve now if not resolved in advance
+
+    :param dict hosts: result of resolveCtmAlertHosts
+    :param str hostname: hostname
+    :return: {"ip", "fqdn", "domain"}
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    jHost = hosts.get(hostname)
+    if jHost is None:
+        jHost = w3rkstatt.getHostDetails(hostname=hostname)
+    return jHost
+
+
+ctmAlertClass = "BMC_ApplicationService"
+
+
+def transformCtmAlertTime(jCtmAlert, jState, key, value):
+    # send_time, last_time: alert date and calendar date of the job link
+    if value is not None or key == "send_time":
+        jCtmAlert[key] = extractCtmAlertDate(data=value)
+        jState["ctmUpdateDate"] = extractCtmAlertCal(value)
+
+
+def transformCtmAlertMemname(jCtmAlert, jState, key, value):
+    # Mainframe job type
+    if value is not None:
+        logger.debug('CTM Alert Entry: %s=%s', key, value)
+        if value == "None":
+            jState["ctmJobScript"] = None
+        else:
+            jState["ctmJobScript"] = value
+
+
+def transformCtmAlertXtime(jCtmAlert, jState, key, value):
+    # X-Alert
+    jCtmAlert[key] = extractCtmAlertDate(data=value)
+    jState["sAlertCat"] = "infrastructure"
+
+
+def transformCtmAlertRunCounter(jCtmAlert, jState, key, value):
+    if value is not None:
+        jState["ctmOrderId"] = jCtmAlert.get("order_id", "")
+        jState["ctmJobId"] = jCtmAlert.get("data_center", "") + ":" + \
+            jState["ctmOrderId"]
+
+
+def transformCtmAlertDataCenter(jCtmAlert, jState, key, value):
+    # get data center details from config josn
+    data_center = getCtmDataCenterHost(name=value)
+    jHost = {"ip": None, "fqdn": None, "domain": None}
+    if len(data_center) > 1:
+        jHost = getCtmAlertHost(hosts=jState["hosts"], hostname=data_center)
+    jState["data_center_ip"] = jHost["ip"]
+    jState["data_center_fqdn"] = jHost["fqdn"]
+    jState["data_center_dns"] = jHost["domain"]
+
+
+def transformCtmAlertHostId(jCtmAlert, jState, key, value):
+    if value is not None and len(value) > 0:
+        jHost = getCtmAlertHost(hosts=jState["hosts"], hostname=value)
+        jState["host_ip"] = jHost["ip"]
+        jState["host_ip_fqdn"] = jHost["fqdn"]
+        jState["host_ip_dns"] = jHost["domain"]
+
+
+def transformCtmAlertComponent(jCtmAlert, jState, key, value):
+    # X-Alert, component host and first data center of the config
+    jHost = getCtmAlertHost(hosts=jState["hosts"], hostname=value)
+    jState["host_ip"] = jHost["ip"]
+    jState["host_ip_fqdn"] = jHost["fqdn"]
+    jState["host_ip_dns"] = jHost["domain"]
+    jState["alias"] = ctmAlertClass + ":" + value + ":" + jHost["domain"]
+
+    jCtmAlert["data_center"] = jCfgData["CTM"]["datacenter"][0]["name"]
+    jHost = getCtmAlertHost(hosts=jState["hosts"],
+                            hostname=jCfgData["CTM"]["datacenter"][0]["host"])
+    jState["data_center_ip"] = jHost["ip"]
+    jState["data_center_fqdn"] = jHost["fqdn"]
+    jState["data_center_dns"] = jHost["domain"]
+
+
+def setCtmAlertHost(jState, host_name):
+    # resolve host of an agent, data center or component message
+    jState["host_name"] = host_name
+    jState["host_ip"] = w3rkstatt.getHostIP(hostname=host_name)
+    jState["host_ip_fqdn"] = w3rkstatt.getHostFqdn(hostname=host_name)
+    jState["host_ip_dns"] = w3rkstatt.getHostDomain(hostname=host_name)
+
+
+def transformCtmAlertAgent(jCtmAlert, jState, value):
+    # STATUS OF AGENT PLATFORM <host> CHANGED TO <status>
+    sTemp = value.split()
+    setCtmAlertHost(jState, sTemp[4])
+    jCtmAlert["host_id"] = sTemp[4]
+    jState["alias"] = ctmAlertClass + ":" + sTemp[4] + ":" + \
+        jState["host_ip_dns"]
+    jState["sAgentStatus"] = sTemp[7]
+    jState["sAlertCat"] = "agent"
+
+
+def transformCtmAlertDataCenterStatus(jCtmAlert, jState, value):
+    # DATA CENTER <host> WAS <status>
+    sTemp = value.split()
+    setCtmAlertHost(jState, sTemp[2])
+    jState["alias"] = ctmAlertClass + ":" + sTemp[2] + ":" + \
+        jState["host_ip_dns"]
+    jState["sDataCenterStatus"] = sTemp[4]
+    jState["sAlertCat"] = "datacenter"
+
+
+def transformCtmAlertConfigAgent(jCtmAlert, jState, value):
+    # Distributed Control-M/EM Configuration Agent <host> ...
+    sTemp = value.split()
+    setCtmAlertHost(jState, sTemp[2])
+    jCtmAlert['host_id'] = jState["host_ip_fqdn"]
+    jState["sAlertCat"] = "infrastructure"
+    if "not responding" in value:
+        jCtmAlert['system_status'] = "Not responding"
+    else:
+        jCtmAlert['system_status'] = "TBD"
+
+
+def transformCtmAlertJobEnded(jCtmAlert, jState, value):
+    # Ended not OK
+    jState["ctmOrderId"] = jCtmAlert.get("order_id", "")
+    ctmJobRunId = jCtmAlert.get("data_center", "") + ":" + \
+        jState["ctmOrderId"]
+    job_name = jCtmAlert.get("job_name", "")
+    run_counter = jCtmAlert.get("run_counter", "")
+    jState["summary"] = "Job " + job_name + " failed"
+    jState["notes"] = "CTRL-M Job " + job_name + " failed. Job ID: " + \
+        ctmJobRunId + " with Job Run Count: " + run_counter
+    jState["sAlertCat"] = "job"
+    jState["sSystemStatus"] = "failed"
+
+
+def transformCtmAlertJobFailed(jCtmAlert, jState, value):
+    # Failed to order, BIM / SIM
+    jState["ctmOrderId"] = jCtmAlert.get("order_id", "")
+    ctmJobRunId = jCtmAlert.get("data_center", "") + ":" + \
+        jState["ctmOrderId"]
+    job_name = jCtmAlert.get("job_name", "")
+    run_counter = jCtmAlert.get("run_counter", "")
+    if job_name is None:
+        jState["summary"] = value
+        jState["notes"] = "CTRL-M Job failed. Job ID: " + \
+            ctmJobRunId + " with Job Run Count: " + run_counter
+    else:
+        jState["summary"] = "Job " + job_name + " failed"
+        jState["notes"] = "CTRL-M Job " + job_name + " failed. Job ID: " + \
+            ctmJobRunId + " with Job Run Count: " + run_counter
+    jState["sAlertCat"] = "job"
+    jState["sSystemStatus"] = "failed"
+
+
+# Alert message classification, the first rule found in the message wins
+ctmAlertMessageRules = (
+    ("STATUS OF AGENT PLATFORM", transformCtmAlertAgent),
+    ("DATA CENTER", transformCtmAlertDataCenterStatus),
+    ("Distributed Control-M/EM Configuration Agent",
+     transformCtmAlertConfigAgent),
+    ("Ended not OK", transformCtmAlertJobEnded),
+    ("Failed to order", transformCtmAlertJobFailed),
+    ("BIM / SIM", transformCtmAlertJobFailed),
+)
+# one scan, the lookahead reports every rule at every position
+_ctmAlertMessage = re.compile("(?=" + "|".join(
+    "(" + re.escape(sRule) + ")"
+    for (sRule, func) in ctmAlertMessageRules) + ")")
+
+
+def classifyCtmAlertMessage(data):
+    '''
+    Find the rule of an alert message, same result as testing the rules
+    one after the other with "in"
+
+    :param str data: alert message
+    :return: message transformer or None
+    :rtype: function
+    '''
+    iRule = len(ctmAlertMessageRules)
+    for match in _ctmAlertMessage.finditer(data):
+        iRule = min(iRule, match.lastindex - 1)
+        if iRule == 0:
+            break
+    if iRule < len(ctmAlertMessageRules):
+        return ctmAlertMessageRules[iRule][1]
+    return None
+
+
+def transformCtmAlertMessage(jCtmAlert, jState, key, value):
+    func = classifyCtmAlertMessage(value)
+    if func is None:
+        jState["summary"] = value
+        jState["notes"] = value
+    else:
+        func(jCtmAlert, jState, value)
+
+
+def transformCtmAlertXMessage(jCtmAlert, jState, key, value):
+    # X-Alert message
+    jState["summary"] = value
+    jState["notes"] = "CTRL-M Component " + value + ". Managed by: " + \
+        jState["host_ip_fqdn"]
+    if "Distributed Control-M/EM Configuration Agent" in value:
+        sTemp = value.split()
+        setCtmAlertHost(jState, sTemp[5])
+        jCtmAlert['host_id'] = jState["host_ip_fqdn"]
+        jState["alias"] = ctmAlertClass + ":" + sTemp[5] + ":" + \
+            jState["host_ip_dns"]
+        jState["sAlertCat"] = "infrastructure"
+        if "not responding" in value:
+            jState["sSystemStatus"] = "Not responding"
+        else:
+            jState["sSystemStatus"] = "TBD"
+
+
+def transformCtmAlertValue(func):
+    # alert value replaced by its translation
+    def transform(jCtmAlert, jState, key, value):
+        jCtmAlert[key] = func(data=value)
+
+    return transform
+
+
+# Alert key -> transformer(alert, state, key, value)
+ctmAlertTransformers = {
+    "call_type": transformCtmAlertValue(translateCtmAlertUpdateType),
+    "send_time": transformCtmAlertTime,
+    "last_time": transformCtmAlertTime,
+    "memname": transformCtmAlertMemname,
+    "Xtime": transformCtmAlertXtime,
+    "Xtime_of_last": transformCtmAlertValue(extractCtmAlertDate),
+    "alert_type": transformCtmAlertValue(extractCtmAlertType),
+    "severity": transformCtmAlertValue(translateCtmAlertSeverity),
+    "status": transformCtmAlertValue(translateCtmAlertStatus),
+    "run_counter": transformCtmAlertRunCounter,
+    "data_center": transformCtmAlertDataCenter,
+    "host_id": transformCtmAlertHostId,
+    "Component_machine": transformCtmAlertComponent,
+    "message": transformCtmAlertMessage,
+    "Message": transformCtmAlertXMessage,
+}
+
+
 def trasnformtCtmAlert(data):
-    alias = None
-    cdmclass = "BMC_ApplicationService"
-    ctmJobRunId = None
-    ctmOrderId = None
-    ctmJobId = None
-    ctmJobPlatform = None
-    ctmJobScript = None
-    data_center_ip = None
-    data_center_fqdn = None
-    data_center_dns = None
-    host_ip = None
-    host_ip_fqdn = None
-    host_ip_dns = None
-    summary = None
-    notes = None
-    sAgentStatus = None
-    sDataCenterStatus = None
-    ctmUpdateDate = None
-    sAlertCat = None
-    sSystemStatus = None
-
-    if "data_center" not in data:
-        data.update({'data_center': None})
-
-    if "host_id" not in data:
-        data.update({'host_id': None})
-
-    if "host_ip" not in data:
-        data.update({'host_ip': None})
-
-    if "host_ip_fqdn" not in data:
-        data.update({'host_ip_fqdn': None})
-
-    if "host_ip_dns" not in data:
-        data.update({'host_ip_dns': None})
-
-    if "system_status" not in data:
-        data.update({'system_status': None})
+    '''
+    Transform a Control-M alert, each key through ctmAlertTransformers
+
+    :param dict data: Control-M alert
+    :return: transformed alert, keys sorted
+    :rtype: dict
+    '''
+    jState = dict.fromkeys(
+        ("alias", "ctmOrderId", "ctmJobId", "ctmJobScript", "data_center_ip",
+         "data_center_fqdn", "data_center_dns", "host_ip", "host_ip_fqdn",
+         "host_ip_dns", "host_name", "summary", "notes", "sAgentStatus",
+         "sDataCenterStatus", "ctmUpdateDate", "sAlertCat", "sSystemStatus"))
+
+    for key in ("data_center", "host_id", "host_ip", "host_ip_fqdn",
+                "host_ip_dns", "system_status"):
+        if key not in data:
+            data.update({key: None})
 
     jCtmAlert = data
-    # ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center", data=jCtmAlert)
+    # resolve data center and job host concurrently
+    jState["hosts"] = resolveCtmAlertHosts(data=jCtmAlert)
     for (key, value) in jCtmAlert.items():
+        func = ctmAlertTransformers.get(key)
+        if func is not None:
+            func(jCtmAlert, jState, key, value)
 
-        if key == "call_type":
-            value = translateCtmAlertUpdateType(data=value)
-            jCtmAlert[key] = value
-        if key == "send_time":
-            data = value
-            value = extractCtmAlertDate(data=data)
-            jCtmAlert[key] = value
-            ctmUpdateDate = extractCtmAlertCal(data)
-        if key == "last_time":
-            if value is not None:
-                data = value
-                value = extractCtmAlertDate(data=data)
-                jCtmAlert[key] = value
-                ctmUpdateDate = extractCtmAlertCal(data)
-        # Mainframe job type
-        if key == "memname":
-            if value is not None:
-                logger.debug('CTM Alert Entry: %s=%s', key, value)
-                if value == "None":
-                    ctmJobScript = None
-                elif value != "None":
-                    ctmJobScript = value
-
-        # X-Alert
-        if key == "Xtime":
-            value = extractCtmAlertDate(data=value)
-            jCtmAlert[key] = value
-            sAlertCat = "infrastructure"
-        if key == "Xtime_of_last":
-            value = extractCtmAlertDate(data=value)
-            jCtmAlert[key] = value
-
-        if key == "alert_type":
-            value = extractCtmAlertType(data=value)
-            jCtmAlert[key] = value
-        if key == "severity":
-            value = translateCtmAlertSeverity(data=value)
-            jCtmAlert[key] = value
-        if key == "status":
-            value = translateCtmAlertStatus(data=value)
-            jCtmAlert[key] = value
-        if key == "run_counter":
-            if value is not None:
-                ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                                       data=jCtmAlert)
-                ctmOrderId = w3rkstatt.getJsonValue(path="$.order_id",
-                                                    data=jCtmAlert)
-                ctmJobId = ctmDataCenter + ":" + ctmOrderId
-        if key == "data_center":
-            # get data center details from config josn
-            # $.CTM.datacenter[?(@.name=='bmcbzos')].host
-            jQl = "$.CTM.datacenter[?(@.name=='" + str(value) + "')].host"
-            data_center = w3rkstatt.getJsonValue(path=jQl, data=jCfgData)
-            if len(data_center) > 1:
-                data_center_ip = w3rkstatt.getHostIP(hostname=data_center)
-                data_center_fqdn = w3rkstatt.getHostFqdn(hostname=data_center)
-                data_center_dns = w3rkstatt.getHostDomain(hostname=data_center)
-            else:
-                data_center_ip = None
-                data_center_fqdn = None
-                data_center_dns = None
-        if key == "host_id":
-            if value is not None:
-                if len(value) > 0:
-                    host_ip = w3rkstatt.getHostIP(hostname=value)
-                    host_ip_fqdn = w3rkstatt.getHostFqdn(hostname=value)
-                    host_ip_dns = w3rkstatt.getHostDomain(hostname=value)
-
-        if key == "Component_machine":
-            host_ip = w3rkstatt.getHostIP(hostname=value)
-            host_ip_fqdn = w3rkstatt.getHostFqdn(hostname=value)
-            host_ip_dns = w3rkstatt.getHostDomain(hostname=value)
-            alias = cdmclass + ":" + value + ":" + host_ip_dns
-
-            data_center_name = jCfgData["CTM"]["datacenter"][0]["name"]
-            data_center_host = jCfgData["CTM"]["datacenter"][0]["host"]
-            jCtmAlert["data_center"] = data_center_name
-
-            data_center_ip = w3rkstatt.getHostIP(hostname=data_center_host)
-            data_center_fqdn = w3rkstatt.getHostFqdn(hostname=data_center_host)
-            data_center_dns = w3rkstatt.getHostDomain(
-                hostname=data_center_host)
-
-        if key == "message":
-            if "STATUS OF AGENT PLATFORM" in value:
-                sTemp = value.split()
-                host_name = sTemp[4]
-                host_ip = w3rkstatt.getHostIP(hostname=host_name)
-                host_ip_fqdn = w3rkstatt.getHostFqdn(hostname=host_name)
-                host_ip_dns = w3rkstatt.getHostDomain(hostname=host_name)
-                jCtmAlert["host_id"] = host_name
-                alias = cdmclass + ":" + host_name + ":" + host_ip_dns
-                sAgentStatus = sTemp[7]
-                sAlertCat = "agent"
-            elif "DATA CENTER" in value:
-                sTemp = value.split()
-                host_name = sTemp[2]
-                host_ip = w3rkstatt.getHostIP(hostname=host_name)
-                host_ip_fqdn = w3rkstatt.getHostFqdn(hostname=host_name)
-                host_ip_dns = w3rkstatt.getHostDomain(hostname=host_name)
-                alias = cdmclass + ":" + host_name + ":" + host_ip_dns
-                sDataCenterStatus = sTemp[4]
-                sAlertCat = "datacenter"
-            elif "Distributed Control-M/EM Configuration Agent" in value:
-                sTemp = value.split()
-                host_name = sTemp[2]
-                host_ip = w3rkstatt.getHostIP(hostname=host_name)
-                host_ip_fqdn = w3rkstatt.getHostFqdn(hostname=host_name)
-                host_ip_dns = w3rkstatt.getHostDomain(hostname=host_name)
-                jCtmAlert['host_id'] = host_ip_fqdn
-
-                # alias = cdmclass + ":" + host_name + ":" + host_ip_dns
-                # sCtmComponenttatus = sTemp[4]
-                sAlertCat = "infrastructure"
-                if "not responding" in value:
-                    jCtmAlert['system_status'] = "Not responding"
-                else:
-                    jCtmAlert['system_status'] = "TBD"
-
-            elif "Ended not OK" in value:
-                ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                                       data=jCtmAlert)
-                ctmOrderId = w3rkstatt.getJsonValue(path="$.order_id",
-                                                    data=jCtmAlert)
-                ctmJobRunId = ctmDataCenter + ":" + ctmOrderId
-                job_name = w3rkstatt.getJsonValue(path="$.job_name",
-                                                  data=jCtmAlert)
-                run_counter = w3rkstatt.getJsonValue(path="$.run_counter",
-                                                     data=jCtmAlert)
-                summary = "Job " + job_name + " failed"
-                notes = "CTRL-M Job " + job_name + " failed. Job ID: " + \
-                    ctmJobRunId + " with Job Run Count: " + run_counter
-                sAlertCat = "job"
-                sSystemStatus = "failed"
-            elif "Failed to order" in value:
-                ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                                       data=jCtmAlert)
-                ctmOrderId = w3rkstatt.getJsonValue(path="$.order_id",
-                                                    data=jCtmAlert)
-                ctmJobRunId = ctmDataCenter + ":" + ctmOrderId
-                job_name = w3rkstatt.getJsonValue(path="$.job_name",
-                                                  data=jCtmAlert)
-                run_counter = w3rkstatt.getJsonValue(path="$.run_counter",
-                                                     data=jCtmAlert)
-
-                if job_name is None:
-                    summary = value
-                    notes = "CTRL-M Job failed. Job ID: " + \
-                        ctmJobRunId + " with Job Run Count: " + run_counter
-                else:
-                    summary = "Job " + job_name + " failed"
-                    notes = "CTRL-M Job " + job_name + " failed. Job ID: " + \
-                        ctmJobRunId + " with Job Run Count: " + run_counter
-                sAlertCat = "job"
-                sSystemStatus = "failed"
-            elif "BIM / SIM" in value:
-                ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                                       data=jCtmAlert)
-                ctmOrderId = w3rkstatt.getJsonValue(path="$.order_id",
-                                                    data=jCtmAlert)
-                ctmJobRunId = ctmDataCenter + ":" + ctmOrderId
-                job_name = w3rkstatt.getJsonValue(path="$.job_name",
-                                                  data=jCtmAlert)
-                run_counter = w3rkstatt.getJsonValue(path="$.run_counter",
-                                                     data=jCtmAlert)
-
-                if job_name is None:
-                    summary = value
-                    notes = "CTRL-M Job failed. Job ID: " + \
-                        ctmJobRunId + " with Job Run Count: " + run_counter
-                else:
-                    summary = "Job " + job_name + " failed"
-                    notes = "CTRL-M Job " + job_name + " failed. Job ID: " + \
-                        ctmJobRunId + " with Job Run Count: " + run_counter
-                sAlertCat = "job"
-                sSystemStatus = "failed"
-            else:
-                summary = value
-                notes = value
-
-        if key == "Message":
-            summary = value
-            notes = "CTRL-M Component " + value + ". Managed by: " + host_ip_fqdn
-            if "Distributed Control-M/EM Configuration Agent" in value:
-                sTemp = value.split()
-                host_name = sTemp[5]
-                host_ip = w3rkstatt.getHostIP(hostname=host_name)
-                host_ip_fqdn = w3rkstatt.getHostFqdn(hostname=host_name)
-                host_ip_dns = w3rkstatt.getHostDomain(hostname=host_name)
-                jCtmAlert['host_id'] = host_ip_fqdn
-
-                alias = cdmclass + ":" + host_name + ":" + host_ip_dns
-                # sCtmComponenttatus = sTemp[4]
-                sAlertCat = "infrastructure"
-                if "not responding" in value:
-                    sSystemStatus = "Not responding"
-                else:
-                    sSystemStatus = "TBD"
+    ctmOrderId = jState["ctmOrderId"]
+    summary = jState["summary"]
+    notes = jState["notes"]
+    sSystemStatus = jState["sSystemStatus"]
+    host_name = jState["host_name"]
+    host_ip_fqdn = jState["host_ip_fqdn"]
 
     if not ctmOrderId == "00000" and ctmOrderId is not None:
-        ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                               data=jCtmAlert)
+        ctmDataCenter = jCtmAlert.get("data_center", "")
         job_uri = "https://" + ctm_host + ":" + ctm_port + "/ControlM/#Search:id=Search_2&search=" + \
-            ctmOrderId + "&date=" + ctmUpdateDate + "&controlm=" + ctmDataCenter
-        jCtmAlert["job_id"] = ctmJobId
+            ctmOrderId + "&date=" + jState["ctmUpdateDate"] + "&controlm=" + ctmDataCenter
+        jCtmAlert["job_id"] = jState["ctmJobId"]
         jCtmAlert["job_uri"] = job_uri
 
+    sAgentStatus = jState["sAgentStatus"]
     if sAgentStatus is not None:
-        ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                               data=jCtmAlert)
+        ctmDataCenter = jCtmAlert.get("data_center", "")
         if "UNAVAILABLE" in sAgentStatus:
             jCtmAlert["severity"] = "MAJOR"
             summary = "Agent on " + host_name + " not availabble"
@@ -1581,9 +2303,9 @@ def trasnformtCtmAlert(data):
                 " availabble. Managed by: " + ctmDataCenter
             sSystemStatus = "availabble"
 
+    sDataCenterStatus = jState["sDataCenterStatus"]
     if sDataCenterStatus is not None:
-        ctmDataCenter = w3rkstatt.getJsonValue(path="$.data_center",
-                                               data=jCtmAlert)
+        ctmDataCenter = jCtmAlert.get("data_center", "")
         if "DISCONNECTED" in sDataCenterStatus:
             jCtmAlert["severity"] = "CRITICAL"
             summary = "Data Center " + ctmDataCenter + " was disconnected"
@@ -1597,46 +2319,58 @@ def trasnformtCtmAlert(data):
                 " on " + host_ip_fqdn + " availabble or connected."
             sSystemStatus = "connected"
 
-    jCtmAlert["data_center_ip"] = data_center_ip
-    jCtmAlert["data_center_fqdn"] = data_center_fqdn
-    jCtmAlert["data_center_dns"] = data_center_dns
-    jCtmAlert["host_ip"] = host_ip
+    jCtmAlert["data_center_ip"] = jState["data_center_ip"]
+    jCtmAlert["data_center_fqdn"] = jState["data_center_fqdn"]
+    jCtmAlert["data_center_dns"] = jState["data_center_dns"]
+    jCtmAlert["host_ip"] = jState["host_ip"]
     jCtmAlert["host_ip_fqdn"] = host_ip_fqdn
-    jCtmAlert["host_ip_dns"] = host_ip_dns
-    jCtmAlert["system_category"] = sAlertCat
+    jCtmAlert["host_ip_dns"] = jState["host_ip_dns"]
+    jCtmAlert["system_category"] = jState["sAlertCat"]
     jCtmAlert["system_status"] = sSystemStatus
-    jCtmAlert["system_class"] = alias
-    jCtmAlert["job_script"] = ctmJobScript
+    jCtmAlert["system_class"] = jState["alias"]
+    jCtmAlert["job_script"] = jState["ctmJobScript"]
 
     # CTM Agent issues
     jCtmAlert["message_summary"] = summary
     jCtmAlert["message_notes"] = notes
 
-    jCtmAlert = OrderedDict(sorted(jCtmAlert.items()))
-
-    for (key, value) in jCtmAlert.items():
-        if _localDebugFunctions:
+    if _localDebugFunctions:
+        for (key, value) in sorted(jCtmAlert.items()):
             logger.debug('CTM Alert Entry: %s=%s', key, value)
 
-    # Tweak final json
-    jCtmAlertData = json.dumps(jCtmAlert)
-    tCtmAlertData = w3rkstatt.jsonTranslateValues(jCtmAlertData)
-    xCtmAlertData = json.loads(tCtmAlertData)
-    jCtmAlert = jCtmAlertData
-
-    return jCtmAlert
+    return dict(sorted(jCtmAlert.items()))
 
 
 def transformCtmJobStatus(data):
     pass
 
 
+def getCtmJobOutputStatus(count, lines):
+    '''
+    Status of a job output, False if Control-M could not provide it
+
+    :param int count: number of lines
+    :param list lines: first lines
+    :return: status, None if there is no output
+    :rtype: bool
+    '''
+    sStatus = False
+    if count == 0:
+        sStatus = None
+    elif count == 2:
+        if "rejected" in lines[0] and "USER NOT AUTHORIZED" in lines[1]:
+            sStatus = False
+        else:
+            sStatus = True
+    elif count > 2:
+        sStatus = True
+    return sStatus
+
+
 def transformCtmJobOutput(data):
     jValue = {}
-    s = "\n"
     xList = [s for s in data.splitlines(True) if s.strip("\r\n")]
     yList = list(map(str.strip, xList))
-    sStatus = False
 
     i = 0
     for item in yList:
@@ -1644,204 +2378,222 @@ def transformCtmJobOutput(data):
         i += 1
 
     # {"count":2,"entries":[{"entry-0000": "Request  rejected by Data Center", "entry-0001": "ECS3010 USER NOT AUTHORIZED"}]}
-    xValue = json.dumps(jValue)
     iCounter = int(len(jValue))
-
-    if iCounter == 0:
-        sStatus = None
-    elif iCounter == 1:
-        sY1 = yList[0]
-        if "Failed" in sY1:
-            sStatus = False
-    elif iCounter == 2:
-        sY1 = yList[0]
-        sY2 = yList[1]
-        if "rejected" in sY1 and "USER NOT AUTHORIZED" in sY2:
-            sStatus = False
-        else:
-            sStatus = True
-    else:
-        sStatus = True
-
-    xData = '{"count":' + str(iCounter) + ',"status":' + \
-        str(sStatus) + ',"entries":[' + str(xValue) + ']}'
-    sData = w3rkstatt.dTranslate4Json(data=xData)
-    jData = json.loads(sData)
+    sStatus = getCtmJobOutputStatus(count=iCounter, lines=yList[:2])
+    jData = {"count": iCounter, "status": sStatus, "entries": [jValue]}
 
     if _localDebugFunctions:
-        logger.debug('CMT Job Output Transform Raw: %s', sData)
+        logger.debug('CMT Job Output Transform Raw: %s', jData)
 
     return jData
 
 
-def transformCtmJobLog(data):
-    lgo = []
-    log_list = []
-    jValue = {}
-    s = "\n"
-    xList = [s for s in data.splitlines(True) if s.strip("\r\n")]
-    yList = list(map(str.strip, xList))
-    sJobLogStatus = False
+def iterCtmJobOutputChunks(data, chunkSize=65536):
+    '''
+    Job output in byte chunks, from an unread HTTP response or a string
 
-    i = 0
-    # Extract Data from line
-    # 12:48:07 2-Apr-2021  ORDERED JOB:24; DAILY FORCED, ODATE 20210402   	5065
-    for item in yList:
-        log_data = {}
+    :param data: urllib3 response, bytes or str
+    :param int chunkSize: bytes per chunk
+    :return: generator of bytes
+    :rtype: generator
+    '''
+    if hasattr(data, "stream"):
+        try:
+            yield from data.stream(chunkSize)
+        finally:
+            data.release_conn()
+        return
+    if not data:
+        return
+    if not isinstance(data, bytes):
+        data = str(data)
+    for start in range(0, len(data), chunkSize):
+        chunk = data[start:start + chunkSize]
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        yield chunk
+
+
+def captureCtmJobOutput(data, fileName=""):
+    '''
+    Bounded job output, the first and last lines plus counts and a hash
+
+    The output is read in chunks, memory does not depend on its size.
+    If lines are left out, the full output is written to fileName.gz in
+    the data folder. Lines keep their entry number, the gap shows the
+    omitted lines.
+
+    :param data: urllib3 response from getCtmJobOutput(stream=True) or str
+    :param str fileName: spill file name without folder, empty: no spill
+    :return: count, status, entries, bytes, sha256, truncated, omitted, file
+    :rtype: dict
+    '''
+    head = int(ctm_job_output["head"])
+    tail = int(ctm_job_output["tail"])
+    lineBytes = int(ctm_job_output["line_bytes"])
+    spillBytes = (head + tail) * lineBytes
+    if not ctm_job_output["spill"]:
+        fileName = ""
 
-        sTemp = re.split(r'\s{2,}', item)
-        sTime = item.split()[0]
-        sDate = item.split()[1]
-        sMessage = sTemp[1].split("\t")[0]
-        sCtmCode = item.split("\t")[1]
+    jValue = {}
+    last = deque(maxlen=tail)
+    first = []
+    count = 0
+    size = 0
+    digest = hashlib.sha256()
+    buffered = []
+    spill = None
+    spillFile = ""
+    partial = b""
+
+    def decode(raw):
+        return raw[:lineBytes].decode("utf-8",
+                                      errors="replace").strip().replace(
+                                          "'", "")
+
+    def add(raw):
+        # lines between head and tail are only counted
+        nonlocal count
+        raw = raw.strip()
+        if not raw:
+            return
+        if len(first) < 2:
+            first.append(decode(raw))
+        if count < head:
+            jValue["entry-" + str(count).zfill(4)] = decode(raw)
+        else:
+            last.append((count, raw))
+        count += 1
 
-        if sCtmCode == "5100":
-            xTemp = sMessage.split()
-            log_data['oscompstat'] = xTemp[4].replace(".", "")
-            log_data['run_count'] = xTemp[6]
-            log_data['ended'] = extractCtmAlertDate(
-                data=xTemp[2].replace(".", ""))
-
-        log_data['time'] = sTime
-        log_data['date'] = sDate
-        log_data['message'] = sMessage
-        log_data['code'] = sCtmCode
-
-        log_wrapper = {}
-        log_wrapper['entry-' + str(i).zfill(4)] = log_data
-        log_list.append(log_wrapper)
-        i += 1
+    try:
+        for chunk in iterCtmJobOutputChunks(data):
+            size += len(chunk)
+            digest.update(chunk)
+            if spill is not None:
+                spill.write(chunk)
+            elif fileName:
+                buffered.append(chunk)
+
+            lines = (partial + chunk).split(b"\n")
+            # a line without end is kept up to lineBytes
+            partial = lines.pop()[:lineBytes]
+            for raw in lines:
+                add(raw)
+
+            # output exceeds the excerpt, keep the full output on disk
+            if spill is None and fileName and (size > spillBytes
+                                               or count > head + tail):
+                spillFile = w3rkstatt.concatPath(path=dataFolder,
+                                                 folder=fileName + ".gz")
+                spill = gzip.open(spillFile, "wb", compresslevel=6)
+                for item in buffered:
+                    spill.write(item)
+                buffered = []
+        add(partial)
+    except (OSError, urllib3.exceptions.HTTPError) as exp:
+        logger.error('CTM: Job Output Capture Error: %s', exp)
+    finally:
+        if spill is not None:
+            spill.close()
+
+    for number, raw in last:
+        jValue["entry-" + str(number).zfill(4)] = decode(raw)
+    jData = {
+        "count": count,
+        "status": getCtmJobOutputStatus(count=count, lines=first),
+        "entries": [jValue],
+        "bytes": size,
+        "sha256": digest.hexdigest()
+    }
+    if count > len(jValue):
+        jData["truncated"] = True
+        jData["omitted"] = count - len(jValue)
+    if spillFile:
+        jData["file"] = spillFile
 
-    # Convert event data to the JSON format required by the API.
-    jData = json.dumps(log_list)
-    if i == 0:
-        sJobLogStatus = None
-        jData = '{"count":0,"status":' + str(sJobLogStatus) + ',"entries":[]}'
-    else:
-        sJobLogStatus = True
-        jData = '{"count":' + str(i) + ',"status":' + \
-            str(sJobLogStatus) + ',"entries":[' + str(jData) + ']}'
+    if _localDebugFunctions:
+        logger.debug('CMT Job Output Capture: %s', jData)
 
-    # json_data = json.dumps(log_list)
-    jStatus = w3rkstatt.jsonValidator(data=jData)
-    if jStatus:
-        jData = json.loads(jData)
-        return jData
-    else:
-        jData = '{"count":1,"status":' + \
-            str(sJobLogStatus) + ',"entries":[' + str(jData) + ']}'
-        sData = w3rkstatt.dTranslate4Json(data=jData)
-        return sData
+    return jData
 
 
-def transformCtmJobLogMini(data, runCounter):
-    ctmJobRunCounter = runCounter.strip("0")
-    log_list = []
-    jValue = {}
-    s = "\n"
+def iterCtmJobLog(data, runCounter=""):
+    '''
+    Tokenize a job log in a single pass
+
+    Accepts the log text as well as the escaped b"..." form of the API
+    response. Completion entries, code 5100, carry oscompstat, run_count
+    and ended. With a run counter, completion entries of other runs are
+    skipped.
+
+    :param str data: job log
+    :param str runCounter: run counter of the job, e.g. 00002
+    :return: generator of entries: time, date, message, code
+    :rtype: generator
+    '''
+    text = str(data)
+    if text.startswith(('b"', "b'")):
+        text = text[2:-1].replace("\\n", "\n").replace("\\t", "\t")
+    runCounter = str(runCounter).strip().lstrip("0")
+
+    for line in _ctmJobLogLine.finditer(text):
+        sTime, sDate, sMessage, sCtmCode = line.groups()
+        entry = {
+            "time": sTime,
+            "date": sDate,
+            "message": sMessage.rstrip(),
+            "code": sCtmCode or ""
+        }
+        if sCtmCode == "5100":
+            ended = _ctmJobLogEnded.match(sMessage)
+            if ended is not None:
+                if runCounter and ended.group(3) != runCounter:
+                    continue
+                entry["oscompstat"] = ended.group(2).replace(".", "")
+                entry["run_count"] = ended.group(3)
+                entry["ended"] = extractCtmAlertDate(
+                    data=ended.group(1).replace(".", ""))
+        yield entry
 
-    if data.startswith('b"'):
-        start = data.find('b"') + 2
-        end = data.find('n"', start) + 1
-        pData = data[start:end]
-    else:
-        pData = data
 
-    pList = pData.split("\\n")
-    # xList = [s for s in pData.splitlines(True) if s.strip("\r\n")]
-    # yList = list(map(str.strip, xList))
-    sJobLogStatus = False
+def transformCtmJobLog(data):
+    '''
+    Job log with all entries
 
-    i = 0
-    # Extract Data from line
-    # 12:48:07 2-Apr-2021  ORDERED JOB:24; DAILY FORCED, ODATE 20210402   	5065
-    for item in pList:
-        log_data = {}
-        # Event Time
-
-        if (len(item) > 1 and not item.startswith("Event Time")):
-            sTemp = re.split(r'\s{2,}', item)
-            sTime = item.split()[0]
-            sDate = item.split()[1]
-
-            sMessage = sTemp[1]
-
-            # Get CTM Output Code
-            lTemp = len(sTemp)
-            if lTemp == 3:
-                sCodeTmp = sTemp[2]
-                if len(sCodeTmp) > 1:
-                    sCtmCode = sCodeTmp.split("\\t")[1]
-            else:
-                sCodeTmp = sMessage.split("\\t")
-                if len(sCodeTmp) > 1:
-                    sCtmCode = sCodeTmp[1]
-                    sMessage = sCodeTmp[0]
-
-            if "'" in sMessage:
-                sMessage = sMessage.replace("'", "--")
-
-            if "Failed to get job log" in sMessage:
-                # Build JSON
-                # log_wrapper = {}
-                # log_wrapper['entry-' + str(i).zfill(4)] = sMessage
-                # log_list.append(log_wrapper)
-
-                # construct json string
-                if i == 0:
-                    sEntry = '"entry-' + \
-                        str(i).zfill(4) + '":"' + sMessage + '"'
-                else:
-                    sEntry = sEntry + ',"entry-' + \
-                        str(i).zfill(4) + '":"' + sMessage + '"'
-
-                i += 1
-            else:
-                sJobLogStatus = True
-                if sCtmCode == "5100":
-                    xTemp = sMessage.split()
-                    zTemp = xTemp[6]
-                    if zTemp == ctmJobRunCounter:
-                        log_data['oscompstat'] = xTemp[4].replace(".", "")
-                        log_data['run_count'] = xTemp[6]
-                        log_data['ended'] = extractCtmAlertDate(
-                            data=xTemp[2].replace(".", ""))
-                        log_data['time'] = sTime
-                        log_data['date'] = sDate
-                        log_data['message'] = sMessage
-                        log_data['code'] = sCtmCode
-
-                        # Build JSON
-                        log_wrapper = {}
-                        log_wrapper['entry-' + str(i).zfill(4)] = log_data
-                        log_list.append(log_wrapper)
-
-                    i += 1
-                else:
-                    log_data['time'] = sTime
-                    log_data['date'] = sDate
-                    log_data['message'] = sMessage
-                    log_data['code'] = sCtmCode
-                    # Build JSON
-                    log_wrapper = {}
-                    log_wrapper['entry-' + str(i).zfill(4)] = log_data
-                    log_list.append(log_wrapper)
-
-                    i += 1
-
-    # custom json in case no access to CTM API
-    if sJobLogStatus:
-        xData = json.dumps(log_list)
-        jData = '{"count":' + str(i) + ',"status":' + \
-            str(sJobLogStatus) + ',"entries":[' + str(xData) + ']}'
-    else:
-        xData = '{' + sEntry + '}'
-        jData = '{"count":' + str(i) + ',"status":' + \
-            str(sJobLogStatus) + ',"entries":[' + str(xData) + ']}'
+    :param str data: job log
+    :return: count, status, entries
+    :rtype: dict
+    '''
+    entries = [{
+        "entry-" + str(i).zfill(4): entry
+    } for i, entry in enumerate(iterCtmJobLog(data))]
+    if len(entries) < 1:
+        return {"count": 0, "status": None, "entries": []}
+    return {"count": len(entries), "status": True, "entries": [entries]}
 
-    sData = w3rkstatt.dTranslate4Json(data=jData)
 
-    return sData
+def transformCtmJobLogMini(data, runCounter):
+    '''
+    Job log with completion entries of the given run only
+
+    :param str data: job log
+    :param str runCounter: run counter of the job
+    :return: count, status, entries
+    :rtype: dict
+    '''
+    entries = []
+    failed = {}
+    for entry in iterCtmJobLog(data, runCounter=runCounter):
+        if "Failed to get job log" in entry["message"]:
+            failed["entry-" + str(len(failed)).zfill(4)] = entry["message"]
+        else:
+            entries.append({"entry-" + str(len(entries)).zfill(4): entry})
+
+    if len(entries) > 0:
+        return {"count": len(entries), "status": True, "entries": [entries]}
+    if len(failed) < 1 and "Failed to get job log" in str(data):
+        failed["entry-0000"] = str(data).strip()
+    return {"count": len(failed), "status": False, "entries": [failed]}
 
 
 def updateCtmAlertCore(ctmApiClient,
@@ -1864,19 +2616,18 @@ def updateCtmAlertCore(ctmApiClient,
         ctmAlertUrgency + '","comment":"' + ctmAlertComment + '"}'
     sCtmAlertData = json.loads(sCtmAlertData)
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.run_api.RunApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.run_api.RunApi)
     results = ""
 
     # Call CTM AAPI
     try:
         results = ctmCfgAapi.update_alert(body=sCtmAlertData,
-                                          _return_http_data_only=True)
-        results = str(results).replace("'", '"')
-        results = str(results).replace("None", '"None"')
+                                          _return_http_data_only=True,
+                                          _preload_content=False)
+        results = decodeCtmApiResponse(results)
         if _localDebugFunctions:
             logger.debug('CTM: API Function: %s', "update_alert")
             logger.debug('CTM: API Result:\n%s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -1899,19 +2650,18 @@ def updateCtmAlertStatus(ctmApiClient, ctmAlertIDs, ctmAlertStatus="Reviewed"):
         '],"status":"' + ctmAlertStatus + '"}'
     sCtmAlertData = json.loads(sCtmAlertData)
     # Instantiate the AAPI object
-    ctmCfgAapi = ctm.api.run_api.RunApi(api_client=ctmApiClient)
+    ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.run_api.RunApi)
     results = ""
 
     # Call CTM AAPI
     try:
         results = ctmCfgAapi.update_alert_status(body=sCtmAlertData,
-                                                 _return_http_data_only=True)
-        results = str(results).replace("'", '"')
-        results = str(results).replace("None", '"None"')
+                                                 _return_http_data_only=True,
+                                                 _preload_content=False)
+        results = decodeCtmApiResponse(results)
         if _localDebugFunctions:
             logger.debug('CTM: API Function: %s', "update_alert_status")
             logger.debug('CTM: API Result:\n%s', results)
-        results = json.loads(results)
     except ctm.rest.ApiException as exp:
         logger.error('CTM: API Error: %s', exp)
     return results
@@ -1945,6 +2695,198 @@ def updateCtmAlert(ctmApiClient,
     return sCtmAlertData
 
 
+class CtmAlertUpdates(object):
+    """
+    Collect alert status and comment updates, one AAPI call per group
+    Updates with identical target values are grouped, a group is sent once
+    it has 'batch_size' alerts or is 'interval' seconds old. If a call fails
+    the alerts of the group are sent one by one to find the failing ids.
+    :property callback called per alert: callback(alert_id, update, status)
+    """
+
+    def __init__(self,
+                 batch_size=ctm_alert_batch_size,
+                 interval=ctm_alert_batch_interval,
+                 callback=None):
+        self.batch_size = int(batch_size)
+        self.interval = float(interval)
+        self.callback = callback
+        self.groups = {}
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def status(self, ctmApiClient, ctmAlertIDs, ctmAlertStatus="Reviewed"):
+        '''
+        Queue alert status update
+
+        :param ApiClient ctmApiClient: Automation API client
+        :param str ctmAlertIDs: alert ids, comma separated
+        :param str ctmAlertStatus: alert status
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        self._add(ctmApiClient, ctmAlertIDs, ("status", ctmAlertStatus))
+
+    def comment(self,
+                ctmApiClient,
+                ctmAlertIDs,
+                ctmAlertComment,
+                ctmAlertUrgency="Normal",
+                done=None):
+        '''
+        Queue alert comment and urgency update
+
+        :param ApiClient ctmApiClient: Automation API client
+        :param str ctmAlertIDs: alert ids, comma separated
+        :param str ctmAlertComment: alert comment
+        :param str ctmAlertUrgency: alert urgency
+        :param function done: done(status) once sent, status is alert id -> True / False
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        self._add(ctmApiClient, ctmAlertIDs,
+                  ("comment", ctmAlertComment, ctmAlertUrgency), done)
+
+    def _add(self, ctmApiClient, ctmAlertIDs, update, done=None):
+        lIds = [x.strip() for x in str(ctmAlertIDs).split(",") if x.strip()]
+        lFlush = []
+        with self.cond:
+            group = self.groups.get(update)
+            if group is None:
+                group = {"time": time.monotonic(), "ids": [], "done": []}
+                self.groups[update] = group
+            group["client"] = ctmApiClient
+            if done is not None:
+                group["done"].append((lIds, done))
+            for id in lIds:
+                if id not in group["ids"]:
+                    group["ids"].append(id)
+            if len(group["ids"]) >= self.batch_size:
+                lFlush.append((update, self.groups.pop(update)))
+            elif self.thread is None:
+                self.thread = threading.Thread(target=self._run,
+                                               name="ctm-alert-updates",
+                                               daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+        for update, group in lFlush:
+            self._send(update, group)
+
+    def _run(self):
+        while True:
+            lFlush = []
+            with self.cond:
+                while len(self.groups) < 1:
+                    self.cond.wait()
+                now = time.monotonic()
+                for update, group in list(self.groups.items()):
+                    if group["time"] + self.interval <= now:
+                        lFlush.append((update, self.groups.pop(update)))
+                if len(lFlush) < 1:
+                    wait = min(group["time"] for group in
+                               self.groups.values()) + self.interval - now
+                    self.cond.wait(wait)
+                    continue
+
+            for update, group in lFlush:
+                self._send(update, group)
+
+    def _call(self, ctmApiClient, update, ids):
+        jCtmAlertData = {"alertIds": [int(id) for id in ids]}
+        ctmCfgAapi = getCtmApi(ctmApiClient, ctm.api.run_api.RunApi)
+        if update[0] == "status":
+            jCtmAlertData["status"] = update[1]
+            results = ctmCfgAapi.update_alert_status(
+                body=jCtmAlertData,
+                _return_http_data_only=True,
+                _preload_content=False)
+        else:
+            jCtmAlertData["urgency"] = update[2]
+            jCtmAlertData["comment"] = update[1]
+            results = ctmCfgAapi.update_alert(body=jCtmAlertData,
+                                              _return_http_data_only=True,
+                                              _preload_content=False)
+        results = decodeCtmApiResponse(results)
+        if _localDebugFunctions:
+            logger.debug('CTM: API Function: %s', "update_alert " + update[0])
+            logger.debug('CTM: API Result:\n%s', results)
+        return results
+
+    def _send(self, update, group):
+        # returns alert id -> status
+        jStatus = {}
+        lIds = group["ids"]
+        for start in range(0, len(lIds), self.batch_size):
+            lChunk = lIds[start:start + self.batch_size]
+            try:
+                self._call(group["client"], update, lChunk)
+                for id in lChunk:
+                    jStatus[id] = True
+                continue
+            except Exception as exp:
+                if len(lChunk) < 2:
+                    logger.error('CTM: Alert %s Update Error: %s', lChunk[0],
+                                 exp)
+                    jStatus[lChunk[0]] = False
+                    continue
+
+            # find the failing alert ids
+            for id in lChunk:
+                try:
+                    self._call(group["client"], update, [id])
+                    jStatus[id] = True
+                except Exception as exp:
+                    logger.error('CTM: Alert %s Update Error: %s', id, exp)
+                    jStatus[id] = False
+
+        if self.callback is not None:
+            for id, status in jStatus.items():
+                self.callback(id, update, status)
+        for lDoneIds, done in group["done"]:
+            try:
+                done({id: jStatus.get(id, False) for id in lDoneIds})
+            except Exception as exp:
+                logger.error('CTM: Alert Update Callback Error: %s', exp)
+        return jStatus
+
+    def flush(self):
+        '''
+        Send all queued updates now
+
+        :return: alert id -> list of update status
+        :rtype: dict
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        with self.cond:
+            lFlush = list(self.groups.items())
+            self.groups = {}
+        jStatus = {}
+        for update, group in lFlush:
+            for id, status in self._send(update, group).items():
+                jStatus.setdefault(id, []).append(status)
+        return jStatus
+
+
+def getCtmAlertUpdates():
+    '''
+    Get shared alert update batcher
+
+    :return: alert update batcher
+    :rtype: CtmAlertUpdates
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global ctmAlertUpdates
+    if ctmAlertUpdates is None:
+        ctmAlertUpdates = CtmAlertUpdates(batch_size=ctm_alert_batch_size,
+                                          interval=ctm_alert_batch_interval)
+    return ctmAlertUpdates
+
+
 def updateCtmITSM(data):
     ctmEventType = w3rkstatt.getJsonValue(path="$.call_type", data=data)
 
@@ -2050,286 +2992,272 @@ def simplifyCtmJson(data):
     return dParameters
 
 
-def transformCtmBHOM(data, category):
-    json_ctm_data = json.loads(data)
-    json_data = {}
-    event_data = {}
-
-    if category == "infrastructure":
-        event_data['severity'] = 'WARNING'
-        event_data['CLASS'] = 'CTMX_EVENT'
-        event_data['msg'] = json_ctm_data["infraAlert"][0]["message_summary"]
-        event_data['details'] = json_ctm_data["infraAlert"][0]["message_notes"]
-
-        event_data['source_identifier'] = json_ctm_data["infraAlert"][0][
-            "host_id"]
-        event_data['source_hostname'] = json_ctm_data["infraAlert"][0][
-            "host_id"]
-        event_data['source_address'] = json_ctm_data["infraAlert"][0][
-            "host_ip"]
-
-        event_data['alias'] = json_ctm_data["infraAlert"][0]["system_class"]
-        event_data['status'] = 'OPEN'
-        event_data['priority'] = 'PRIORITY_3'
-        event_data['location'] = json_ctm_data["infraAlert"][0]["data_center"]
-        event_data['instancename'] = json_ctm_data["infraAlert"][0]["host_id"]
-        event_data['cdmclass'] = json_ctm_data["infraAlert"][0][
-            "system_class"].split(':')[0]
-        event_data['componentalias'] = json_ctm_data["infraAlert"][0][
-            "system_class"]
-        event_data['system_category'] = json_ctm_data["infraAlert"][0][
-            "system_category"]
-        event_data['system_status'] = json_ctm_data["infraAlert"][0][
-            "system_status"]
+# slot left out of the event when its source is missing
+ctmEventOmit = object()
+_ctmEventMissing = object()
 
-        # Control-M server name
-        event_data['ctmDataCenter'] = json_ctm_data["infraAlert"][0][
-            "data_center"]
-        # Alert update type 'I' Insert - new alert 'U' Update existing alert
-        event_data['ctmUpdateType'] = json_ctm_data["infraAlert"][0][
-            "call_type"]
-        # Control-M server name
-        event_data['ctmDataCenter'] = json_ctm_data["infraAlert"][0][
-            "data_center"]
-
-        event_data['xctmCallType'] = json_ctm_data["infraAlert"][0][
-            "call_type"]
-        event_data['xctmCompMachine'] = json_ctm_data["infraAlert"][0][
-            "Component_machine"]
-        event_data['xctmCompName'] = json_ctm_data["infraAlert"][0][
-            "Component_name"]
-        event_data['xctmCompType'] = json_ctm_data["infraAlert"][0][
-            "Component_type"]
-        event_data['xctmCounter'] = json_ctm_data["infraAlert"][0]["Counter"]
-        event_data['xctmKey1'] = json_ctm_data["infraAlert"][0]["Key1"]
-        event_data['xctmKey2'] = json_ctm_data["infraAlert"][0]["Key2"]
-        event_data['xctmKey3'] = json_ctm_data["infraAlert"][0]["Key3"]
-        event_data['xctmKey4'] = json_ctm_data["infraAlert"][0]["Key4"]
-        event_data['xctmKey5'] = json_ctm_data["infraAlert"][0]["Key5"]
-        event_data['xctmMessage'] = json_ctm_data["infraAlert"][0]["Message"]
-        event_data['xctmMessageId'] = json_ctm_data["infraAlert"][0][
-            "Message_id"]
-        event_data['xctmNote'] = json_ctm_data["infraAlert"][0]["Note"]
-        event_data['xctmSerial'] = json_ctm_data["infraAlert"][0]["Serial"]
-        event_data['xctmStatus'] = json_ctm_data["infraAlert"][0]["Status"]
-        event_data['xctmXSeverity'] = json_ctm_data["infraAlert"][0][
-            "Xseverity"]
-        event_data['xctmXTime'] = json_ctm_data["infraAlert"][0]["Xtime"]
-        event_data['xctmXTimeOFLast'] = json_ctm_data["infraAlert"][0][
-            "Xtime_of_last"]
-
-        # The BHOM create event call expects a list of events,
-        # even for just a single event.
-        event_list = []
-
-        # Add the event to the list
-        event_list.append(event_data)
-
-        # Convert event data to the JSON format required by the API.
-        json_data = json.dumps(event_list)
-        logger.debug('BHOM: event json payload: %s', json_data)
-
-    elif category == "job":
-
-        ctmjobInfoCount = int(json_ctm_data["jobInfo"][0]["count"])
-        ctmjobConfigCount = int(json_ctm_data["jobConfig"][0]["count"])
-
-        if ctmjobInfoCount > 0:
-            ctmFolder = json_ctm_data["jobInfo"][0]["entries"][0]["folder"]
-            # Job folder
-            event_data['ctmFolder'] = json_ctm_data["jobInfo"][0]["entries"][
-                0]["folder"]
-            # Job folder ID
-            event_data['ctmFolderID'] = json_ctm_data["jobInfo"][0]["entries"][
-                0]["folder_id"]
-            # Job hold status
-            event_data['ctmJobHeld'] = json_ctm_data["jobInfo"][0]["entries"][
-                0]["held"]
-            # Job Type
-            event_data['ctmJobType'] = json_ctm_data["jobInfo"][0]["entries"][
-                0]["type"]
-            # Job Schedule
-            event_data['ctmJobCyclic'] = json_ctm_data["jobInfo"][0][
-                "entries"][0]["cyclic"]
-
-        if ctmjobConfigCount > 0:
-            # The user who runs the job
-            event_data['ctmOwner'] = json_ctm_data["jobConfig"][0]["entries"][
-                0][ctmFolder]["CreatedBy"]
-
-        event_data['severity'] = json_ctm_data["jobAlert"][0]["severity"]
-        event_data['CLASS'] = 'CTM_JOB'
-        event_data['msg'] = json_ctm_data["jobAlert"][0]["message_summary"]
-        event_data['details'] = json_ctm_data["jobAlert"][0]["message_notes"]
-
-        event_data['source_identifier'] = json_ctm_data["jobAlert"][0][
-            "host_id"]
-        event_data['source_hostname'] = json_ctm_data["jobAlert"][0]["host_id"]
-        event_data['source_address'] = json_ctm_data["jobAlert"][0]["host_ip"]
-
-        event_data['alias'] = 'BMC_ComputerSystem:' \
-            + json_ctm_data["jobAlert"][0]["host_id"]
-        event_data['status'] = 'OPEN'
-        event_data['priority'] = 'PRIORITY_3'
-        event_data['location'] = json_ctm_data["jobAlert"][0]["data_center"]
-        event_data['instancename'] = json_ctm_data["jobAlert"][0]["host_id"]
-        event_data['cdmclass'] = 'BMC_ComputerSystem'
-        event_data['componentalias'] = 'BMC_ComputerSystem:' \
-            + json_ctm_data["jobAlert"][0]["host_id"]
-        event_data['system_category'] = json_ctm_data["jobAlert"][0][
-            "system_category"]
-        event_data['system_status'] = json_ctm_data["jobAlert"][0][
-            "system_status"]
 
-        # Alert update type 'I' Insert - new alert 'U' Update existing alert
-        event_data['ctmUpdateType'] = json_ctm_data["jobAlert"][0]["call_type"]
-        # Alert id Unique alert identifier
-        event_data['ctmAlertId'] = json_ctm_data["jobAlert"][0]["alert_id"]
-        # Control-M server name
-        event_data['ctmDataCenter'] = json_ctm_data["jobAlert"][0][
-            "data_center"]
-        # Job member name
-        event_data['ctmMemName'] = json_ctm_data["jobAlert"][0]["memname"]
-        # Job order id
-        event_data['ctmOrderId'] = json_ctm_data["jobAlert"][0]["order_id"]
-        # Alert severity 'R' - regular 'U' - urgent 'V' - very urgent
-        event_data['ctmSeverity'] = json_ctm_data["jobAlert"][0]["severity"]
-        # representation = date; # Alert creation time (YYYYMMDDhhmmss)
-        event_data['ctmTime'] = json_ctm_data["jobAlert"][0]["send_time"]
-        # Alert status (Not_Noticed, Noticed or Handled)
-        event_data['ctmStatus'] = json_ctm_data["jobAlert"][0]["status"]
-        # Job node id
-        event_data['ctmNodeId'] = json_ctm_data["jobAlert"][0]["host_id"]
-        # Job name
-        event_data['ctmJobName'] = json_ctm_data["jobAlert"][0]["job_name"]
-        # Alert message
-        event_data['ctmMessage'] = json_ctm_data["jobAlert"][0]["message"]
-        # Job application name
-        event_data['ctmApplication'] = json_ctm_data["jobAlert"][0][
-            "application"]
-        # Job sub application name
-        event_data['ctmSubApplication'] = json_ctm_data["jobAlert"][0][
-            "sub_application"]
-        # Alert type B - BIM alert type R or empty - regular alert type
-        event_data['ctmAlertType'] = json_ctm_data["jobAlert"][0]["alert_type"]
-        # Closed from Control-M/Enterprise Manager Y - yes N or empty - no
-        event_data['ctmClosedFromEM'] = json_ctm_data["jobAlert"][0][
-            "closed_from_em"]
-        # Remedy ticket number
-        event_data['ctmTicketNumber'] = json_ctm_data["jobAlert"][0][
-            "ticket_number"]
-        # Job's run counter
-        event_data['ctmRunCounter'] = json_ctm_data["jobAlert"][0][
-            "run_counter"]
-        # Last updated by, user name
-        event_data['ctmUser'] = "TBD"
-        # representation = date; # Last time the alert was updated (YYYYMMDDhhmmss)
-        event_data['ctmUpdateTime'] = json_ctm_data["jobAlert"][0]["send_time"]
-        # Alert notes
-        event_data['ctmNotes'] = json_ctm_data["jobAlert"][0]["notes"]
-        # Job ID
-        event_data['ctmJobID'] = json_ctm_data["jobAlert"][0]["job_id"]
+def getCtmEventSlotClass(value, event):
+    # BMC_ApplicationService:<host>:<domain>
+    return value.split(':')[0]
 
-        # The BHOM create event call expects a list of events,
-        # even for just a single event.
-        event_list = []
 
-        # Add the event to the list
-        event_list.append(event_data)
+def getCtmEventSlotComputer(value, event):
+    return 'BMC_ComputerSystem:' + value
+
+
+def getCtmEventSlotOwner(value, event):
+    # job config is keyed by the job folder
+    return value[event["ctmFolder"]]["CreatedBy"]
 
-        # Convert event data to the JSON format required by the API.
-        json_data = json.dumps(event_list)
-        logger.debug('BHOM: event json payload: %s', json_data)
-    else:
-        event_data['severity'] = json_ctm_data["coreAlert"][0]["severity"]
-        event_data['CLASS'] = 'CTM_EVENT'
-        event_data['msg'] = json_ctm_data["coreAlert"][0]["message_summary"]
-        event_data['details'] = json_ctm_data["coreAlert"][0]["message_notes"]
-
-        event_data['source_identifier'] = json_ctm_data["coreAlert"][0][
-            "host_id"]
-        event_data['source_hostname'] = json_ctm_data["coreAlert"][0][
-            "host_id"]
-        event_data['source_address'] = json_ctm_data["coreAlert"][0]["host_ip"]
-
-        event_data['alias'] = json_ctm_data["coreAlert"][0]["system_class"]
-        event_data['status'] = 'OPEN'
-        event_data['priority'] = 'PRIORITY_3'
-        event_data['location'] = json_ctm_data["coreAlert"][0]["data_center"]
-        event_data['instancename'] = json_ctm_data["coreAlert"][0]["host_id"]
-        event_data['cdmclass'] = json_ctm_data["coreAlert"][0][
-            "system_class"].split(':')[0]
-        event_data['componentalias'] = json_ctm_data["coreAlert"][0][
-            "system_class"]
-        event_data['system_category'] = json_ctm_data["coreAlert"][0][
-            "system_category"]
-        event_data['system_status'] = json_ctm_data["coreAlert"][0][
-            "system_status"]
 
+def compileCtmEventMap(spec):
+    '''
+    Compile an event mapping spec into getter tuples
+
+    :param list spec: (slot, source, default, transform) entries, source is
+        a dotted path into the alert record like "jobAlert.0.host_id" or None
+        for a constant slot set to default
+    :return: (slot, path, default, transform) tuples
+    :rtype: tuple
+    '''
+    lMap = []
+    for (slot, source, default, transform) in spec:
+        path = None
+        if source is not None:
+            path = tuple(
+                int(key) if key.isdigit() else key
+                for key in source.split("."))
+        lMap.append((slot, path, default, transform))
+    return tuple(lMap)
+
+
+def mapCtmEvent(data, eventMap):
+    '''
+    Build an event from an alert record, missing sources and failed
+    transforms use the default
+
+    :param dict data: enriched alert record
+    :param tuple eventMap: compiled event map, see compileCtmEventMap
+    :return: event slots
+    :rtype: dict
+    '''
+    event = {}
+    for (slot, path, default, transform) in eventMap:
+        if path is None:
+            event[slot] = default
+            continue
+        value = data
+        for key in path:
+            try:
+                value = value[key]
+            except (KeyError, IndexError, TypeError):
+                value = _ctmEventMissing
+                break
+        if transform is not None and value is not None \
+                and value is not _ctmEventMissing:
+            try:
+                value = transform(value, event)
+            except (KeyError, IndexError, TypeError, AttributeError) as exp:
+                # e.g. job config without the folder of the job info
+                logger.debug('CTM Event Slot "%s" Transform Error: %s', slot,
+                             exp)
+                value = _ctmEventMissing
+        if value is _ctmEventMissing:
+            if default is not ctmEventOmit:
+                event[slot] = default
+            continue
+        event[slot] = value
+    return event
+
+
+def getCtmEventAlertSpec(root):
+    # Control-M alert slots of job and core alerts
+    return [
         # Alert update type 'I' Insert - new alert 'U' Update existing alert
-        event_data['ctmUpdateType'] = json_ctm_data["coreAlert"][0][
-            "call_type"]
+        ("ctmUpdateType", root + ".call_type", None, None),
         # Alert id Unique alert identifier
-        event_data['ctmAlertId'] = json_ctm_data["coreAlert"][0]["alert_id"]
+        ("ctmAlertId", root + ".alert_id", None, None),
         # Control-M server name
-        event_data['ctmDataCenter'] = json_ctm_data["coreAlert"][0][
-            "data_center"]
+        ("ctmDataCenter", root + ".data_center", None, None),
         # Job member name
-        event_data['ctmMemName'] = json_ctm_data["coreAlert"][0]["memname"]
+        ("ctmMemName", root + ".memname", None, None),
         # Job order id
-        event_data['ctmOrderId'] = json_ctm_data["coreAlert"][0]["order_id"]
+        ("ctmOrderId", root + ".order_id", None, None),
         # Alert severity 'R' - regular 'U' - urgent 'V' - very urgent
-        event_data['ctmSeverity'] = json_ctm_data["coreAlert"][0]["severity"]
+        ("ctmSeverity", root + ".severity", None, None),
         # representation = date; # Alert creation time (YYYYMMDDhhmmss)
-        event_data['ctmTime'] = json_ctm_data["coreAlert"][0]["send_time"]
+        ("ctmTime", root + ".send_time", None, None),
         # Alert status (Not_Noticed, Noticed or Handled)
-        event_data['ctmStatus'] = json_ctm_data["coreAlert"][0]["status"]
+        ("ctmStatus", root + ".status", None, None),
         # Job node id
-        event_data['ctmNodeId'] = json_ctm_data["coreAlert"][0]["host_id"]
+        ("ctmNodeId", root + ".host_id", None, None),
         # Job name
-        event_data['ctmJobName'] = json_ctm_data["coreAlert"][0]["job_name"]
+        ("ctmJobName", root + ".job_name", None, None),
         # Alert message
-        event_data['ctmMessage'] = json_ctm_data["coreAlert"][0]["message"]
+        ("ctmMessage", root + ".message", None, None),
         # Job application name
-        event_data['ctmApplication'] = json_ctm_data["coreAlert"][0][
-            "application"]
+        ("ctmApplication", root + ".application", None, None),
         # Job sub application name
-        event_data['ctmSubApplication'] = json_ctm_data["coreAlert"][0][
-            "sub_application"]
+        ("ctmSubApplication", root + ".sub_application", None, None),
         # Alert type B - BIM alert type R or empty - regular alert type
-        event_data['ctmAlertType'] = json_ctm_data["coreAlert"][0][
-            "alert_type"]
+        ("ctmAlertType", root + ".alert_type", None, None),
         # Closed from Control-M/Enterprise Manager Y - yes N or empty - no
-        event_data['ctmClosedFromEM'] = json_ctm_data["coreAlert"][0][
-            "closed_from_em"]
+        ("ctmClosedFromEM", root + ".closed_from_em", None, None),
         # Remedy ticket number
-        event_data['ctmTicketNumber'] = json_ctm_data["coreAlert"][0][
-            "ticket_number"]
+        ("ctmTicketNumber", root + ".ticket_number", None, None),
         # Job's run counter
-        event_data['ctmRunCounter'] = json_ctm_data["coreAlert"][0][
-            "run_counter"]
+        ("ctmRunCounter", root + ".run_counter", None, None),
         # Last updated by, user name
-        event_data['ctmUser'] = "TBD"
+        ("ctmUser", None, "TBD", None),
         # representation = date; # Last time the alert was updated (YYYYMMDDhhmmss)
-        event_data['ctmUpdateTime'] = json_ctm_data["coreAlert"][0][
-            "send_time"]
+        ("ctmUpdateTime", root + ".send_time", None, None),
         # Alert notes
-        event_data['ctmNotes'] = json_ctm_data["coreAlert"][0]["notes"]
+        ("ctmNotes", root + ".notes", None, None),
+    ]
+
+
+def getCtmEventSourceSpec(root):
+    # message and source slots of all alerts
+    return [
+        ("msg", root + ".message_summary", None, None),
+        ("details", root + ".message_notes", None, None),
+        ("source_identifier", root + ".host_id", None, None),
+        ("source_hostname", root + ".host_id", None, None),
+        ("source_address", root + ".host_ip", None, None),
+    ]
+
+
+def getCtmEventClassSpec(root):
+    # event class taken from the alert system class
+    return [
+        ("alias", root + ".system_class", None, None),
+        ("status", None, "OPEN", None),
+        ("priority", None, "PRIORITY_3", None),
+        ("location", root + ".data_center", None, None),
+        ("instancename", root + ".host_id", None, None),
+        ("cdmclass", root + ".system_class", None, getCtmEventSlotClass),
+        ("componentalias", root + ".system_class", None, None),
+        ("system_category", root + ".system_category", None, None),
+        ("system_status", root + ".system_status", None, None),
+    ]
+
+
+ctmEventSpecs = {
+    "infrastructure": [("severity", None, "WARNING", None),
+                       ("CLASS", None, "CTMX_EVENT", None)] +
+    getCtmEventSourceSpec("infraAlert.0") +
+    getCtmEventClassSpec("infraAlert.0") + [
+        # Control-M server name
+        ("ctmDataCenter", "infraAlert.0.data_center", None, None),
+        # Alert update type 'I' Insert - new alert 'U' Update existing alert
+        ("ctmUpdateType", "infraAlert.0.call_type", None, None),
+        ("xctmCallType", "infraAlert.0.call_type", None, None),
+        ("xctmCompMachine", "infraAlert.0.Component_machine", None, None),
+        ("xctmCompName", "infraAlert.0.Component_name", None, None),
+        ("xctmCompType", "infraAlert.0.Component_type", None, None),
+        ("xctmCounter", "infraAlert.0.Counter", None, None),
+        ("xctmKey1", "infraAlert.0.Key1", None, None),
+        ("xctmKey2", "infraAlert.0.Key2", None, None),
+        ("xctmKey3", "infraAlert.0.Key3", None, None),
+        ("xctmKey4", "infraAlert.0.Key4", None, None),
+        ("xctmKey5", "infraAlert.0.Key5", None, None),
+        ("xctmMessage", "infraAlert.0.Message", None, None),
+        ("xctmMessageId", "infraAlert.0.Message_id", None, None),
+        ("xctmNote", "infraAlert.0.Note", None, None),
+        ("xctmSerial", "infraAlert.0.Serial", None, None),
+        ("xctmStatus", "infraAlert.0.Status", None, None),
+        ("xctmXSeverity", "infraAlert.0.Xseverity", None, None),
+        ("xctmXTime", "infraAlert.0.Xtime", None, None),
+        ("xctmXTimeOFLast", "infraAlert.0.Xtime_of_last", None, None),
+    ],
+    "job": [
+        # Job folder, left out without job info
+        ("ctmFolder", "jobInfo.0.entries.0.folder", ctmEventOmit, None),
+        ("ctmFolderID", "jobInfo.0.entries.0.folder_id", ctmEventOmit, None),
+        ("ctmJobHeld", "jobInfo.0.entries.0.held", ctmEventOmit, None),
+        ("ctmJobType", "jobInfo.0.entries.0.type", ctmEventOmit, None),
+        ("ctmJobCyclic", "jobInfo.0.entries.0.cyclic", ctmEventOmit, None),
+        # The user who runs the job
+        ("ctmOwner", "jobConfig.0.entries.0", ctmEventOmit,
+         getCtmEventSlotOwner),
+        ("severity", "jobAlert.0.severity", None, None),
+        ("CLASS", None, "CTM_JOB", None),
+    ] + getCtmEventSourceSpec("jobAlert.0") + [
+        ("alias", "jobAlert.0.host_id", None, getCtmEventSlotComputer),
+        ("status", None, "OPEN", None),
+        ("priority", None, "PRIORITY_3", None),
+        ("location", "jobAlert.0.data_center", None, None),
+        ("instancename", "jobAlert.0.host_id", None, None),
+        ("cdmclass", None, "BMC_ComputerSystem", None),
+        ("componentalias", "jobAlert.0.host_id", None,
+         getCtmEventSlotComputer),
+        ("system_category", "jobAlert.0.system_category", None, None),
+        ("system_status", "jobAlert.0.system_status", None, None),
+    ] + getCtmEventAlertSpec("jobAlert.0") + [
+        # Job ID
+        ("ctmJobID", "jobAlert.0.job_id", None, None),
+    ],
+    "core": [("severity", "coreAlert.0.severity", None, None),
+             ("CLASS", None, "CTM_EVENT", None)] +
+    getCtmEventSourceSpec("coreAlert.0") +
+    getCtmEventClassSpec("coreAlert.0") + getCtmEventAlertSpec("coreAlert.0"),
+}
+ctmEventMaps = {
+    category: compileCtmEventMap(spec)
+    for (category, spec) in ctmEventSpecs.items()
+}
+
+
+def getCtmEvents(data, category):
+    '''
+    Map an enriched alert to the event slots shared by BHOM and TSIM
+
+    :param dict data: enriched alert record, a JSON string is parsed
+    :param str category: alert category, infrastructure, job or core
+    :return: list with the event
+    :rtype: list
+    '''
+    if not isinstance(data, dict):
+        data = json.loads(data)
+    eventMap = ctmEventMaps.get(category, ctmEventMaps["core"])
+    return [mapCtmEvent(data=data, eventMap=eventMap)]
 
-        # The BHOM create event call expects a list of events,
-        # even for just a single event.
-        event_list = []
 
-        # Add the event to the list
-        event_list.append(event_data)
+def transformCtmBHOM(data, category):
+    '''
+    Transform an enriched alert to a BHOM event
+
+    :param dict data: enriched alert record
+    :param str category: alert category
+    :return: JSON list of events, the BHOM create event call expects a list
+    :rtype: str
+    '''
+    json_data = json.dumps(getCtmEvents(data=data, category=category))
+    logger.debug('BHOM: event json payload: %s', json_data)
+    return json_data
 
-        # Convert event data to the JSON format required by the API.
-        json_data = json.dumps(event_list)
-        logger.debug('BHOM: event json payload: %s', json_data)
 
+def transformCtmTSIM(data, category, hostName):
+    '''
+    Transform an enriched alert to a TrueSight event, same slots as BHOM
+
+    :param dict data: enriched alert record
+    :param str category: alert category
+    :param str hostName: event source host
+    :return: JSON list of wrapped events
+    :rtype: str
+    '''
+    json_data = json.dumps([{
+        "eventSourceHostName": hostName,
+        "attributes": event
+    } for event in getCtmEvents(data=data, category=category)])
+    logger.debug('TSIM: event json payload: %s', json_data)
     return json_data
 
 
+w3rkstatt.onConfigReload(applyConfig)
+
 if __name__ == "__main__":
 
     logging.basicConfig(filename=logFile,
@@ -2342,7 +3270,7 @@ if __name__ == "__main__":
     logger.info('System Platform: %s ', w3rkstatt.platform.system())
     logger.info('Log Level: %s', loglevel)
     logger.info('Host Name: %s', hostName)
-    logger.info('Host IP: %s', hostIP)
+    logger.info('Host IP: %s', w3rkstatt.getHostIP(hostName))
     logger.info('CTM Url: %s', ctm_url)
     logger.info('CTM User: %s', ctm_user)
     logger.info('Epoch: %s', epoch)
@@ -26,6 +26,9 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210513      Volker Scheithauer    Tranfer Development from other projects
 20210527      Volker Scheithauer    Update UAT
+20261018      Orchestrator          Hot reload of config and field mappings
+20261018      Orchestrator          Faster start, lazy imports, no DNS at import
+20261018      Orchestrator          Settings from one applyConfig, also on reload
 """
 
 import os
@@ -40,9 +43,6 @@ import urllib3
 import urllib3
 from urllib3 import disable_warnings
 from urllib3.exceptions import NewConnectionError, MaxRetryError, InsecureRequestWarning
-from jsonpath_ng import jsonpath
-from jsonpath_ng.ext import parse
-import jsonpath_rw_ext as jp
 
 # handle dev environment vs. production
 try:
@@ -58,74 +58,85 @@ except:
 # jCfgData     = w3rkstatt.getFileJson(jCfgFile)
 
 # Get configuration from json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.config_folder",
-                                   data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.template_folder",
-                                   data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(path="$.DEFAULT.crypto_file",
-                                    data=jCfgData)
-
-itsm_host = w3rkstatt.getJsonValue(path="$.ITSM.host", data=jCfgData)
-itsm_port = w3rkstatt.getJsonValue(path="$.ITSM.port", data=jCfgData)
-itsm_ssl = w3rkstatt.getJsonValue(path="$.ITSM.ssl", data=jCfgData)
-itsm_ssl_ver = w3rkstatt.getJsonValue(path="$.ITSM.ssl_verification",
-                                      data=jCfgData)
-itsm_user = w3rkstatt.getJsonValue(path="$.ITSM.user", data=jCfgData)
-itsm_pwd = w3rkstatt.getJsonValue(path="$.ITSM.pwd", data=jCfgData)
-itsm_api_ns = w3rkstatt.getJsonValue(path="$.ITSM.api_namespace",
-                                     data=jCfgData)
-itsm_api_ver = w3rkstatt.getJsonValue(path="$.ITSM.api_version", data=jCfgData)
-
-# ITSM form names
-itsm_form_crq = w3rkstatt.getJsonValue(path="$.ITSM.change.form_name",
-                                       data=jCfgData)
-itsm_form_inc = w3rkstatt.getJsonValue(path="$.ITSM.incident.form_name",
-                                       data=jCfgData)
-itsm_form_wlog = w3rkstatt.getJsonValue(path="$.ITSM.worklog.form_name",
-                                        data=jCfgData)
-itsm_search_inc = w3rkstatt.getJsonValue(path="$.ITSM.incident.form_search",
-                                         data=jCfgData)
-itsm_form_ci = w3rkstatt.getJsonValue(path="$.ITSM.cmdb.form_name",
-                                      data=jCfgData)
-
-# ITSM template IDs
-itsm_tmpl_crq = w3rkstatt.getJsonValue(path="$.ITSM.change.template_id",
-                                       data=jCfgData)
-itsm_tmpl_inc = w3rkstatt.getJsonValue(path="$.ITSM.incident.template_id",
-                                       data=jCfgData)
-
-# ITSM field mappings
-itsm_map_file = w3rkstatt.getJsonValue(path="$.ITSM.mappings_file",
-                                       data=jCfgData)
-
-# ITSM REST API
-# https://<localhost>:<port>/api/{namespace}/{version}
-if itsm_ssl:
-    itsm_protocol = "https://"
-else:
-    itsm_protocol = "http://"
-
-itsm_url = itsm_protocol + itsm_host + ":" + \
-    itsm_port + "/api/" + itsm_api_ns + "/" + itsm_api_ver
-itsm_jwt = itsm_protocol + itsm_host + ":" + itsm_port + "/api/jwt"
-
-# ITSM Field mappings
-jCfgMapFile = os.path.join(cfgFolder, itsm_map_file)
-jCfgMapData = w3rkstatt.getFileJson(jCfgMapFile)
+cfg = w3rkstatt.getConfig()
+jCfgMapFile = None
+jCfgMapData = None
+
+
+def applyConfig(cfg):
+    '''
+    Set the module settings from the project config, at import and after a
+    reload, including a new mappings file
+
+    :param ProjectConfig cfg: project config
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global jCfgData, cfgFolder, logFolder, tmpFolder, cryptoFile
+    global itsm_host, itsm_port, itsm_ssl, itsm_ssl_ver, itsm_user
+    global itsm_pwd, itsm_api_ns, itsm_api_ver, itsm_url, itsm_jwt
+    global itsm_form_crq, itsm_form_inc, itsm_form_wlog, itsm_search_inc
+    global itsm_form_ci, itsm_tmpl_crq, itsm_tmpl_inc, itsm_map_file
+    global jCfgMapFile, jCfgMapData, _localDebug
+
+    jCfgData = cfg.data
+    cfgFolder = cfg.default.config_folder
+    logFolder = cfg.default.log_folder
+    tmpFolder = cfg.default.template_folder
+    cryptoFile = cfg.default.crypto_file
+
+    itsm_host = cfg.itsm.host
+    itsm_port = cfg.itsm.port
+    itsm_ssl = cfg.itsm.ssl
+    itsm_ssl_ver = cfg.itsm.ssl_verification
+    itsm_user = cfg.itsm.user
+    itsm_pwd = cfg.itsm.pwd
+    itsm_api_ns = cfg.itsm.api_namespace
+    itsm_api_ver = cfg.itsm.api_version
+
+    # ITSM form names
+    itsm_form_crq = cfg.itsm.get("change.form_name")
+    itsm_form_inc = cfg.itsm.get("incident.form_name")
+    itsm_form_wlog = cfg.itsm.get("worklog.form_name")
+    itsm_search_inc = cfg.itsm.get("incident.form_search")
+    itsm_form_ci = cfg.itsm.get("cmdb.form_name")
+
+    # ITSM template IDs
+    itsm_tmpl_crq = cfg.itsm.get("change.template_id")
+    itsm_tmpl_inc = cfg.itsm.get("incident.template_id")
+
+    # ITSM REST API
+    # https://<localhost>:<port>/api/{namespace}/{version}
+    itsm_url = cfg.itsm.url
+    itsm_jwt = cfg.itsm.jwt
+
+    _localDebug = cfg.itsm.debug
+
+    # ITSM field mappings
+    mapFile = os.path.join(cfgFolder, cfg.itsm.mappings_file)
+    if jCfgMapFile is None:
+        itsm_map_file = cfg.itsm.mappings_file
+        jCfgMapFile = mapFile
+        jCfgMapData = w3rkstatt.getFileJson(jCfgMapFile)
+    elif mapFile != jCfgMapFile:
+        if reloadMappings(file=mapFile):
+            w3rkstatt.getFileWatcher().unwatch(file=jCfgMapFile)
+            w3rkstatt.watchFile(file=mapFile, callback=reloadMappings)
+            itsm_map_file = cfg.itsm.mappings_file
+            jCfgMapFile = mapFile
+
+
+applyConfig(cfg)
 
 # Assign module defaults
 _modVer = "20.22.07.00"
 _timeFormat = '%Y-%m-%dT%H:%M:%S'
-_localDebug = jCfgData["ITSM"]["debug"]
 _localDbgAdv = False
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 
 # Ignore HTTPS Insecure Request Warnings
 if itsm_ssl_ver == False:
@@ -645,6 +656,34 @@ def extractChangeState(change):
     return status
 
 
+def reloadMappings(file):
+    '''
+    Load the ITSM field mappings again, invalid content keeps the current
+    mappings
+
+    :param str file: mappings file, fully qualified
+    :return: True if the new mappings are active
+    :rtype: bool
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global jCfgMapData
+    try:
+        jMapData = w3rkstatt.getFileJson(file)
+    except Exception as e:
+        logger.error('ITSM Mappings: Rejected "%s": %s', file, e)
+        return False
+    if not isinstance(jMapData, (list, dict)) or not jMapData:
+        logger.error('ITSM Mappings: Rejected "%s": no mappings', file)
+        return False
+    jCfgMapData = jMapData
+    logger.info('ITSM Mappings: Active "%s"', file)
+    return True
+
+
+w3rkstatt.onConfigReload(applyConfig)
+w3rkstatt.watchFile(file=jCfgMapFile, callback=reloadMappings)
+
 if __name__ == "__main__":
     logging.basicConfig(filename=logFile,
                         filemode='w',
@@ -656,7 +695,7 @@ if __name__ == "__main__":
     logger.info('System Platform: "%s" ', w3rkstatt.platform.system())
     logger.info('Log Level: "%s"', loglevel)
     logger.info('Host Name: "%s"', hostName)
-    logger.info('Host IP: "%s"', hostIP)
+    logger.info('Host IP: "%s"', w3rkstatt.getHostIP(hostName))
     logger.info('ITSM Url: "%s"', itsm_url)
     logger.info('User: "%s"', itsm_user)
     logger.info('Secure Pwd: "%s"', itsm_pwd)
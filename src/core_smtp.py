@@ -27,6 +27,7 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210513      Volker Scheithauer    Tranfer Development from other projects
 20220906      Volker Scheithauer    Update for smarthost
+20261018      Orchestrator          Import json2html on first use
 
 See also: https://realpython.com/python-send-email/
 """
@@ -48,7 +49,6 @@ from email.utils import formataddr
 from email.utils import make_msgid
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from json2html import *
 
 # handle dev environment vs. production
 try:
@@ -61,26 +61,24 @@ except:
 
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
 
 
 # SMTP Server Settigns
-smtp_host = w3rkstatt.getJsonValue(path="$.MAIL.host", data=jCfgData)
-smtp_port = w3rkstatt.getJsonValue(path="$.MAIL.port", data=jCfgData)
-smtp_ssl = w3rkstatt.getJsonValue(path="$.MAIL.ssl", data=jCfgData)
-smtp_user = w3rkstatt.getJsonValue(path="$.MAIL.user", data=jCfgData)
-smtp_user_name = w3rkstatt.getJsonValue(path="$.MAIL.display", data=jCfgData)
-smtp_pwd = w3rkstatt.getJsonValue(path="$.MAIL.pwd", data=jCfgData)
+smtp_host = cfg.mail.host
+smtp_port = cfg.mail.port
+smtp_ssl = cfg.mail.ssl
+smtp_user = cfg.mail.user
+smtp_user_name = cfg.mail.display
+smtp_pwd = cfg.mail.pwd
 
 # E-Mail Template
-template_name = w3rkstatt.getJsonValue(path="$.MAIL.template", data=jCfgData)
+template_name = cfg.mail.template
 template_file = w3rkstatt.concatPath(path=tmpFolder, folder=template_name)
 
 
@@ -95,8 +93,8 @@ _modVer = "20.21.05.00"
 _timeFormat = '%d %b %Y %H:%M:%S,%f'
 
 logger = w3rkstatt.logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = w3rkstatt.time.time()
 parser = argparse.ArgumentParser(prefix_chars=':')
 sUuid = w3rkstatt.sUuid
@@ -132,6 +130,7 @@ def prepareEmail(eml_from, eml_from_name, eml_to, eml_subbject, eml_message, eml
         email_data = w3rkstatt.jsonTranslateValuesAdv(data=email_data_text)
         email_data_status = w3rkstatt.jsonValidator(data=email_data)
         if email_data_status:
+            from json2html import json2html
             email_data_tbl = json2html.convert(json=email_data)
         else:
             email_data_tbl = email_data
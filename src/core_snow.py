@@ -27,6 +27,7 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20201001      Volker Scheithauer    Initial Development
 20220701      Volker Scheithauer    Migrate to W3rkstatt project
+20261018      Orchestrator          Faster start, lazy imports, no DNS at import
 """
 import w3rkstatt
 import os
@@ -44,33 +45,25 @@ from urllib3 import disable_warnings
 from urllib3.exceptions import NewConnectionError, MaxRetryError, InsecureRequestWarning
 
 import json
-from jsonpath_ng import jsonpath
-from jsonpath_ng.ext import parse
-import jsonpath_rw_ext as jp
 
 # Get configuration from json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
-snow_host = w3rkstatt.getJsonValue(path="$.SNOW.host", data=jCfgData)
-snow_port = w3rkstatt.getJsonValue(path="$.SNOW.port", data=jCfgData)
-snow_ssl = w3rkstatt.getJsonValue(path="$.SNOW.ssl", data=jCfgData)
-snow_ssl_ver = w3rkstatt.getJsonValue(
-    path="$.SNOW.ssl_verification", data=jCfgData)
-snow_user = w3rkstatt.getJsonValue(path="$.SNOW.user", data=jCfgData)
-snow_pwd_sec = w3rkstatt.getJsonValue(path="$.SNOW.pwd_secure", data=jCfgData)
-snow_api_ns = w3rkstatt.getJsonValue(
-    path="$.SNOW.api_namespace", data=jCfgData)
-snow_api_ver = w3rkstatt.getJsonValue(path="$.SNOW.api_version", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
+snow_host = cfg.snow.host
+snow_port = cfg.snow.port
+snow_ssl = cfg.snow.ssl
+snow_ssl_ver = cfg.snow.ssl_verification
+snow_user = cfg.snow.user
+snow_pwd_sec = cfg.snow.get("pwd_secure")
+snow_api_ns = cfg.snow.api_namespace
+snow_api_ver = cfg.snow.api_version
 
 # SNOW template IDs
-snow_tmpl_req = w3rkstatt.getJsonValue(
-    path="$.SNOW.request.template_id", data=jCfgData)
+snow_tmpl_req = cfg.snow.get("request.template_id")
 
 # SNOW REST API
 # https://<localhost>:<port>/api/{namespace}/{version}
@@ -79,7 +72,7 @@ if snow_ssl:
 else:
     snow_protocol = "http://"
 # SNOW Base Url
-snow_base_url = snow_protocol + snow_host + ":" + snow_port + "/api"
+snow_base_url = cfg.snow.url
 
 # https://dev81866.service-now.com/api/now/table/{tableName}
 # https://dev81866.service-now.com/api/now/v1/table/{tableName}
@@ -91,11 +84,10 @@ _timeFormat = '%Y-%m-%dT%H:%M:%S'
 _localDebug = False
 _localDbgAdv = False
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 # Ignore HTTPS Insecure Request Warnings
 if snow_ssl_ver == False:
     urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -341,7 +333,7 @@ if __name__ == "__main__":
     logger.info('System Platform: "%s" ', w3rkstatt.platform.system())
     logger.info('Log Level: "%s"', loglevel)
     logger.info('Host Name: "%s"', hostName)
-    logger.info('Host IP: "%s"', hostIP)
+    logger.info('Host IP: "%s"', w3rkstatt.getHostIP(hostName))
     logger.info('SNOW Base Url: "%s"', snow_base_url)
     logger.info('User: "%s"', snow_user)
     logger.info('Secure Pwd: "%s"', snow_pwd_sec)
@@ -26,6 +26,8 @@ Change Log
 Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210513      Volker Scheithauer    Tranfer Development from other projects
+20261018      Orchestrator          Faster start, lazy imports, no DNS at import
+20261018      Orchestrator          Apply reloaded project config
 
 
 See also: https://realpython.com/python-send-email/
@@ -46,48 +48,65 @@ except:
 
 # Define global variables from w3rkstatt.ini file
 # Get configuration from bmcs_core.json
-jCfgData   = w3rkstatt.getProjectConfig()
-cfgFolder  = w3rkstatt.getJsonValue(path="$.DEFAULT.config_folder",data=jCfgData)
-logFolder  = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder",data=jCfgData)
-tmpFolder  = w3rkstatt.getJsonValue(path="$.DEFAULT.template_folder",data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(path="$.DEFAULT.crypto_file",data=jCfgData)
-
-tsim_host    = w3rkstatt.getJsonValue(path="$.TSIM.host",data=jCfgData)
-tsws_api_ver = w3rkstatt.getJsonValue(path="$.TSPS.api_version",data=jCfgData)
-tsps_host    = w3rkstatt.getJsonValue(path="$.TSPS.host",data=jCfgData)
-tsom_user    = w3rkstatt.getJsonValue(path="$.TSIM.user",data=jCfgData)
-tsom_pwd     = w3rkstatt.getJsonValue(path="$.TSIM.pwd",data=jCfgData)
-tsom_tenant  = w3rkstatt.getJsonValue(path="$.TSIM.tenant",data=jCfgData)
-tsps_ssl_ver = w3rkstatt.getJsonValue(path="$.TSPS.ssl_ignore",data=jCfgData)
-# routingId - Name of the cell to send events to
-tsim_cell    = w3rkstatt.getJsonValue(path="$.TSIM.cell",data=jCfgData)
-# routingType
-tsim_routing = w3rkstatt.getJsonValue(path="$.TSIM.routing",data=jCfgData)
-
-# Compute Url's
-tsps_url     = 'https://' + tsps_host + '/tsws/api/' + tsws_api_ver + '/'
-tsim_url     = 'https://' + tsim_host + '/bppmws/api/'
-
-# ITSM configuration
-itsm_operational_category1 = w3rkstatt.getJsonValue(path="$.ITSM.opcat_1",data=jCfgData)
-itsm_operational_category2 = w3rkstatt.getJsonValue(path="$.ITSM.opcat_2",data=jCfgData)
-itsm_operational_category3 = w3rkstatt.getJsonValue(path="$.ITSM.opcat_3",data=jCfgData)
-
-# Ignore HTTPS Insecure Request Warnings
-if tsps_ssl_ver:
-  urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+cfg   = w3rkstatt.getConfig()
+
+def applyConfig(cfg):
+  '''
+  Set the module settings from the project config, at import and after a reload
+
+  :param ProjectConfig cfg: project config
+  :raises ValueError: N/A
+  :raises TypeError: N/A
+  '''
+  global jCfgData, cfgFolder, logFolder, tmpFolder, cryptoFile
+  global tsim_host, tsws_api_ver, tsps_host, tsom_user, tsom_pwd, tsom_tenant
+  global tsps_ssl_ver, tsim_cell, tsim_routing, tsps_url, tsim_url
+  global itsm_operational_category1, itsm_operational_category2
+  global itsm_operational_category3
+
+  jCfgData   = cfg.data
+  cfgFolder  = cfg.default.config_folder
+  logFolder  = cfg.default.log_folder
+  tmpFolder  = cfg.default.template_folder
+  cryptoFile = cfg.default.crypto_file
+
+  tsim_host    = cfg.tsim.host
+  tsws_api_ver = w3rkstatt.getJsonValue(path="$.TSPS.api_version",data=jCfgData)
+  tsps_host    = w3rkstatt.getJsonValue(path="$.TSPS.host",data=jCfgData)
+  tsom_user    = cfg.tsim.user
+  tsom_pwd     = cfg.tsim.pwd
+  tsom_tenant  = cfg.tsim.tenant
+  tsps_ssl_ver = w3rkstatt.getJsonValue(path="$.TSPS.ssl_ignore",data=jCfgData)
+  # routingId - Name of the cell to send events to
+  tsim_cell    = cfg.tsim.cell
+  # routingType
+  tsim_routing = cfg.tsim.routing
+
+  # Compute Url's
+  tsps_url     = 'https://' + tsps_host + '/tsws/api/' + tsws_api_ver + '/'
+  tsim_url     = 'https://' + tsim_host + '/bppmws/api/'
+
+  # ITSM configuration
+  itsm_operational_category1 = cfg.itsm.get("opcat_1")
+  itsm_operational_category2 = cfg.itsm.get("opcat_2")
+  itsm_operational_category3 = cfg.itsm.get("opcat_3")
+
+  # Ignore HTTPS Insecure Request Warnings
+  if tsps_ssl_ver:
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+applyConfig(cfg)
+w3rkstatt.onConfigReload(applyConfig)
 
 # Assign module defaults
 _modVer = "20.21.05.00"
 _timeFormat = '%d %b %Y %H:%M:%S,%f'
 _localDebug = True
 logger   = w3rkstatt.logging.getLogger(__name__) 
-logFile  = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file",data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel",data=jCfgData)
+logFile  = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch    = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP   = w3rkstatt.getHostIP(hostName)
-domain   = w3rkstatt.getHostDomain(w3rkstatt.getHostFqdn(hostName))
   
 
 def authenticate():
@@ -464,7 +483,7 @@ if __name__ == "__main__":
     logger.info('System Platform: %s ', w3rkstatt.platform.system())
     logger.info('Log Level: %s', loglevel)
     logger.info('Host Name: %s', hostName)
-    logger.info('Host IP: %s', hostIP)
+    logger.info('Host IP: %s', w3rkstatt.getHostIP(hostName))
     logger.info('TrueSight Operations Manager: %s', tsim_host)
     logger.info('TrueSight Web Service: %s', tsps_host)
     logger.info('TSIM API Version: %s', tsws_api_ver)
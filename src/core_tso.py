@@ -26,6 +26,7 @@ Change Log
 Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210527      Volker Scheithauer    Tranfer Development from other projects
+20261018      Orchestrator          Faster start, lazy imports, no DNS at import
 
 """
 
@@ -42,9 +43,6 @@ import urllib3
 import urllib3
 from urllib3 import disable_warnings
 from urllib3.exceptions import NewConnectionError, MaxRetryError, InsecureRequestWarning
-from jsonpath_ng import jsonpath
-from jsonpath_ng.ext import parse
-import jsonpath_rw_ext as jp
 
 # handle dev environment vs. production
 try:
@@ -60,34 +58,23 @@ except:
 # jCfgData     = w3rkstatt.getFileJson(jCfgFile)
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.config_folder", data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.template_folder", data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(
-    path="$.DEFAULT.crypto_file", data=jCfgData)
-
-tso_host = w3rkstatt.getJsonValue(path="$.TSO.host", data=jCfgData)
-tso_port = w3rkstatt.getJsonValue(path="$.TSO.port", data=jCfgData)
-tso_ssl = w3rkstatt.getJsonValue(path="$.TSO.ssl", data=jCfgData)
-tso_ssl_ver = w3rkstatt.getJsonValue(
-    path="$.TSO.ssl_verification", data=jCfgData)
-tso_user = w3rkstatt.getJsonValue(path="$.TSO.user", data=jCfgData)
-tso_pwd = w3rkstatt.getJsonValue(path="$.TSO.pwd", data=jCfgData)
+cfg = w3rkstatt.getConfig()
+jCfgData = cfg.data
+cfgFolder = cfg.default.config_folder
+logFolder = cfg.default.log_folder
+tmpFolder = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
+
+tso_host = cfg.tso.host
+tso_port = cfg.tso.port
+tso_ssl = cfg.tso.ssl
+tso_ssl_ver = cfg.tso.ssl_verification
+tso_user = cfg.tso.user
+tso_pwd = cfg.tso.pwd
 
 # ITSM REST API
 # https://<localhost>:<port>/api/{namespace}/{version}
-if tso_ssl:
-    tso_protocol = "https://"
-else:
-    tso_protocol = "http://"
-
-if (tso_port == "443") and (tso_ssl == True):
-    tso_url = tso_protocol + tso_host + "/baocdp"
-else:
-    tso_url = tso_protocol + tso_host + ":" + tso_port + "/baocdp"
+tso_url = cfg.tso.url
 
 # Assign module defaults
 _modVer = "20.22.07.00"
@@ -95,11 +82,10 @@ _timeFormat = '%Y-%m-%dT%H:%M:%S'
 _localDebug = False
 _localDbgAdv = False
 logger = logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
 
 # Ignore HTTPS Insecure Request Warnings
 if tso_ssl_ver == False:
@@ -535,7 +521,7 @@ if __name__ == "__main__":
     logger.info('System Platform: "%s" ', w3rkstatt.platform.system())
     logger.info('Log Level: "%s"', loglevel)
     logger.info('Host Name: "%s"', hostName)
-    logger.info('Host IP: "%s"', hostIP)
+    logger.info('Host IP: "%s"', w3rkstatt.getHostIP(hostName))
     logger.info('TSO Url: "%s"', tso_url)
     logger.info('User: "%s"', tso_user)
     logger.info('Epoch: %s', epoch)
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+# Filename: ctm_alertd.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Control-M Alert Daemon
+Keep modules, configuration and the Automation API session warm and process
+alerts handed over by ctm_alerts_client.py via a local unix domain socket.
+Alerts are journaled before the hand over is confirmed, unfinished alerts
+are resumed from the last completed stage on start. During alert storms
+near-identical alerts are coalesced and processed once.
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Initial Development
+20261018      Orchestrator          Flush alert updates before logout
+20261018      Orchestrator          Close alert store on shutdown
+20261018      Orchestrator          Hot reload of project config
+20261018      Orchestrator          Prewarm host resolution cache
+20261018      Orchestrator          Log out the shared session on stop only
+20261018      Orchestrator          Process alerts on a bounded worker pool
+20261018      Orchestrator          Resume alerts of ended processes only
+20261018      Orchestrator          Transform alerts on the workers, update the incident of a storm
+20261018      Orchestrator          Compact the journal while running
+
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import signal
+import logging
+import threading
+import socketserver
+import concurrent.futures
+
+# handle dev environment vs. production
+try:
+    import w3rkstatt as w3rkstatt
+    import core_ctm as ctm
+    import ctm_alerts as alerts
+    import ctm_spool as spool
+    import ctm_storm as storm
+except:
+    # fix import issues for modules
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    from src import w3rkstatt as w3rkstatt
+    from src import core_ctm as ctm
+    from src import ctm_alerts as alerts
+    from src import ctm_spool as spool
+    from src import ctm_storm as storm
+
+# Get configuration from bmcs_core.json
+jCfgData = alerts.jCfgData
+hFolder = w3rkstatt.getHomeFolder()
+
+alerts_socket = w3rkstatt.getJsonValue(path="$.CTM.alerts.socket",
+                                       data=jCfgData)
+if len(str(alerts_socket)) < 1:
+    alerts_socket = os.path.join(hFolder, ".w3rkstatt", "ctm_alerts.sock")
+
+# Re-login to the Automation API after this many seconds
+alerts_session_ttl = w3rkstatt.getJsonValue(path="$.CTM.alerts.session_ttl",
+                                            data=jCfgData)
+if not alerts_session_ttl:
+    alerts_session_ttl = 1200
+
+alerts_queue_size = w3rkstatt.getJsonValue(path="$.CTM.alerts.queue_size",
+                                           data=jCfgData)
+if not alerts_queue_size:
+    alerts_queue_size = 10000
+
+# Alerts processed at the same time
+alerts_workers = w3rkstatt.getJsonValue(path="$.CTM.alerts.workers",
+                                        data=jCfgData)
+if not alerts_workers:
+    alerts_workers = 4
+
+# Give up on a journaled alert after this many resumes
+alerts_max_attempts = w3rkstatt.getJsonValue(
+    path="$.CTM.alerts.journal.max_attempts", data=jCfgData)
+if not alerts_max_attempts:
+    alerts_max_attempts = 3
+
+# Alerts of another host stay with their owner for at least the sink
+# timeouts plus the BHOM follow-up deadline
+alerts_resume_lease = sum(
+    sink["timeout"] for sink in alerts.integration_sinks.values()) + float(
+        alerts.bhom.bhom_followup_deadline)
+alerts_lease = w3rkstatt.getJsonValue(path="$.CTM.alerts.journal.lease",
+                                      data=jCfgData)
+if alerts_lease:
+    alerts_resume_lease = max(alerts_resume_lease, float(alerts_lease))
+
+# Assign module defaults
+_localDebug = jCfgData["DEFAULT"]["debug"]["api"]
+_localDebugFunctions = jCfgData["DEFAULT"]["debug"]["functions"]
+_modVer = "1.0"
+_socketMode = 0o660
+_socketTimeout = 2.0
+
+logger = w3rkstatt.logging.getLogger(__name__)
+logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
+
+alertQueue = queue.Queue(maxsize=int(alerts_queue_size))
+alertStop = threading.Event()
+alertJournal = None
+# representative alerts of coalesced alert groups
+alertReady = queue.Queue()
+
+
+class CtmWarmConnection(object):
+    """
+    Keep one Automation API session open for the lifetime of the daemon
+    :property ctm_api_obj CtmConnection, re-created after 'ttl' seconds or on failure
+    """
+
+    def __init__(self, ttl=1200):
+        self.ttl = int(ttl)
+        self.ctm_api_obj = None
+        self.login_time = 0
+        self.lock = threading.Lock()
+
+    def get(self):
+        # shared by the alert workers, one login at a time
+        with self.lock:
+            age = time.time() - self.login_time
+            if self.ctm_api_obj is not None and age < self.ttl:
+                return self.ctm_api_obj
+
+            self.close()
+            try:
+                self.ctm_api_obj = ctm.getCtmConnection()
+                self.login_time = time.time()
+            except (SystemExit, Exception) as exp:
+                # CtmConnection exits the process on login failure
+                logger.error('CTM Daemon Login Error: %s', exp)
+                self.ctm_api_obj = None
+            return self.ctm_api_obj
+
+    def reset(self):
+        self.login_time = 0
+
+    def close(self, shutdown=False):
+        if self.ctm_api_obj is not None:
+            try:
+                # queued alert updates use this session
+                ctm.getCtmAlertUpdates().flush()
+                ctm.delCtmConnection(self.ctm_api_obj, shutdown=shutdown)
+            except Exception as exp:
+                logger.error('CTM Daemon Logout Error: %s', exp)
+            self.ctm_api_obj = None
+
+
+class AlertRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Read one alert per connection: a JSON list with the ctm_alerts.py arguments
+    """
+
+    def handle(self):
+        self.connection.settimeout(_socketTimeout)
+        try:
+            line = self.rfile.readline()
+            sCtmArguments = json.loads(line.decode("utf-8"))
+            jCtmAlert = alerts.ctmAlert2Dict(list=sCtmArguments,
+                                             start=0,
+                                             end=len(sCtmArguments))
+            queueAlert(data=jCtmAlert)
+            sReply = "Queued Alert: #" + str(jCtmAlert.get("alert_id")) + "#"
+        except queue.Full:
+            # ctm_alerts.sh falls back to ctm_alerts.py
+            logger.error('CTM Daemon Queue Full: %s', alertQueue.qsize())
+            sReply = "Error: queue full"
+        except Exception as exp:
+            logger.error('CTM Daemon Request Error: %s', exp)
+            sReply = "Error: " + str(exp)
+
+        try:
+            self.wfile.write((sReply + "\n").encode("utf-8"))
+        except OSError:
+            pass
+
+
+class AlertServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def queueAlert(data):
+    '''
+    Journal and queue a new alert
+
+    :param dict data: alert arguments as returned by ctmAlert2Dict
+    :return: journal entry
+    :rtype: dict
+    :raises queue.Full: alert queue is full, alert is not journaled
+    '''
+    if alertJournal is not None:
+        entry = alertJournal.receive(data=data)
+    else:
+        entry = {
+            "uuid": str(uuid.uuid4()),
+            "data": data,
+            "stages": {},
+            "attempts": 0
+        }
+
+    try:
+        alertQueue.put_nowait(entry)
+    except queue.Full:
+        if alertJournal is not None:
+            alertJournal.mark(id=entry["uuid"], stage="dropped")
+        raise
+    return entry
+
+
+def resumeAlerts(journal):
+    '''
+    Get unfinished alerts of ended processes, give up after max. attempts
+
+    :param AlertJournal journal: alert journal
+    :return: journal entries to resume
+    :rtype: list
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    journal.compact()
+    entries = []
+    for entry in journal.pending(lease=alerts_resume_lease):
+        if entry["attempts"] >= int(alerts_max_attempts):
+            logger.error('CTM Daemon Resume Failed: %s %s', entry["uuid"],
+                         list(entry["stages"]))
+            journal.mark(id=entry["uuid"], stage="failed")
+            continue
+        journal.append({
+            "uuid": entry["uuid"],
+            "stage": "resumed",
+            "time": time.time(),
+            "owner": spool.getOwner()
+        })
+        entries.append(entry)
+
+    if len(entries) > 0:
+        logger.info('CTM Daemon: Resume %s journaled alerts', len(entries))
+    return entries
+
+
+def processGroup(ctmSession, group):
+    '''
+    Process the representative alert of a group, finish all members
+
+    :param CtmWarmConnection ctmSession: shared Automation API session
+    :param dict group: {"entry": journal entry, "data": transformed alert or None, "members": journal entries, "storm": AlertStorm or None}
+    :return: None
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    entry = group["entry"]
+    stormAlert = group.get("storm")
+    bStormLeader = stormAlert is not None and stormAlert.isLeader(entry)
+    checkpoint = spool.AlertCheckpoint(journal=alertJournal, entry=entry)
+    if stormAlert is not None and not bStormLeader:
+        # follow-up alerts update the incident and event of the first alert
+        # resume with occurrences, coalesced alert ids and the first alert
+        jCtmAlert = dict(group["data"])
+        jCtmAlert["storm_leader"] = stormAlert.leader()
+        checkpoint.mark("transformed", jCtmAlert)
+
+    def finish():
+        # acknowledgement sent, may be called by the alert update batcher
+        if alertJournal is not None:
+            for member in group["members"]:
+                alertJournal.mark(id=member["uuid"], stage="done")
+
+    jSinks = None
+    try:
+        ctmApiObj = ctmSession.get()
+        sSysOutMsg = alerts.processAlert(data=entry["data"],
+                                         ctmApiObj=ctmApiObj,
+                                         checkpoint=checkpoint,
+                                         uuid=entry["uuid"],
+                                         finish=finish)
+        logger.info('CTM Daemon: %s', sSysOutMsg)
+        jSinks = {
+            sink: checkpoint.get(sink)
+            for sink in ("itsm", "bhom", "tsim")
+        }
+    except Exception as exp:
+        # drop session, next alert will login again
+        # alert stays in the journal and is resumed on restart
+        logger.error('CTM Daemon Alert Error: %s', exp)
+        ctmSession.reset()
+    finally:
+        if bStormLeader:
+            stormAlert.finish(sinks=jSinks)
+
+
+def coalesceAlert(ctmSession, entry, coalescer):
+    '''
+    Transform an alert on a worker, coalesce 'New' alerts, process others
+
+    :param CtmWarmConnection ctmSession: shared Automation API session
+    :param dict entry: journal entry of the alert
+    :param AlertCoalescer coalescer: alert coalescer
+    :return: None
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    checkpoint = spool.AlertCheckpoint(journal=alertJournal, entry=entry)
+    try:
+        jCtmAlert = alerts.transformAlert(data=entry["data"],
+                                          checkpoint=checkpoint)
+    except Exception as exp:
+        # process the alert on its own, on failure it stays in the journal
+        logger.error('CTM Daemon Transform Error: %s', exp)
+        jCtmAlert = {}
+
+    if "New" in str(jCtmAlert.get("call_type")):
+        coalescer.add(entry=entry, data=jCtmAlert)
+    else:
+        processGroup(ctmSession, {
+            "entry": entry,
+            "data": None,
+            "members": [entry]
+        })
+
+
+def alertWorker(ctmSession, resume=[], coalescer=None, workers=1):
+    '''
+    Drain the alert queue with a warm Automation API session
+
+    :param CtmWarmConnection ctmSession: shared Automation API session
+    :param list resume: journal entries to process first
+    :param AlertCoalescer coalescer: coalesce 'New' alerts, None processes each alert
+    :param int workers: alerts processed at the same time
+    :return: None
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    resume = list(resume)
+    pool = concurrent.futures.ThreadPoolExecutor(
+        max_workers=int(workers), thread_name_prefix="ctm-alert")
+    slots = threading.BoundedSemaphore(int(workers))
+
+    def submit(func, *args):
+        # wait for a free worker, new alerts stay in the bounded queue
+        slots.acquire()
+        future = pool.submit(func, ctmSession, *args)
+        future.add_done_callback(lambda future: slots.release())
+        return future
+
+    try:
+        drainQueue(submit, resume, coalescer)
+    finally:
+        pool.shutdown(wait=True)
+
+
+def drainQueue(submit, resume, coalescer):
+    '''
+    Hand resumed, coalesced and queued alerts to the workers until stopped
+
+    :param function submit: submit(func, *args), run func(ctmSession, *args) on a worker
+    :param list resume: journal entries to process first
+    :param AlertCoalescer coalescer: coalesce 'New' alerts, None processes each alert
+    :return: None
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    # alerts being transformed, not yet added to the coalescer
+    lTransform = []
+    while True:
+        try:
+            submit(processGroup, alertReady.get_nowait())
+            continue
+        except queue.Empty:
+            pass
+
+        if alertJournal is not None:
+            # finished alerts do not pile up in a long running daemon
+            try:
+                alertJournal.maintain()
+            except OSError as exp:
+                logger.error('CTM Daemon Journal Compact Error: %s', exp)
+
+        if len(resume) > 0:
+            entry = resume.pop(0)
+        elif alertStop.is_set() and alertQueue.empty():
+            lTransform = [future for future in lTransform if not future.done()]
+            if len(lTransform) > 0:
+                time.sleep(0.05)
+                continue
+            # emit open groups before stopping
+            if coalescer is None or coalescer.flush() < 1:
+                if alertReady.empty():
+                    break
+            continue
+        else:
+            try:
+                entry = alertQueue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            alertQueue.task_done()
+
+        if coalescer is not None:
+            # transform on the workers, DNS lookups do not block dispatching
+            lTransform = [future for future in lTransform if not future.done()]
+            lTransform.append(submit(coalesceAlert, entry, coalescer))
+            continue
+
+        submit(processGroup, {
+            "entry": entry,
+            "data": None,
+            "members": [entry]
+        })
+
+
+def removeSocket(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def runDaemon(socketPath=alerts_socket):
+    '''
+    Serve the local alert socket until SIGTERM / SIGINT
+
+    :param str socketPath: unix domain socket file
+    :return: None
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    global alertJournal
+
+    w3rkstatt.createFolder(os.path.dirname(socketPath))
+    removeSocket(socketPath)
+
+    resume = []
+    alertJournal = spool.getJournal(data=jCfgData)
+    if alertJournal is not None:
+        resume = resumeAlerts(journal=alertJournal)
+        alertJournal.start()
+
+    ctmSession = CtmWarmConnection(ttl=alerts_session_ttl)
+    ctmApiObj = ctmSession.get()
+    if w3rkstatt.getConfig().default.get("dns.prewarm"):
+        ctmApiClient = None
+        if ctmApiObj is not None:
+            ctmApiClient = ctmApiObj.api_client
+        ctm.prewarmCtmHosts(ctmApiClient=ctmApiClient)
+    # log in again with the new settings after a config reload
+    w3rkstatt.onConfigReload(lambda cfg: ctmSession.reset())
+    configWatcher = w3rkstatt.watchConfig()
+
+    coalescer = storm.getCoalescer(data=jCfgData, emit=alertReady.put)
+
+    # shared helpers are created before alerts are processed concurrently
+    ctm.getCtmTaskPool()
+    ctm.getCtmAlertUpdates()
+    alerts.getJobScheduler()
+    # the daemon compresses sealed segments, also of ctm_alerts.py
+    alerts.getAlertStore(background=True)
+    alerts.bhom.getEventFollowUp()
+
+    worker = threading.Thread(target=alertWorker,
+                              args=(ctmSession, resume, coalescer,
+                                    alerts_workers),
+                              name="ctm-alert-worker")
+    worker.start()
+
+    server = AlertServer(socketPath, AlertRequestHandler)
+    os.chmod(socketPath, _socketMode)
+
+    def stopDaemon(signum, frame):
+        logger.info('CTM Daemon: Stop Signal %s', signum)
+        alertStop.set()
+        threading.Thread(target=server.shutdown).start()
+
+    signal.signal(signal.SIGTERM, stopDaemon)
+    signal.signal(signal.SIGINT, stopDaemon)
+
+    logger.info('CTM Daemon: Listen on "%s"', socketPath)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        removeSocket(socketPath)
+        alertStop.set()
+        worker.join()
+        ctmSession.close(shutdown=True)
+        if configWatcher is not None:
+            configWatcher.stop()
+        if alertJournal is not None:
+            alertJournal.close()
+        if alerts.alertStore:
+            alerts.alertStore.close()
+        logger.info('CTM Daemon: Stopped')
+
+
+if __name__ == "__main__":
+    logging.basicConfig(filename=logFile,
+                        filemode='a',
+                        level=logging.DEBUG,
+                        format='%(asctime)s - %(levelname)s # %(message)s',
+                        datefmt='%d-%b-%y %H:%M:%S')
+    logger.info('CTM Daemon: Start')
+    logger.info('Version: %s ', _modVer)
+    logger.info('System Platform: %s ', w3rkstatt.sPlatform)
+
+    runDaemon(socketPath=alerts_socket)
+    logging.shutdown()
@@ -26,6 +26,23 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210527      Volker Scheithauer    Tranfer Development from other projects
 20220715      Volker Scheithauer    BMC Helix Operation Management Integration
+20261018      Orchestrator          Alert journal, resume from last completed stage
+20261018      Orchestrator          Concurrent job alert enrichment
+20261018      Orchestrator          Deferred job log and output retrieval
+20261018      Orchestrator          BHOM assign and note off the alert path
+20261018      Orchestrator          Acknowledge coalesced alerts together
+20261018      Orchestrator          Batched alert status and comment updates
+20261018      Orchestrator          Concurrent ITSM, BHOM and TSIM sinks
+20261018      Orchestrator          Enriched alert as dict, serialized once
+20261018      Orchestrator          Optional NDJSON alert store
+20261018      Orchestrator          Hot reload of project config
+20261018      Orchestrator          Resolve own host name on first use
+20261018      Orchestrator          Bounded job output in alerts
+20261018      Orchestrator          TSIM events from the shared event mapping
+20261018      Orchestrator          Settings from one applyConfig, also on reload
+20261018      Orchestrator          Job log and output lookups with CTM.jobs.log_level
+20261018      Orchestrator          Update the incident of the first alert of a storm
+20261018      Orchestrator          Journal the acknowledgement once it is sent
 
 """
 
@@ -37,6 +54,9 @@ import platform
 import argparse
 import os
 import json
+import re
+import threading
+import concurrent.futures
 from collections import OrderedDict
 import collections
 from xml.sax.handler import ContentHandler
@@ -49,6 +69,8 @@ try:
     import core_itsm as itsm
     import core_tsim as tsim
     import core_bhom as bhom
+    import ctm_spool as spool
+    import ctm_store as store
 except:
     # fix import issues for modules
     sys.path.append(
@@ -58,62 +80,122 @@ except:
     from src import core_itsm as itsm
     from src import core_tsim as tsim
     from src import core_bhom as bhom
+    from src import ctm_spool as spool
+    from src import ctm_store as store
 
 # Get configuration from bmcs_core.json
-jCfgData = w3rkstatt.getProjectConfig()
-cfgFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.config_folder",
-                                   data=jCfgData)
-logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder", data=jCfgData)
-tmpFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.template_folder",
-                                   data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(path="$.DEFAULT.crypto_file",
-                                    data=jCfgData)
-
-data_folder = logFolder
-ctm_host = w3rkstatt.getJsonValue(path="$.CTM.host", data=jCfgData)
-ctm_port = w3rkstatt.getJsonValue(path="$.CTM.port", data=jCfgData)
-
-integration_itsm_enabled = w3rkstatt.getJsonValue(path="$.CTM.itsm.enabled",
-                                                  data=jCfgData)
-integration_tsim_enabled = w3rkstatt.getJsonValue(path="$.CTM.tsim.enabled",
-                                                  data=jCfgData)
-integration_bhom_enabled = w3rkstatt.getJsonValue(path="$.CTM.bhom.enabled",
-                                                  data=jCfgData)
-
-# Extract CTM job log & details
-# Level: full, mini
-ctm_job_log_level = w3rkstatt.getJsonValue(path="$.CTM.jobs.log_level",
-                                           data=jCfgData)
-ctm_job_detail_level = w3rkstatt.getJsonValue(path="$.CTM.jobs.detail_level",
-                                              data=jCfgData)
+cfg = w3rkstatt.getConfig()
 
+# Integration sinks, own worker pool and timeout per sink
+integration_sinks = {}
 ctmCoreData = None
 ctmJobData = None
+jobScheduler = None
+alertStore = None
+sinkPoolLock = threading.Lock()
+alertFileLock = threading.Lock()
 
-# Assign module defaults
-_localDebug = jCfgData["DEFAULT"]["debug"]["api"]
-_localDebugFunctions = jCfgData["DEFAULT"]["debug"]["functions"]
-_localDebugData = jCfgData["DEFAULT"]["debug"]["data"]
-_localDebugAdvanced = jCfgData["DEFAULT"]["debug"]["advanced"]
-_localQA = jCfgData["DEFAULT"]["debug"]["qa"]
-_localDebugBHOM = jCfgData["BHOM"]["debug"]
-_localDebugITSM = jCfgData["ITSM"]["debug"]
 
-_FutureUse = False
+def applyConfig(cfg):
+    """    Set the module settings from the project config, at import and after a reload
+    Running workers pick them up with the next alert
+    :param ProjectConfig cfg: project config
+    """
+    global jCfgData, cfgFolder, logFolder, tmpFolder, cryptoFile, data_folder
+    global ctm_host, ctm_port, integration_itsm_enabled
+    global integration_tsim_enabled, integration_bhom_enabled
+    global ctm_job_log_level, ctm_job_detail_level, ctm_job_output_mode
+    global ctm_job_log_enabled, ctm_job_output_enabled
+    global ctm_job_retry_delay, ctm_job_retry_backoff, ctm_job_retry_limit
+    global ctm_job_retry_deadline
+    global _localDebug, _localDebugFunctions, _localDebugData
+    global _localDebugAdvanced, _localQA, _localDebugBHOM, _localDebugITSM
+
+    jCfgData = cfg.data
+    cfgFolder = cfg.default.config_folder
+    logFolder = cfg.default.log_folder
+    tmpFolder = cfg.default.template_folder
+    cryptoFile = cfg.default.crypto_file
+
+    data_folder = logFolder
+    ctm_host = cfg.ctm.host
+    ctm_port = cfg.ctm.port
+
+    integration_itsm_enabled = cfg.ctm.get("itsm.enabled")
+    integration_tsim_enabled = cfg.ctm.get("tsim.enabled")
+    integration_bhom_enabled = cfg.ctm.get("bhom.enabled")
+
+    # Extract CTM job log & details
+    # Level: full, mini
+    ctm_job_log_level = cfg.ctm.get("jobs.log_level")
+    ctm_job_detail_level = cfg.ctm.get("jobs.detail_level")
+    # Job output: capture (first and last lines), full, none
+    ctm_job_output_mode = cfg.ctm.get("jobs.output.mode") or "capture"
+    # job log and output are only requested with a log level
+    ctm_job_log_enabled = ctm_job_log_level in ("full", "mini")
+    ctm_job_output_enabled = ctm_job_log_enabled and \
+        ctm_job_output_mode != "none"
+
+    # Retry job log & output retrieval in the background
+    # Seconds: first delay, max. delay, give up after deadline
+    ctm_job_retry_delay = cfg.ctm.get("jobs.retry.delay")
+    if not ctm_job_retry_delay:
+        ctm_job_retry_delay = 2
+    ctm_job_retry_backoff = cfg.ctm.get("jobs.retry.backoff")
+    if not ctm_job_retry_backoff:
+        ctm_job_retry_backoff = 2
+    ctm_job_retry_limit = cfg.ctm.get("jobs.retry.limit")
+    if not ctm_job_retry_limit:
+        ctm_job_retry_limit = 60
+    ctm_job_retry_deadline = cfg.ctm.get("jobs.retry.deadline")
+    if not ctm_job_retry_deadline:
+        ctm_job_retry_deadline = 300
+
+    # Seconds: max. wait for the sink result
+    # new worker pool for a new size, the old one ends with its last call
+    for sink, timeout in (("itsm", 60), ("bhom", 30), ("tsim", 30)):
+        sink_workers = cfg.ctm.get(sink + ".workers")
+        if not sink_workers:
+            sink_workers = 2
+        sink_timeout = cfg.ctm.get(sink + ".timeout")
+        if not sink_timeout:
+            sink_timeout = timeout
+        with sinkPoolLock:
+            jSink = integration_sinks.get(sink)
+            if jSink is not None and jSink["pool"] is not None and \
+                    jSink["workers"] != int(sink_workers):
+                jSink["pool"] = None
+            integration_sinks[sink] = {
+                "workers": int(sink_workers),
+                "timeout": float(sink_timeout),
+                "pool": None if jSink is None else jSink["pool"]
+            }
+
+    # job log retries run on the Control-M worker pool, it may be new
+    if jobScheduler is not None:
+        jobScheduler.executor = ctm.getCtmTaskPool()
+
+    # Assign module defaults
+    _localDebug = cfg.default.get("debug.api")
+    _localDebugFunctions = cfg.default.get("debug.functions")
+    _localDebugData = cfg.default.get("debug.data")
+    _localDebugAdvanced = cfg.default.get("debug.advanced")
+    _localQA = cfg.default.get("debug.qa")
+    _localDebugBHOM = cfg.bhom.debug
+    _localDebugITSM = cfg.itsm.debug
+
+
+applyConfig(cfg)
 
 _localInfo = False
 _modVer = "3.0"
 _timeFormat = '%d %b %Y %H:%M:%S,%f'
-_ctmActiveApi = False
 
 logger = w3rkstatt.logging.getLogger(__name__)
-logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
+logFile = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
-hostFqdn = w3rkstatt.getHostFqdn(hostName)
-domain = w3rkstatt.getHostDomain(hostFqdn)
 epoch = time.time()
 parser = argparse.ArgumentParser(prefix_chars=':')
 sUuid = w3rkstatt.sUuid
@@ -204,9 +286,9 @@ def getCtmJobInfo(ctmApiClient, data):
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "getCtmJobInfo")
         logger.info('CTM Get Job Info: "%s:%s"', ctmDataCenter, ctmOrderId)
-    jData = ctm.getCtmJobInfo(ctmApiClient=ctmApiClient,
-                              ctmServer=ctmDataCenter,
-                              ctmOrderID=ctmOrderId)
+    jData = ctm.getCtmJobInfoData(ctmApiClient=ctmApiClient,
+                                  ctmServer=ctmDataCenter,
+                                  ctmOrderID=ctmOrderId)
 
     if _localDebugFunctions or _localDebugData:
         logger.debug('Data = "%s" ', "jData")
@@ -236,46 +318,33 @@ def getCtmJobRunLog(ctmApiClient, data):
     if _localDebugFunctions or _localDebugData:
         logger.debug('CMT Job Run Log Raw: %s', jCtmJobLog)
 
-    sCtmJobLog = str(jCtmJobLog)
-
-    return sCtmJobLog
+    return jCtmJobLog
 
 
 def getCtmJobLog(ctmApiClient, data):
-    # Get CTM job log after 30 sec - wait for archive server to have log
+    # Single attempt, if the archive server has no log yet
+    # deferAlert4Job retries in the background
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "getCtmJobLog")
-        logger.debug('CMT Job Log: First attempt to retrieve data')
-    time.sleep(2)
-    sCtmJobLog = getCtmJobRunLog(ctmApiClient, data)
+    jCtmJobLog = getCtmJobRunLog(ctmApiClient, data)
+    if not isinstance(jCtmJobLog, dict):
+        # log could not be parsed into entries
+        jCtmJobLog = {"count": 1, "status": False, "entries": [jCtmJobLog]}
 
     if _localDebugFunctions or _localDebugData:
-        logger.debug('CMT Job Log Raw: %s', sCtmJobLog)
+        logger.debug('CMT Job Log Raw: %s', jCtmJobLog)
 
-    jCtmJobLog = json.loads(sCtmJobLog)
-    ctmStatus = w3rkstatt.getJsonValue(path="$.status", data=jCtmJobLog)
-
-    if ctmStatus != True:
-        if _localDebugFunctions:
-            logger.debug('CMT Job Log: Second attempt to retrieve data')
-        time.sleep(2)
-        jCtmJobLog = getCtmJobRunLog(ctmApiClient, data)
-        sCtmJobLog = w3rkstatt.dTranslate4Json(data=jCtmJobLog)
-
-    return sCtmJobLog
+    return jCtmJobLog
 
 
 def getCtmJobConfig(ctmApiClient, data):
     jCtmJobInfo = data
-    ctmFolderInfo = getCtmFolder(ctmApiClient=ctmApiClient, data=jCtmJobInfo)
-    jCtmFolderInfo = json.loads(ctmFolderInfo)
-    iCtmFolderInfo = w3rkstatt.getJsonValue(path="$.count",
-                                            data=jCtmFolderInfo)
-    sStatus = w3rkstatt.getJsonValue(path="$.status", data=jCtmFolderInfo)
+    jCtmFolderInfo = getCtmFolder(ctmApiClient=ctmApiClient, data=jCtmJobInfo)
+    iCtmFolderInfo = jCtmFolderInfo["count"]
+    sStatus = jCtmFolderInfo["status"]
 
     if ctm_job_detail_level == "full" or iCtmFolderInfo == 1:
-        jCtmJobDetail = ctmFolderInfo
-        sCtmJobDetail = w3rkstatt.dTranslate4Json(data=jCtmJobDetail)
+        jCtmJobDetail = jCtmFolderInfo
     else:
         if _localDebugData:
             logger.debug('Function = "%s" ', "getCtmJobConfig")
@@ -286,13 +355,12 @@ def getCtmJobConfig(ctmApiClient, data):
             jCtmFolderName = w3rkstatt.getJsonValue(path="$.folder",
                                                     data=jCtmJobInfo)
             jQl = "$." + str(jCtmFolderName) + "." + str(jCtmJobName)
-            jData = json.loads(ctmFolderInfo)
-            jCtmJobDetail = w3rkstatt.getJsonValue(path=jQl, data=jData)
-            sCtmJobDetail = w3rkstatt.dTranslate4Json(data=jCtmJobDetail)
+            jCtmJobDetail = w3rkstatt.getJsonValue(path=jQl,
+                                                   data=jCtmFolderInfo)
         else:
-            sCtmJobDetail = ctmFolderInfo
+            jCtmJobDetail = jCtmFolderInfo
 
-    return sCtmJobDetail
+    return jCtmJobDetail
 
 
 def getCtmArchiveJobLog(ctmApiClient, data):
@@ -319,28 +387,51 @@ def getCtmJobRunOutput(ctmApiClient, data):
         logger.info('CTM Get Job Run Output: "%s # %s"', ctmJobID,
                     ctmJobRunCounter)
 
-    value = ctm.getCtmJobOutput(ctmApiClient=ctmApiClient,
-                                ctmJobID=ctmJobID,
-                                ctmJobRunId=ctmJobRunCounter)
-    if _localDebugFunctions:
-        logger.debug('CMT Job Output Raw: %s', value)
-
-    ctmJobOutput = ctm.transformCtmJobOutput(data=value)
+    if ctm_job_output_mode == "full":
+        value = ctm.getCtmJobOutput(ctmApiClient=ctmApiClient,
+                                    ctmJobID=ctmJobID,
+                                    ctmJobRunId=ctmJobRunCounter)
+        if _localDebugFunctions:
+            logger.debug('CMT Job Output Raw: %s', value)
+        ctmJobOutput = ctm.transformCtmJobOutput(data=value)
+    else:
+        value = ctm.getCtmJobOutput(ctmApiClient=ctmApiClient,
+                                    ctmJobID=ctmJobID,
+                                    ctmJobRunId=ctmJobRunCounter,
+                                    stream=True)
+        ctmJobOutput = ctm.captureCtmJobOutput(
+            data=value,
+            fileName=getCtmJobOutputFileName(ctmJobID, ctmJobRunCounter))
 
     if _localDebugFunctions or _localDebugData:
         logger.debug('CMT Job Run Output: %s', ctmJobOutput)
     return ctmJobOutput
 
 
+def getCtmJobOutputFileName(ctmJobID, ctmJobRunCounter):
+    # spill file of the full job output, e.g. ctm-output-srv_0001a-00002.log
+    sName = "ctm-output-" + str(ctmJobID) + "-" + str(ctmJobRunCounter)
+    return re.sub(r"[^\w.-]", "_", sName) + ".log"
+
+
 def getCtmArchiveJobRunOutput(ctmApiClient, data):
     ctmData = data
     ctmJobID = w3rkstatt.getJsonValue(path="$.job_id", data=ctmData)
     ctmJobRunCounter = w3rkstatt.getJsonValue(path="$.run_counter",
                                               data=ctmData)
-    value = ctm.getCtmArchiveJobOutput(ctmApiClient=ctmApiClient,
-                                       ctmJobID=ctmJobID,
-                                       ctmJobRunId=ctmJobRunCounter)
-    ctmJobOutput = ctm.transformCtmJobOutput(data=value)
+    if ctm_job_output_mode == "full":
+        value = ctm.getCtmArchiveJobOutput(ctmApiClient=ctmApiClient,
+                                           ctmJobID=ctmJobID,
+                                           ctmJobRunId=ctmJobRunCounter)
+        ctmJobOutput = ctm.transformCtmJobOutput(data=value)
+    else:
+        value = ctm.getCtmArchiveJobOutput(ctmApiClient=ctmApiClient,
+                                           ctmJobID=ctmJobID,
+                                           ctmJobRunId=ctmJobRunCounter,
+                                           stream=True)
+        ctmJobOutput = ctm.captureCtmJobOutput(
+            data=value,
+            fileName=getCtmJobOutputFileName(ctmJobID, ctmJobRunCounter))
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "getCtmArchiveJobRunOutput")
         logger.debug('CMT Job Output Raw: %s', ctmJobOutput)
@@ -348,29 +439,143 @@ def getCtmArchiveJobRunOutput(ctmApiClient, data):
 
 
 def getCtmJobOutput(ctmApiClient, data):
-    # Get CTM job log after 30 sec - wait for archive server to have log
+    # Single attempt, if the archive server has no output yet
+    # deferAlert4Job retries in the background
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "getCtmJobOutput")
-        logger.debug('CMT Job Output: First attempt to retrieve data')
-    time.sleep(2)
     jCtmJobOutput = getCtmJobRunOutput(ctmApiClient, data)
-    ctmStatus = w3rkstatt.getJsonValue(path="$.status", data=jCtmJobOutput)
 
-    if ctmStatus != True:
-        if _localDebugFunctions:
-            logger.debug('CMT Job Output: Second attempt to retrieve data')
-        time.sleep(2)
-        jCtmJobOutput = getCtmJobRunOutput(ctmApiClient, data)
+    return jCtmJobOutput
 
-    # transform to JSON string
-    sCtmJobOutput = w3rkstatt.dTranslate4Json(data=jCtmJobOutput)
 
-    return sCtmJobOutput
+def getCtmJobDataStatus(data):
+    # True if job log / output has been retrieved
+    try:
+        return data.get("status") == True
+    except (ValueError, TypeError, AttributeError):
+        return False
+
+
+def getJobScheduler():
+    global jobScheduler
+    if jobScheduler is None:
+        jobScheduler = w3rkstatt.RetryScheduler(executor=ctm.getCtmTaskPool())
+    return jobScheduler
+
+
+def getAlertStore(background=False):
+    # NDJSON segments instead of one file per alert, CTM.alerts.store.mode
+    # sealed segments are compressed by the alert daemon (background) only
+    global alertStore
+    with alertFileLock:
+        if alertStore is None:
+            alertStore = store.getStore(data=jCfgData,
+                                        folder=data_folder,
+                                        background=background)
+            if alertStore is None:
+                alertStore = False
+    return alertStore
+
+
+def updateAlertFile4Job(filePath, key, data, alert=None):
+    # Replace placeholder of a late job log / output in the alert file
+    alertStore = getAlertStore()
+    if alertStore:
+        alertStore.update(alert_id=alert, key=key, value=data)
+        return True
+    with alertFileLock:
+        if not w3rkstatt.getFileStatus(path=filePath):
+            return False
+        fileContent = w3rkstatt.getFileJson(file=filePath)
+        fileContent[key] = [data]
+        return w3rkstatt.writeJsonFile(file=filePath, content=fileContent)
+
+
+def deferAlert4Job(ctmApiObj, data, filePath, incident, bhomEventId,
+                   closeConnection):
+    """    Retrieve missing job log / output in the background
+    Retries with exponential backoff until CTM.jobs.retry.deadline. Late
+    results are written to the alert file and added as ITSM worklog and
+    BHOM event note.
+    :param CtmConnection ctmApiObj: Automation API connection
+    :param dict data: enriched alert
+    :param str filePath: alert file
+    :param str incident: ITSM incident id
+    :param str bhomEventId: BHOM event id
+    :param bool closeConnection: logout once all retries are done
+    :return: number of deferred lookups
+    :rtype: int
+    """
+    jCtmAlert = data
+    jCtmJobAlert = jCtmAlert["jobAlert"][0]
+    sCtmAlertId = str(jCtmJobAlert.get("alert_id")).strip()
+    # only the lookups enabled by CTM.jobs.log_level / output.mode
+    tasks = {}
+    if ctm_job_log_enabled:
+        tasks["jobLog"] = getCtmJobLog
+    if ctm_job_output_enabled:
+        tasks["jobOutput"] = getCtmJobOutput
+    lMissing = []
+    for key in tasks:
+        if jCtmAlert[key][0].get("status") != True:
+            lMissing.append(key)
+
+    if len(lMissing) < 1:
+        if closeConnection:
+            ctm.delCtmConnection(ctmApiObj)
+        return 0
+
+    jPending = {"count": len(lMissing)}
+    lock = threading.Lock()
+
+    def taskDone(key, result, status):
+        if status:
+            logger.info('CTM Deferred %s: Alert %s', key, sCtmAlertId)
+            updateAlertFile4Job(filePath=filePath,
+                                key=key,
+                                data=result,
+                                alert=sCtmAlertId)
+            jWorklogData = [result]
+            if isIncident(incident):
+                createWorklog(token=itsm.authenticate(),
+                              data=jWorklogData,
+                              incident=incident)
+            if bhomEventId and bhomEventId != "BHOM-0000":
+                authToken = bhom.authenticate()
+                if authToken != None:
+                    bhom.addNoteEvent(token=authToken,
+                                      event_id=bhomEventId,
+                                      event_note=json.dumps(result))
+        else:
+            logger.error('CTM Deferred %s: Alert %s not available', key,
+                         sCtmAlertId)
+
+        with lock:
+            jPending["count"] -= 1
+            bLast = jPending["count"] < 1
+        if bLast and closeConnection:
+            ctm.delCtmConnection(ctmApiObj)
+
+    scheduler = getJobScheduler()
+    for key in lMissing:
+        scheduler.retry(func=tasks[key],
+                        args={
+                            "ctmApiClient": ctmApiObj.api_client,
+                            "data": jCtmJobAlert
+                        },
+                        check=getCtmJobDataStatus,
+                        callback=lambda result, status, key=key: taskDone(
+                            key, result, status),
+                        delay=ctm_job_retry_delay,
+                        backoff=ctm_job_retry_backoff,
+                        limit=ctm_job_retry_limit,
+                        deadline=ctm_job_retry_deadline)
+    return len(lMissing)
 
 
 def createITSM(data):
 
-    jCtmAlert = json.loads(data)
+    jCtmAlert = data
 
     # ToDO: Update Incident data
     # Add Logic to map CTM Alerts to Incident Support Groups
@@ -511,6 +716,34 @@ def createWorklog(token, data, incident):
     return result
 
 
+def isIncident(incident):
+    # placeholder ids of skipped or failed incidents
+    return str(incident) not in ("", "None", "INC-0000", "INC-9999",
+                                 "WRK-0000")
+
+
+def getAlertSection(data):
+    # alert part of an enriched job, core or infra alert
+    for key in ("jobAlert", "coreAlert", "infraAlert"):
+        if key in data:
+            return data[key]
+    return [data]
+
+
+def updateITSM(data, incident):
+    """    Add a storm of follow-up alerts to the incident of the first alert
+    :param dict data: enriched representative alert
+    :param str incident: incident id of the first alert
+    :return: incident id
+    :rtype: str
+    """
+    createWorklog(token=itsm.authenticate(),
+                  data=getAlertSection(data),
+                  incident=incident)
+    logger.info('ITSM Incident: %s updated', incident)
+    return incident
+
+
 def getCtmFolder(ctmApiClient, data):
     ctmData = data
     ctmFolderID = ctmData["entries"][0]["folder_id"]
@@ -524,19 +757,22 @@ def getCtmFolder(ctmApiClient, data):
                                      ctmFolder=ctmFolder)
 
     # adjust new ctm aapi result
-    sCtmDeployedFolderTmp = w3rkstatt.dTranslate4Json(str(value))
-    jCtmDeployedFolderTmp = json.loads(sCtmDeployedFolderTmp)
-    jCtmDeployedFolder = jCtmDeployedFolderTmp
+    if isinstance(value, str):
+        jCtmDeployedFolder = json.loads(value)
+    elif hasattr(value, "to_dict"):
+        jCtmDeployedFolder = value.to_dict()
+    else:
+        jCtmDeployedFolder = value
 
     # adjust if CTM API access failed
     sJobLogStatus = True
     # Failed to get
-    if "Failed to get" in str(sCtmDeployedFolderTmp):
+    if "Failed to get" in str(jCtmDeployedFolder):
         sJobLogStatus = False
-        sEntry = ""
+        jEntry = {}
         i = 0
     else:
-        sEntry = sCtmDeployedFolderTmp[1:-1]
+        jEntry = jCtmDeployedFolder
         i = 1
 
     # Check future use?
@@ -554,105 +790,147 @@ def getCtmFolder(ctmApiClient, data):
     # else:
     #     sEntry = '"entry-0000": "' + value + '"'
 
-    jData = '{"count":' + str(i) + ',"status":' + \
-        str(sJobLogStatus) + ',"entries":[{' + str(sEntry) + '}]}'
-    sData = w3rkstatt.dTranslate4Json(data=jData)
+    jData = {"count": i, "status": sJobLogStatus, "entries": [jEntry]}
+
+    return jData
 
-    return sData
 
+def getCtmJobConfig4Info(ctmApiClient, jobInfo):
+    # Folder / Job Details, requires job info
+    jCtmJobInfo = jobInfo
+    ctmJobInfoCount = jCtmJobInfo.get("count")
 
-def analyzeAlert4Job(ctmApiClient, raw, data):
+    if ctmJobInfoCount >= 1:
+        jCtmJobConfig = getCtmJobConfig(ctmApiClient=ctmApiClient,
+                                        data=jCtmJobInfo)
+    else:
+        jCtmJobConfig = {"count": 0, "status": None, "entries": []}
+    return jCtmJobConfig
+
+
+def enrichAlert4Job(ctmApiClient, data):
+    """    Get job details for a job alert
+    Lookups run on the shared worker pool, the job config waits for the job
+    info. Job log and output are requested alongside if CTM.jobs.log_level
+    is set. A lookup exceeding CTM.jobs.timeout falls back to the 'unknown'
+    placeholder.
+    :param ApiClient ctmApiClient: Automation API client
+    :param dict data: transformed alert
+    :return: jobInfo, jobConfig, jobLog, jobOutput
+    :rtype: dict
+    """
+    tasks = {
+        "jobInfo": {
+            "func": getCtmJobInfo,
+            "args": {
+                "ctmApiClient": ctmApiClient,
+                "data": data
+            },
+            "default": {
+                "count": 0,
+                "status": "unknown"
+            }
+        },
+        "jobConfig": {
+            "func": getCtmJobConfig4Info,
+            "args": {
+                "ctmApiClient": ctmApiClient
+            },
+            "requires": ["jobInfo"],
+            "default": {
+                "count": 0,
+                "status": "unknown"
+            }
+        }
+    }
+
+    if ctm_job_output_enabled:
+        tasks["jobOutput"] = {
+            "func": getCtmJobOutput,
+            "args": {
+                "ctmApiClient": ctmApiClient,
+                "data": data
+            },
+            "default": {
+                "count": 0,
+                "status": "unknown"
+            }
+        }
+    if ctm_job_log_enabled:
+        tasks["jobLog"] = {
+            "func": getCtmJobLog,
+            "args": {
+                "ctmApiClient": ctmApiClient,
+                "data": data
+            },
+            "default": {
+                "count": 0,
+                "status": "unknown"
+            }
+        }
+
+    jCtmJobData = w3rkstatt.runTaskGraph(tasks=tasks,
+                                         executor=ctm.getCtmTaskPool(),
+                                         timeout=ctm.ctm_job_timeout)
+    if _localDebugFunctions:
+        logger.debug('Function = "%s" ', "enrichAlert4Job")
+    return jCtmJobData
+
+
+def analyzeAlert4Job(ctmApiClient, raw, data, uuid=sUuid):
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "analyzeAlert4Job")
         logger.info('CTM: Analyze Alert for Jobs - Start')
 
     jCtmAlert = data
     ctmOrderId = w3rkstatt.getJsonValue(path="$.order_id", data=jCtmAlert)
+    ctmAlertCallType = str(
+        w3rkstatt.getJsonValue(path="$.call_type", data=jCtmAlert))
     ctmJobData = None
-    jCtmAlertData = json.dumps(jCtmAlert)
-    sCtmAlertData = str(jCtmAlertData)
     jCtmAlertRaw = raw
 
-    sCtmJobInfo = '{"count": 0,"status": "unknown"}'
-    sCtmJobOutput = '{"count": 0,"status": "unknown"}'
-    sCtmJobLog = '{"count": 0,"status": "unknown"}'
-    sCtmJobConfig = '{"count": 0,"status": "unknown"}'
+    jCtmJobInfo = {"count": 0, "status": "unknown"}
+    jCtmJobOutput = {"count": 0, "status": "unknown"}
+    jCtmJobLog = {"count": 0, "status": "unknown"}
+    jCtmJobConfig = {"count": 0, "status": "unknown"}
 
     if not ctmOrderId == "00000" and ctmOrderId is not None:
 
         if "New" in ctmAlertCallType:
-            # Get CTM Job Info
-            ctmJobId = w3rkstatt.getJsonValue(path="$.job_id", data=jCtmAlert)
-            ctmJobName = w3rkstatt.getJsonValue(path="$.job_name",
-                                                data=jCtmAlert)
-
-            if _ctmActiveApi:
-                # Get job information
-                sCtmJobInfo = getCtmJobInfo(ctmApiClient=ctmApiClient,
-                                            data=jCtmAlert)
-
-                if _FutureUse:
-                    # Get job output
-                    sCtmJobOutput = getCtmJobOutput(ctmApiClient=ctmApiClient,
-                                                    data=jCtmAlert)
-
-                    jCtmJobOutput = json.loads(sCtmJobOutput)
-                    sCtmJobOutputStatus = jCtmJobOutput["status"]
-
-                    # Get job log
-                    # if sCtmJobOutputStatus:
-                    #     sCtmJobLog = getCtmJobLog(
-                    #         ctmApiClient=ctmApiClient, data=jCtmAlert)
-                    # else:
-                    #    sCtmJobLog = '{"collection":"no accessible"}'
-                    sCtmJobLog = getCtmJobLog(ctmApiClient=ctmApiClient,
+            if ctmApiClient is not None:
+                # Job info, then job config, job log and output alongside
+                jCtmJobData = enrichAlert4Job(ctmApiClient=ctmApiClient,
                                               data=jCtmAlert)
-                    jCtmJobLog = json.loads(sCtmJobLog)
+                jCtmJobInfo = jCtmJobData["jobInfo"]
+                jCtmJobConfig = jCtmJobData["jobConfig"]
+                if ctm_job_log_enabled:
+                    jCtmJobLog = jCtmJobData["jobLog"]
                 else:
-                    sCtmJobLog = '{"count": 0,"status": "experimental"}'
-
-                # Create JSON object
-                jCtmJobInfo = json.loads(sCtmJobInfo)
-
-                # Folder / Job Details
-                ctmJobInfoCount = w3rkstatt.getJsonValue(path="$.count",
-                                                         data=jCtmJobInfo)
-
-                if ctmJobInfoCount >= 1:
-                    sCtmJobConfig = getCtmJobConfig(ctmApiClient=ctmApiClient,
-                                                    data=jCtmJobInfo)
+                    jCtmJobLog = {"count": 0, "status": "disabled"}
+                if ctm_job_output_enabled:
+                    jCtmJobOutput = jCtmJobData["jobOutput"]
                 else:
-                    xData = '{"count":0,"status":' + \
-                        str(None) + ',"entries":[]}'
-                    sCtmJobConfig = w3rkstatt.dTranslate4Json(data=xData)
-
-            # Prep for str concat
-            sCtmAlertRaw = str(jCtmAlertRaw)
-            ctmJobData = '{"uuid":"' + sUuid + '","raw":[' + sCtmAlertRaw + '],"jobAlert":[' + sCtmAlertData + '],"jobInfo":[' + \
-                sCtmJobInfo + '],"jobConfig":[' + sCtmJobConfig + '],"jobLog":[' + \
-                sCtmJobLog + '],"jobOutput":[' + sCtmJobOutput + ']}'
-            ctmJobData = w3rkstatt.dTranslate4Json(data=ctmJobData)
-
-        # Convert event data to the JSON format required by the API.
+                    jCtmJobOutput = {"count": 0, "status": "disabled"}
+
+            ctmJobData = {
+                "uuid": uuid,
+                "raw": [jCtmAlertRaw],
+                "jobAlert": [jCtmAlert],
+                "jobInfo": [jCtmJobInfo],
+                "jobConfig": [jCtmJobConfig],
+                "jobLog": [jCtmJobLog],
+                "jobOutput": [jCtmJobOutput]
+            }
+
     else:
-        sCtmAlertRaw = str(jCtmAlertRaw)
-        sjCtmAlert = w3rkstatt.dTranslate4Json(data=jCtmAlert)
         # defaults
-        sCtmJobInfo = w3rkstatt.dTranslate4Json(data='{"count":' + str(None) +
-                                                ',"status":' + str(None) +
-                                                ',"entries":[]}')
-        sCtmJobOutput = w3rkstatt.dTranslate4Json(data='{"count":' +
-                                                  str(None) + ',"status":' +
-                                                  str(None) + ',"entries":[]}')
-        sCtmJobLog = w3rkstatt.dTranslate4Json(data='{"count":' + str(None) +
-                                               ',"status":' + str(None) +
-                                               ',"entries":[]}')
-        sCtmJobConfig = w3rkstatt.dTranslate4Json(data='{"count":' +
-                                                  str(None) + ',"status":' +
-                                                  str(None) + ',"entries":[]}')
-        ctmJobData = '{"uuid":"' + sUuid + '","raw":[' + sCtmAlertRaw + '],"jobAlert":[' + sCtmAlertData + '],"jobInfo":[' + \
-            sCtmJobInfo + '],"jobConfig":[' + sCtmJobConfig + '],"jobLog":[' + \
-            sCtmJobLog + '],"jobOutput":[' + sCtmJobOutput + ']}'
+        ctmJobData = {
+            "uuid": uuid,
+            "raw": [jCtmAlertRaw],
+            "jobAlert": [jCtmAlert]
+        }
+        for key in ("jobInfo", "jobConfig", "jobLog", "jobOutput"):
+            ctmJobData[key] = [{"count": None, "status": None, "entries": []}]
 
     if _localDebugFunctions or _localDebugData:
         logger.debug('Data = "%s" ', "ctmJobData")
@@ -660,24 +938,12 @@ def analyzeAlert4Job(ctmApiClient, raw, data):
     return ctmJobData
 
 
-def analyzeAlert4Core(raw, data):
+def analyzeAlert4Core(raw, data, uuid=sUuid):
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "analyzeAlert4Core")
         logger.info('CTM: Analyze Alert for Core - Start')
 
-    jCtmAlert = data
-    ctmCoreData = None
-    jCtmAlertData = json.dumps(jCtmAlert)
-    jCtmAlertRaw = raw
-
-    # Prep for str concat
-    sCtmAlertRaw = str(jCtmAlertRaw)
-    sCtmAlertData = str(jCtmAlertData)
-
-    ctmCoreData = '{"uuid":"' + sUuid + \
-        '","raw":[' + sCtmAlertRaw + '],"coreAlert":[' + sCtmAlertData + ']}'
-    ctmCoreData = w3rkstatt.jsonTranslateValues(ctmCoreData)
-    ctmCoreData = w3rkstatt.jsonTranslateValuesAdv(ctmCoreData)
+    ctmCoreData = {"uuid": uuid, "raw": [raw], "coreAlert": [data]}
 
     if _localDebugFunctions or _localDebugData:
         logger.debug('Data = "%s" ', "ctmCoreData")
@@ -685,24 +951,12 @@ def analyzeAlert4Core(raw, data):
     return ctmCoreData
 
 
-def analyzeAlert4Infra(raw, data):
+def analyzeAlert4Infra(raw, data, uuid=sUuid):
     if _localDebugFunctions:
         logger.debug('Function = "%s" ', "analyzeAlert4Infra")
         logger.info('CTM: Analyze Alert for Infra - Start')
 
-    jCtmAlert = data
-    ctmCoreData = None
-    jCtmAlertData = json.dumps(jCtmAlert)
-    jCtmAlertRaw = raw
-
-    # Prep for str concat
-    sCtmAlertRaw = str(jCtmAlertRaw)
-    sCtmAlertData = str(jCtmAlertData)
-
-    ctmCoreData = '{"uuid":"' + sUuid + \
-        '","raw":[' + sCtmAlertRaw + '],"infraAlert":[' + sCtmAlertData + ']}'
-    ctmCoreData = w3rkstatt.jsonTranslateValues(ctmCoreData)
-    ctmCoreData = w3rkstatt.jsonTranslateValuesAdv(ctmCoreData)
+    ctmCoreData = {"uuid": uuid, "raw": [raw], "infraAlert": [data]}
 
     if _localDebugFunctions or _localDebugData:
         logger.debug('Data = "%s" ', "ctmCoreData")
@@ -710,21 +964,30 @@ def analyzeAlert4Infra(raw, data):
     return ctmCoreData
 
 
-def writeAlertFile(data, alert, type="job"):
-    fileStatus = False
-    ctmJobData = data
-    if _ctmActiveApi:
+def getAlertFilePath(alert, type="job", enriched=False, epoch=epoch):
+    if enriched:
         fileType = "ctm-enriched-" + type + "-"
     else:
         fileType = "ctm-basic-" + type + "-"
+    fileName = fileType + \
+        alert.zfill(8) + "-" + str(epoch).replace(".", "") + ".json"
+    filePath = w3rkstatt.concatPath(path=data_folder, folder=fileName)
+    return filePath
 
-    fileContent = json.loads(ctmJobData)
-    fileJsonStatus = w3rkstatt.jsonValidator(data=ctmJobData)
 
-    if fileJsonStatus:
-        fileName = fileType + \
-            alert.zfill(8) + "-" + str(epoch).replace(".", "") + ".json"
-        filePath = w3rkstatt.concatPath(path=data_folder, folder=fileName)
+def writeAlertFile(data, alert, type="job", enriched=False, epoch=epoch):
+    fileStatus = False
+    fileContent = data
+
+    alertStore = getAlertStore()
+    if alertStore and isinstance(fileContent, dict):
+        alertStore.append(record=fileContent, alert_id=alert, type=type)
+        fileStatus = True
+    elif isinstance(fileContent, dict):
+        filePath = getAlertFilePath(alert=alert,
+                                    type=type,
+                                    enriched=enriched,
+                                    epoch=epoch)
         fileRsp = w3rkstatt.writeJsonFile(file=filePath, content=fileContent)
         fileStatus = w3rkstatt.getFileStatus(path=filePath)
 
@@ -735,72 +998,300 @@ def writeAlertFile(data, alert, type="job"):
     return fileStatus
 
 
-if __name__ == "__main__":
-    logging.basicConfig(filename=logFile,
-                        filemode='a',
-                        level=logging.DEBUG,
-                        format='%(asctime)s - %(levelname)s # %(message)s',
-                        datefmt='%d-%b-%y %H:%M:%S')
+def transformAlert(data, checkpoint=None):
+    """    Transform Control-M alert arguments, once per alert
+    :param dict data: alert arguments as returned by ctmAlert2Dict
+    :param AlertCheckpoint checkpoint: journaled stages
+    :return: transformed alert
+    :rtype: dict
+    """
+    if checkpoint is not None and checkpoint.done("transformed"):
+        return checkpoint.get("transformed")
+
+    jCtmAlert = ctm.trasnformtCtmAlert(data=dict(data))
+    if checkpoint is not None:
+        checkpoint.mark("transformed", jCtmAlert)
+    return jCtmAlert
+
+
+def getSinkPool(sink):
+    # own worker pool per integration, a slow sink does not block the others
+    jSink = integration_sinks[sink]
+    with sinkPoolLock:
+        if jSink["pool"] is None:
+            jSink["pool"] = concurrent.futures.ThreadPoolExecutor(
+                max_workers=jSink["workers"],
+                thread_name_prefix="ctm-sink-" + sink)
+    return jSink["pool"]
+
+
+def sendAlert2ITSM(checkpoint, data, runCounter, cyclic, storm=None):
+    """    Create the ITSM incident of an alert
+    :param AlertCheckpoint checkpoint: journaled stages
+    :param str data: enriched alert
+    :param int runCounter: job run counter
+    :param str cyclic: job is cyclic
+    :param dict storm: ids of the first alert of a storm, follow-up alerts update its incident
+    :return: incident id
+    :rtype: str
+    """
+    ctmAlertDataFinal = data
+    ctmRunCounter = runCounter
+    sCtmJobCyclic = cyclic
+
+    logger.debug('CTM ITSM Integration: "%s"', "Start")
+    logger.debug('CTM ITSM Debug: "%s"', _localDebugITSM)
+    # Create Incident only once
+    # Catch Cyclic Jobs
+    if storm and isIncident(storm["itsm"]):
+        incident = checkpoint.run("itsm",
+                                  updateITSM,
+                                  data=ctmAlertDataFinal,
+                                  incident=storm["itsm"])
+    elif ctmRunCounter == 1 and sCtmJobCyclic:
+        if _localDebugITSM:
+            logger.debug('CTM ITSM Integration Cyclic Job Run: "%s"',
+                         ctmRunCounter)
+        incident = checkpoint.run("itsm", createITSM, data=ctmAlertDataFinal)
+    elif ctmRunCounter >= 1 and sCtmJobCyclic:
+        if _localDebugITSM:
+            logger.debug('CTM ITSM Integration Cyclic Job Run: "%s"',
+                         ctmRunCounter)
+        # Update Incident Worklog only
+        incident = "WRK-0000"
+    elif ctmRunCounter >= 1 and not sCtmJobCyclic:
+        if _localDebugITSM:
+            logger.debug('CTM ITSM Integration Normal Job Run: "%s"',
+                         ctmRunCounter)
+            logger.debug('CTM Alert Data forITSM : "%s"', ctmAlertDataFinal)
+        incident = checkpoint.run("itsm", createITSM, data=ctmAlertDataFinal)
+    elif ctmRunCounter == 0 and not sCtmJobCyclic:
+        incident = "INC-9999"
 
-    sSysOutMsg = ""
+    else:
+        incident = "INC-0000"
 
-    if _localInfo:
-        logger.info('CTM: start event management - %s', w3rkstatt.sUuid)
-        logger.info('Version: %s ', _modVer)
-        logger.info('System Platform: %s ', w3rkstatt.sPlatform)
-        logger.info('Log Level: %s', loglevel)
-        logger.info('Epoch: %s', epoch)
-        logger.info('Host Name: %s', w3rkstatt.sHostname)
-        logger.info('UUID: %s', w3rkstatt.sUuid)
+    logger.debug('CTM ITSM Integration: "%s"', "End")
+    return incident
 
-    # Extract script arguments
-    sCtmArguments = sys.argv[1:]
-    sCtmArgDict = ctmAlert2Dict(list=sCtmArguments,
-                                start=0,
-                                end=len(sCtmArguments))
-    jCtmArgs = json.dumps(sCtmArgDict)
-    jCtmAlert = json.loads(jCtmArgs)
-    ctmAlertId = str(w3rkstatt.getJsonValue(path="$.alert_id",
-                                            data=jCtmAlert)).strip()
-    ctmRunCounter = None
 
-    # Test integration with sample data
-    if not len(ctmAlertId) > 0:
-        if _localQA:
-            jCtmAlert = {
-                "call_type": "I",
-                "alert_id": "279",
-                "data_center": "ctm-srv.trybmc.com",
-                "memname": None,
-                "order_id": "0000q",
-                "severity": "V",
-                "status": "Not_Noticed",
-                "send_time": "20220729163544",
-                "last_user": None,
-                "last_time": None,
-                "message": "Ended not OK",
-                "run_as": "dbus",
-                "sub_application": "Integration",
-                "application": "ADE",
-                "job_name": "Agent Health",
-                "host_id": "ctm-net.trybmc.com",
-                "alert_type": "R",
-                "closed_from_em": None,
-                "ticket_number": None,
-                "run_counter": "00014",
-                "notes": None
+def sendAlert2BHOM(checkpoint, data, category, storm=None):
+    """    Create the BHOM event of an alert, assign and note follow later
+    :param AlertCheckpoint checkpoint: journaled stages
+    :param str data: enriched alert
+    :param str category: alert category
+    :param dict storm: ids of the first alert of a storm, follow-up alerts add a note to its event
+    :return: event id
+    :rtype: str
+    """
+    ctmAlertDataFinal = data
+    bhom_event_id = "BHOM-0000"
+    bhom_event_note = ""
+
+    if storm and storm["bhom"] and storm["bhom"] != "BHOM-0000":
+        bhom_event_id = storm["bhom"]
+        if not checkpoint.done("bhom"):
+            bhomFollowUp = bhom.getEventFollowUp()
+            bhomFollowUp.add(operation="addNote",
+                             event_id=bhom_event_id,
+                             slots={"notes": json.dumps(ctmAlertDataFinal)})
+            checkpoint.mark("bhom", bhom_event_id)
+        return bhom_event_id
+
+    # translate ctm alert to BHOM format
+    jBhomEvent = ctm.transformCtmBHOM(data=ctmAlertDataFinal,
+                                      category=category)
+
+    # future enhancements -> keep token for 24 hours
+    authToken = bhom.authenticate()
+    if authToken != None:
+        bhom_event_id = checkpoint.run("bhom",
+                                       bhom.createEvent,
+                                       token=authToken,
+                                       event_data=jBhomEvent)
+        # assign and add note once the event is available
+        bhom_assigned_user = w3rkstatt.getJsonValue(path="$.BHOM.user",
+                                                    data=jCfgData)
+        bhom_event_note = json.dumps(ctmAlertDataFinal)
+        if len(bhom_event_id) > 0:
+            bhomFollowUp = bhom.getEventFollowUp()
+            bhomFollowUp.add(operation="assign",
+                             event_id=bhom_event_id,
+                             slots={
+                                 "assigned_user":
+                                 bhom_assigned_user,
+                                 "notes":
+                                 "Control-M Alert Integration via: " +
+                                 w3rkstatt.getHostFqdn(hostName)
+                             })
+            bhomFollowUp.add(operation="addNote",
+                             event_id=bhom_event_id,
+                             slots={"notes": bhom_event_note})
+
+    if _localDebugBHOM:
+        logger.debug('CTM BHOM: Event      : %s', jBhomEvent)
+        logger.debug('CTM BHOM: Event Note : "%s"', bhom_event_note)
+        logger.debug('CTM BHOM: Event ID   : %s', bhom_event_id)
+        logger.debug('CTM BHOM: Auth Token : %s', authToken)
+    return bhom_event_id
+
+
+def sendAlert2TSIM(checkpoint, data, category):
+    """    Create the TrueSight event of an alert
+    :param AlertCheckpoint checkpoint: journaled stages
+    :param str data: enriched alert
+    :param str category: alert category
+    :return: event id
+    :rtype: str
+    """
+    tsim_event_id = ""
+
+    # same event slots as BHOM, TSIM expects wrapped events
+    jTsimEvent = ctm.transformCtmTSIM(data=data,
+                                      category=category,
+                                      hostName=w3rkstatt.getHostFqdn(hostName))
+
+    authToken = tsim.authenticate()
+    if authToken != None:
+        tsim_event_id = checkpoint.run("tsim",
+                                       tsim.createEvent,
+                                       token=authToken,
+                                       event_data=jTsimEvent)
+    logger.debug('CTM TSIM: Event ID   : %s', tsim_event_id)
+    return tsim_event_id
+
+
+def sendAlert2Sinks(checkpoint,
+                    data,
+                    category,
+                    runCounter,
+                    cyclic,
+                    storm=None):
+    """    Forward an enriched alert to the enabled integrations concurrently
+    Every integration runs on its own worker pool with its own timeout.
+    A failing or slow integration is reported with its default id.
+    Follow-up alerts of a storm update the incident and event of its first alert.
+    :param AlertCheckpoint checkpoint: journaled stages
+    :param str data: enriched alert
+    :param str category: alert category
+    :param int runCounter: job run counter
+    :param str cyclic: job is cyclic
+    :param dict storm: ids of the first alert of a storm, None for other alerts
+    :return: integration -> id, e.g. {"itsm": "INC...", "bhom": "...", "tsim": ""}
+    :rtype: dict
+    """
+    jSinks = {"itsm": "INC-0000", "bhom": "BHOM-0000", "tsim": ""}
+    tasks = {}
+    if integration_itsm_enabled:
+        tasks["itsm"] = {
+            "func": sendAlert2ITSM,
+            "args": {
+                "checkpoint": checkpoint,
+                "data": data,
+                "runCounter": runCounter,
+                "cyclic": cyclic,
+                "storm": storm
+            }
+        }
+    if integration_bhom_enabled:
+        tasks["bhom"] = {
+            "func": sendAlert2BHOM,
+            "args": {
+                "checkpoint": checkpoint,
+                "data": data,
+                "category": category,
+                "storm": storm
             }
+        }
+    if storm and storm["tsim"]:
+        # TSIM events can not be updated, keep the event of the first alert
+        jSinks["tsim"] = storm["tsim"]
+    elif integration_tsim_enabled:
+        tasks["tsim"] = {
+            "func": sendAlert2TSIM,
+            "args": {
+                "checkpoint": checkpoint,
+                "data": data,
+                "category": category
+            }
+        }
+
+    for sink, task in tasks.items():
+        task["default"] = jSinks[sink]
+        task["timeout"] = integration_sinks[sink]["timeout"]
+        task["executor"] = getSinkPool(sink)
+
+    jSinks.update(
+        w3rkstatt.runTaskGraph(tasks=tasks, executor=ctm.getCtmTaskPool()))
+    return jSinks
+
+
+def acknowledgeAlert(ctmApiClient,
+                     ctmAlertIDs,
+                     ctmAlertComment,
+                     ctmAlertUrgency="Normal",
+                     flush=False,
+                     done=None):
+    """    Acknowledge Control-M alerts with the processing comment
+    :param ApiClient ctmApiClient: Automation API client
+    :param str ctmAlertIDs: alert ids, comma separated
+    :param str ctmAlertComment: alert comment
+    :param str ctmAlertUrgency: alert urgency
+    :param bool flush: send all queued alert updates now, e.g. before logout
+    :param function done: done(status) once the comment is sent, status is alert id -> True / False
+    :return: alert id -> list of update status if flushed, else "Queued"
+    """
+    ctmAlertUpdates = ctm.getCtmAlertUpdates()
+    ctmAlertUpdates.comment(ctmApiClient=ctmApiClient,
+                            ctmAlertIDs=ctmAlertIDs,
+                            ctmAlertComment=ctmAlertComment,
+                            ctmAlertUrgency=ctmAlertUrgency,
+                            done=done)
+    if not flush:
+        return "Queued"
+
+    jStatus = ctmAlertUpdates.flush()
+    lFailed = [id for id, status in jStatus.items() if False in status]
+    if len(lFailed) > 0:
+        logger.error('CTM Alert Update Failed: %s', ",".join(lFailed))
+    return jStatus
+
+
+def processAlert(data,
+                 ctmApiObj=None,
+                 checkpoint=None,
+                 uuid=None,
+                 finish=None):
+    """    Process a single Control-M alert
+    Transform, enrich and forward the alert to the enabled integrations.
+    :param dict data: alert arguments as returned by ctmAlert2Dict
+    :param CtmConnection ctmApiObj: warm Automation API connection, if None login and logout per alert
+    :param AlertCheckpoint checkpoint: journaled stages, completed stages are skipped on resume
+    :param str uuid: internal alert id, default process id
+    :param function finish: finish() once the alert is processed and its acknowledgement sent, not called on failure
+    :return: status message
+    :rtype: str
+    """
+    # per alert state, the alert daemon processes alerts concurrently
+    jCtmAlert = data
+    alertEpoch = time.time()
+    if uuid is None:
+        uuid = sUuid
+    sSysOutMsg = ""
+    bAckQueued = False
+    if checkpoint is None:
+        checkpoint = spool.AlertCheckpoint()
 
     if len(jCtmAlert) > 0:
 
         if _localDebugData:
-            logger.debug('Function = "%s" ', "__main__")
+            logger.debug('Function = "%s" ', "processAlert")
             logger.debug('CTM Initial Alert JSON: %s', jCtmAlert)
 
         # Transform CTM Alert
-        jCtmAlertRaw = json.dumps(jCtmAlert)
-        sCtmAlert = ctm.trasnformtCtmAlert(data=jCtmAlert)
-        jCtmAlert = json.loads(sCtmAlert)
+        jCtmAlertArgs = dict(jCtmAlert)
+        jCtmAlertRaw = json.dumps(jCtmAlertArgs)
+        jCtmAlert = transformAlert(data=jCtmAlert, checkpoint=checkpoint)
         ctmEventType = ctm.extractCtmAlertType(jCtmAlert)
         ctmAlertId = str(
             w3rkstatt.getJsonValue(path="$.alert_id", data=jCtmAlert)).strip()
@@ -867,167 +1358,179 @@ if __name__ == "__main__":
                     w3rkstatt.getJsonValue(path="$.Serial",
                                            data=jCtmAlert)).strip()
 
-            # CTM Login
+            # Alert storm, acknowledge all coalesced alerts together
+            # the first alert of the storm has been acknowledged on its own
+            jStorm = jCtmAlert.get("storm_leader")
+            ctmAlertIds = ctmAlertId
+            if "coalesced_alert_ids" in jCtmAlert:
+                lAlertIds = jCtmAlert["coalesced_alert_ids"]
+                if jStorm:
+                    lAlertIds = [
+                        id for id in lAlertIds if id != jStorm["alert_id"]
+                    ]
+                ctmAlertIds = ",".join(lAlertIds)
+
+            # CTM Login, reuse warm connection of the alert daemon
+            ctmApiWarm = ctmApiObj is not None
+            ctmAlertUpdates = ctm.getCtmAlertUpdates()
             try:
-                ctmApiObj = ctm.getCtmConnection()
+                if not ctmApiWarm:
+                    ctmApiObj = ctm.getCtmConnection()
                 ctmApiClient = ctmApiObj.api_client
-                _ctmActiveApi = True
+                ctmActiveApi = True
             except:
-                _ctmActiveApi = False
+                ctmActiveApi = False
                 ctmApiClient = None
-                logger.error('CTM Login Status: %s', _ctmActiveApi)
+                logger.error('CTM Login Status: %s', ctmActiveApi)
 
             # Analyze alert
             ctmAlertDataFinal = {}
             if ctmAlertCat == "infrastructure":
-                ctmAlertDataFinal = analyzeAlert4Infra(raw=jCtmAlertRaw,
-                                                       data=jCtmAlert)
-                fileStatus = writeAlertFile(data=ctmAlertDataFinal,
+                ctmAlertDataFinal = checkpoint.run("enriched",
+                                                   analyzeAlert4Infra,
+                                                   raw=jCtmAlertArgs,
+                                                   data=jCtmAlert,
+                                                   uuid=uuid)
+                fileStatus = checkpoint.run("file",
+                                            writeAlertFile,
+                                            data=ctmAlertDataFinal,
                                             alert=ctmAlertId,
-                                            type="infra")
+                                            type="infra",
+                                            enriched=ctmActiveApi,
+                                            epoch=alertEpoch)
 
                 # Update CTM Alert staus if file is written
-                if _ctmActiveApi and fileStatus:
-                    ctmAlertsStatus = ctm.updateCtmAlertStatus(
-                        ctmApiClient=ctmApiClient,
-                        ctmAlertIDs=ctmAlertId,
-                        ctmAlertStatus="Reviewed")
-                    logger.debug('CTM Alert Update Status: "%s"',
-                                 ctmAlertsStatus)
+                if ctmActiveApi and fileStatus:
+                    ctmAlertUpdates.status(ctmApiClient=ctmApiClient,
+                                           ctmAlertIDs=ctmAlertIds,
+                                           ctmAlertStatus="Reviewed")
+                    logger.debug('CTM Alert Update Status: "%s"', "Queued")
             elif ctmAlertCat == "job":
-                ctmAlertDataFinal = analyzeAlert4Job(ctmApiClient=ctmApiClient,
-                                                     raw=jCtmAlertRaw,
-                                                     data=jCtmAlert)
-                fileStatus = writeAlertFile(data=ctmAlertDataFinal,
+                ctmAlertDataFinal = checkpoint.run("enriched",
+                                                   analyzeAlert4Job,
+                                                   ctmApiClient=ctmApiClient,
+                                                   raw=jCtmAlertArgs,
+                                                   data=jCtmAlert,
+                                                   uuid=uuid)
+                fileStatus = checkpoint.run("file",
+                                            writeAlertFile,
+                                            data=ctmAlertDataFinal,
                                             alert=ctmAlertId,
-                                            type="job")
+                                            type="job",
+                                            enriched=ctmActiveApi,
+                                            epoch=alertEpoch)
 
                 if ctmOrderId == "00000" and ctmRunCounter == 0:
                     # do not create file
                     fileStatus = True
-                    if _ctmActiveApi:
-                        ctmAlertsStatus = ctm.updateCtmAlertStatus(
-                            ctmApiClient=ctmApiClient,
-                            ctmAlertIDs=ctmAlertId,
-                            ctmAlertStatus="Reviewed")
-                        logger.debug('CTM Alert Update Status: "%s"',
-                                     ctmAlertsStatus)
+                    if ctmActiveApi:
+                        ctmAlertUpdates.status(ctmApiClient=ctmApiClient,
+                                               ctmAlertIDs=ctmAlertIds,
+                                               ctmAlertStatus="Reviewed")
+                        logger.debug('CTM Alert Update Status: "%s"', "Queued")
                 else:
                     # Update CTM Alert staus if file is written
-                    fileStatus = writeAlertFile(data=ctmAlertDataFinal,
+                    fileStatus = checkpoint.run("file",
+                                                writeAlertFile,
+                                                data=ctmAlertDataFinal,
                                                 alert=ctmAlertId,
-                                                type="job")
-
-                if _ctmActiveApi and fileStatus:
-                    ctmAlertsStatus = ctm.updateCtmAlertStatus(
-                        ctmApiClient=ctmApiClient,
-                        ctmAlertIDs=ctmAlertId,
-                        ctmAlertStatus="Reviewed")
-                    logger.debug('CTM Alert Update Status: "%s"',
-                                 ctmAlertsStatus)
+                                                type="job",
+                                                enriched=ctmActiveApi,
+                                                epoch=alertEpoch)
+
+                if ctmActiveApi and fileStatus:
+                    ctmAlertUpdates.status(ctmApiClient=ctmApiClient,
+                                           ctmAlertIDs=ctmAlertIds,
+                                           ctmAlertStatus="Reviewed")
+                    logger.debug('CTM Alert Update Status: "%s"', "Queued")
             else:
 
-                ctmAlertDataFinal = analyzeAlert4Core(raw=jCtmAlertRaw,
-                                                      data=jCtmAlert)
-                fileStatus = writeAlertFile(data=ctmAlertDataFinal,
+                ctmAlertDataFinal = checkpoint.run("enriched",
+                                                   analyzeAlert4Core,
+                                                   raw=jCtmAlertArgs,
+                                                   data=jCtmAlert,
+                                                   uuid=uuid)
+                fileStatus = checkpoint.run("file",
+                                            writeAlertFile,
+                                            data=ctmAlertDataFinal,
                                             alert=ctmAlertId,
-                                            type="core")
+                                            type="core",
+                                            enriched=ctmActiveApi,
+                                            epoch=alertEpoch)
 
                 # Update CTM Alert staus if file is written
-                if _ctmActiveApi and fileStatus:
-                    ctmAlertsStatus = ctm.updateCtmAlertStatus(
-                        ctmApiClient=ctmApiClient,
-                        ctmAlertIDs=ctmAlertId,
-                        ctmAlertStatus="Reviewed")
-                    logger.debug('CTM Alert Update Status: "%s"',
-                                 ctmAlertsStatus)
-
-            incident = "INC-0000"
-            if integration_itsm_enabled:
-                logger.debug('CTM ITSM Integration: "%s"', "Start")
-                logger.debug('CTM ITSM Debug: "%s"', _localDebugITSM)
-                # Create Incident only once
-                # Catch Cyclic Jobs
-                if ctmRunCounter == 1 and sCtmJobCyclic:
-                    if _localDebugITSM:
-                        logger.debug(
-                            'CTM ITSM Integration Cyclic Job Run: "%s"',
-                            ctmRunCounter)
-                    incident = createITSM(data=ctmAlertDataFinal)
-                elif ctmRunCounter >= 1 and sCtmJobCyclic:
-                    if _localDebugITSM:
-                        logger.debug(
-                            'CTM ITSM Integration Cyclic Job Run: "%s"',
-                            ctmRunCounter)
-                    # Update Incident Worklog only
-                    incident = "WRK-0000"
-                elif ctmRunCounter >= 1 and not sCtmJobCyclic:
-                    if _localDebugITSM:
-                        logger.debug(
-                            'CTM ITSM Integration Normal Job Run: "%s"',
-                            ctmRunCounter)
-                        logger.debug('CTM Alert Data forITSM : "%s"',
-                                     ctmAlertDataFinal)
-                    incident = createITSM(data=ctmAlertDataFinal)
-                elif ctmRunCounter == 0 and not sCtmJobCyclic:
-                    incident = "INC-9999"
-
-                else:
-                    incident = "INC-0000"
-
-                logger.debug('CTM ITSM Integration: "%s"', "End")
-
-            bhom_event_id = "BHOM-0000"
-            if integration_bhom_enabled:
-                # translate ctm alert to BHOM format
-                # ctmAlertDataFinal = json.dumps(ctmAlertDataFinal)
-                jBhomEvent = ctm.transformCtmBHOM(data=ctmAlertDataFinal,
-                                                  category=ctmAlertCat)
-
-                # future enhancements -> keep token for 24 hours
-                authToken = bhom.authenticate()
-                if authToken != None:
-                    bhom_event_id = bhom.createEvent(token=authToken,
-                                                     event_data=jBhomEvent)
-                    time.sleep(10)
-                    bhom_assigned_user = w3rkstatt.getJsonValue(
-                        path="$.BHOM.user", data=jCfgData)
-                    bhom.assignEvent(
-                        token=authToken,
-                        event_id=bhom_event_id,
-                        assigned_user=bhom_assigned_user,
-                        event_note="Control-M Alert Integration via: " +
-                        hostFqdn)
-
-                    time.sleep(10)
-                    bhom_event_note = ctmAlertDataFinal
-                    bhom.addNoteEvent(token=authToken,
-                                      event_id=bhom_event_id,
-                                      event_note=bhom_event_note)
-
-                if _localDebugBHOM:
-                    logger.debug('CTM BHOM: Event      : %s', jBhomEvent)
-                    logger.debug('CTM BHOM: Event Note : "%s"',
-                                 bhom_event_note)
-                    logger.debug('CTM BHOM: Event ID   : %s', bhom_event_id)
-                    logger.debug('CTM BHOM: Auth Token : %s', authToken)
+                if ctmActiveApi and fileStatus:
+                    ctmAlertUpdates.status(ctmApiClient=ctmApiClient,
+                                           ctmAlertIDs=ctmAlertIds,
+                                           ctmAlertStatus="Reviewed")
+                    logger.debug('CTM Alert Update Status: "%s"', "Queued")
+
+            # Forward to the enabled integrations concurrently
+            jSinks = sendAlert2Sinks(checkpoint=checkpoint,
+                                     data=ctmAlertDataFinal,
+                                     category=ctmAlertCat,
+                                     runCounter=ctmRunCounter,
+                                     cyclic=sCtmJobCyclic,
+                                     storm=jStorm)
+            incident = jSinks["itsm"]
+            bhom_event_id = jSinks["bhom"]
+
+            # Job log / output not yet archived, retry in the background
+            ctmApiDeferred = False
+            if ctm_job_log_enabled and ctmActiveApi and \
+                    ctmAlertCat == "job" and \
+                    ctmAlertDataFinal and "jobLog" in ctmAlertDataFinal:
+                deferAlert4Job(ctmApiObj=ctmApiObj,
+                               data=ctmAlertDataFinal,
+                               filePath=getAlertFilePath(alert=ctmAlertId,
+                                                         type="job",
+                                                         enriched=ctmActiveApi,
+                                                         epoch=alertEpoch),
+                               incident=incident,
+                               bhomEventId=bhom_event_id,
+                               closeConnection=not ctmApiWarm)
+                ctmApiDeferred = not ctmApiWarm
 
             # update CTM Alert
-            if _ctmActiveApi:
+            if ctmActiveApi:
                 sAlertNotes = "Processed Alert: #" + incident + "#" + bhom_event_id + "#"
                 ctmAlertSev = "Normal"
-                ctmAlertsStatus = ctm.updateCtmAlertCore(
-                    ctmApiClient=ctmApiClient,
-                    ctmAlertIDs=ctmAlertId,
-                    ctmAlertComment=sAlertNotes,
-                    ctmAlertUrgency=ctmAlertSev)
+                if ctmApiWarm and finish is not None and \
+                        not checkpoint.done("acknowledged"):
+                    # journal the stage once the batched comment is sent
+                    def acknowledged(jStatus):
+                        if False in jStatus.values():
+                            # alert stays in the journal and is resumed on restart
+                            return
+                        checkpoint.mark("acknowledged", jStatus)
+                        finish()
+
+                    ctmAlertsStatus = acknowledgeAlert(
+                        ctmApiClient=ctmApiClient,
+                        ctmAlertIDs=ctmAlertIds,
+                        ctmAlertComment=sAlertNotes,
+                        ctmAlertUrgency=ctmAlertSev,
+                        done=acknowledged)
+                    bAckQueued = True
+                else:
+                    ctmAlertsStatus = checkpoint.run(
+                        "acknowledged",
+                        acknowledgeAlert,
+                        ctmApiClient=ctmApiClient,
+                        ctmAlertIDs=ctmAlertIds,
+                        ctmAlertComment=sAlertNotes,
+                        ctmAlertUrgency=ctmAlertSev,
+                        flush=not ctmApiWarm)
                 if _localDebugITSM or _localDebugBHOM or _localDebugData:
                     logger.debug('- CTM Alert Update %s: "%s"', ctmAlertId,
                                  sAlertNotes)
                     logger.debug('- CTM Alert Status: %s', ctmAlertsStatus)
 
             # Close cTM AAPI connection
-            if _ctmActiveApi:
+            # deferred retrieval logs out when done
+            if ctmActiveApi and not ctmApiWarm:
+                ctmAlertUpdates.flush()
+            if ctmActiveApi and not ctmApiWarm and not ctmApiDeferred:
                 ctm.delCtmConnection(ctmApiObj)
 
             logger.info('')
@@ -1049,6 +1552,100 @@ if __name__ == "__main__":
 
             sSysOutMsg = "Processed Update Alert: " + str(ctmAlertId)
 
+    # no acknowledgement pending, alert is finished
+    if finish is not None and not bAckQueued:
+        finish()
+    return sSysOutMsg
+
+
+w3rkstatt.onConfigReload(applyConfig)
+
+if __name__ == "__main__":
+    logging.basicConfig(filename=logFile,
+                        filemode='a',
+                        level=logging.DEBUG,
+                        format='%(asctime)s - %(levelname)s # %(message)s',
+                        datefmt='%d-%b-%y %H:%M:%S')
+
+    sSysOutMsg = ""
+
+    if _localInfo:
+        logger.info('CTM: start event management - %s', w3rkstatt.sUuid)
+        logger.info('Version: %s ', _modVer)
+        logger.info('System Platform: %s ', w3rkstatt.sPlatform)
+        logger.info('Log Level: %s', loglevel)
+        logger.info('Epoch: %s', epoch)
+        logger.info('Host Name: %s', w3rkstatt.sHostname)
+        logger.info('UUID: %s', w3rkstatt.sUuid)
+
+    # Extract script arguments
+    sCtmArguments = sys.argv[1:]
+    sCtmArgDict = ctmAlert2Dict(list=sCtmArguments,
+                                start=0,
+                                end=len(sCtmArguments))
+    jCtmArgs = json.dumps(sCtmArgDict)
+    jCtmAlert = json.loads(jCtmArgs)
+    ctmAlertId = str(w3rkstatt.getJsonValue(path="$.alert_id",
+                                            data=jCtmAlert)).strip()
+    ctmRunCounter = None
+
+    # Test integration with sample data
+    if not len(ctmAlertId) > 0:
+        if _localQA:
+            jCtmAlert = {
+                "call_type": "I",
+                "alert_id": "279",
+                "data_center": "ctm-srv.trybmc.com",
+                "memname": None,
+                "order_id": "0000q",
+                "severity": "V",
+                "status": "Not_Noticed",
+                "send_time": "20220729163544",
+                "last_user": None,
+                "last_time": None,
+                "message": "Ended not OK",
+                "run_as": "dbus",
+                "sub_application": "Integration",
+                "application": "ADE",
+                "job_name": "Agent Health",
+                "host_id": "ctm-net.trybmc.com",
+                "alert_type": "R",
+                "closed_from_em": None,
+                "ticket_number": None,
+                "run_counter": "00014",
+                "notes": None
+            }
+
+    # Journal alert, ctm_alertd.py resumes it if this process dies halfway
+    journal = None
+    checkpoint = None
+    if len(jCtmAlert) > 0:
+        journal = spool.getJournal(data=jCfgData)
+    if journal is not None:
+        entry = journal.receive(data=jCtmAlert, id=sUuid)
+        checkpoint = spool.AlertCheckpoint(journal=journal, entry=entry)
+
+    sSysOutMsg = processAlert(data=jCtmAlert,
+                              checkpoint=checkpoint,
+                              uuid=sUuid)
+
+    # Wait for deferred job log / output retrieval
+    if jobScheduler is not None:
+        jobScheduler.join(timeout=ctm_job_retry_deadline)
+
+    # Wait for BHOM event assign / note, not for the full retry deadline
+    if bhom.bhomFollowUp is not None:
+        if not bhom.bhomFollowUp.join(timeout=bhom.bhom_followup_wait):
+            logger.error('BHOM: event follow-up not finished after %s s',
+                         bhom.bhom_followup_wait)
+
+    if journal is not None:
+        journal.mark(id=sUuid, stage="done")
+        journal.close()
+
+    if alertStore:
+        alertStore.close()
+
     if _localInfo:
         logger.info('CTM: end event management - %s', w3rkstatt.sUuid)
 
@@ -2,8 +2,17 @@
 
 ALERTS_FILE_LOG="/home/truewatch/.w3rkstatt/logs/alerts.log"
 ALERTS_FILE_PYTHON="/opt/bmcs/w3rkstatt/ctm_alerts.py"
+ALERTS_FILE_CLIENT="/opt/bmcs/w3rkstatt/ctm_alerts_client.py"
+ALERTS_SOCKET="/home/truewatch/.w3rkstatt/ctm_alerts.sock"
 USER_NAME="truewatch"
 USER_SHELL="/bin/bash"
 
+# Hand over to the alert daemon (ctm_alertd.py), if running
+if [[ -S "${ALERTS_SOCKET}" ]]; then
+    if W3RKSTATT_ALERTS_SOCKET="${ALERTS_SOCKET}" /usr/bin/python3 -S "${ALERTS_FILE_CLIENT}" $*; then
+        exit 0
+    fi
+fi
+
 sudo -i -u ${USER_NAME} ${USER_SHELL} -c "echo '$*' >> '${ALERTS_FILE_LOG}'"
 sudo -i -u ${USER_NAME} ${USER_SHELL} -c "/usr/bin/python3 ${ALERTS_FILE_PYTHON} $*"
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# Filename: ctm_alerts_client.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Control-M Alert Client
+Hand the Control-M alert arguments over to ctm_alertd.py and return at once.
+Only uses the python standard library to keep the start up time low.
+
+Usage: ctm_alerts_client.py call_type: I alert_id: 81 ...
+Socket: $W3RKSTATT_ALERTS_SOCKET or ~/.w3rkstatt/ctm_alerts.sock
+Exit code 1 if the daemon is not reachable, ctm_alerts.sh falls back to ctm_alerts.py
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Initial Development
+
+"""
+
+import os
+import sys
+import json
+import socket
+
+_socketTimeout = 2.0
+
+
+def getSocketPath():
+    path = os.environ.get("W3RKSTATT_ALERTS_SOCKET", "")
+    if len(path) < 1:
+        path = os.path.join(os.path.expanduser("~"), ".w3rkstatt",
+                            "ctm_alerts.sock")
+    return path
+
+
+def sendAlert(path, arguments):
+    payload = json.dumps(arguments) + "\n"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(_socketTimeout)
+        sock.connect(path)
+        sock.sendall(payload.encode("utf-8"))
+        reply = sock.makefile("r", encoding="utf-8").readline().strip()
+    return reply
+
+
+if __name__ == "__main__":
+    try:
+        sReply = sendAlert(path=getSocketPath(), arguments=sys.argv[1:])
+    except OSError as exp:
+        print(f"Message: Alert Daemon unavailable: {exp}")
+        sys.exit(1)
+
+    print(f"Message: {sReply}")
+    if sReply.startswith("Error"):
+        sys.exit(1)
@@ -27,6 +27,7 @@ Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210527      Volker Scheithauer    Tranfer Development from other projects
 20211224      Volker Scheithauer    Simplify control-M Alerts, write to local file for use with filebeat
+20261018      Orchestrator          Resolve own host name on first use
 
 """
 
@@ -87,9 +88,6 @@ logFile  = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file",data=jCfgData)
 loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel",data=jCfgData)
 epoch    = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP   = w3rkstatt.getHostIP(hostName)
-hostFqdn = w3rkstatt.getHostFqdn(hostName)
-domain   = w3rkstatt.getHostDomain(hostFqdn)
 epoch    = time.time()
 parser   = argparse.ArgumentParser(prefix_chars=':')
 sUuid    = w3rkstatt.sUuid
@@ -317,8 +315,7 @@ if __name__ == "__main__":
 
         # Transform CTM Alert
         jCtmAlertRaw      = json.dumps(jCtmAlert) 
-        sCtmAlert         = ctm.trasnformtCtmAlert(data=jCtmAlert)
-        jCtmAlert         = json.loads(sCtmAlert)
+        jCtmAlert         = ctm.trasnformtCtmAlert(data=jCtmAlert)
         ctmEventType      = ctm.extractCtmAlertType(jCtmAlert)
         ctmAlertId        = str(w3rkstatt.getJsonValue(path="$.alert_id",data=jCtmAlert)) #.strip()
         ctmAlertCallType  = w3rkstatt.getJsonValue(path="$.call_type",data=jCtmAlert) #.strip()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# Filename: ctm_session.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Control-M Session Cache
+Automation API bearer tokens shared by all processes of a user. One process
+logs in, the others reuse the token until it is about to expire.
+
+File: {"https://host:8443/automation-api|user": {"token": "...", "expires": 1666000000.0}}
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Initial Development
+
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import logging
+import threading
+
+# handle dev environment vs. production
+try:
+    import w3rkstatt as w3rkstatt
+except:
+    # fix import issues for modules
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    from src import w3rkstatt as w3rkstatt
+
+# Assign module defaults
+_ttl = 1200
+_refresh = 120
+_fileMode = 0o600
+
+logger = logging.getLogger(__name__)
+
+
+class CtmSessionCache(object):
+    """
+    Bearer tokens in a file only readable by the owner
+    A token is used until 'refresh' seconds before it expires, 'ttl' seconds
+    after the login. The login is done under an exclusive lock, processes
+    waiting for it use the new token.
+    """
+
+    def __init__(self, file, ttl=_ttl, refresh=_refresh):
+        self.file = file
+        self.lock_file = file + ".lock"
+        self.ttl = float(ttl)
+        self.refresh = min(float(refresh), self.ttl / 2)
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+        w3rkstatt.createFolder(os.path.dirname(file))
+        self.lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT,
+                               _fileMode)
+
+    def _valid(self, entry):
+        return entry is not None and \
+            entry["expires"] - self.refresh > time.time()
+
+    def _read(self):
+        try:
+            with open(self.file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as exp:
+            logger.error('CTM Session Cache Read Error: "%s" %s', self.file,
+                         exp)
+            return {}
+
+    def _write(self, entries):
+        fileTemp = self.file + ".tmp"
+        fd = os.open(fileTemp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                     _fileMode)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.chmod(fileTemp, _fileMode)
+        os.replace(fileTemp, self.file)
+
+    def _update(self, func):
+        # read, change and write the file under the exclusive lock
+        fcntl.flock(self.lock_fd, fcntl.LOCK_EX)
+        try:
+            entries = self._read()
+            result = func(entries)
+            self._write(entries)
+        finally:
+            fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
+        return result
+
+    def get(self, key, login):
+        '''
+        Get a token valid for at least 'refresh' seconds
+
+        :param str key: Automation API url and user
+        :param function login: login(), returns a new token
+        :return: token and expiry time
+        :rtype: tuple
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        with self.lock:
+            entry = self.tokens.get(key)
+            if self._valid(entry):
+                return (entry["token"], entry["expires"])
+
+            fcntl.flock(self.lock_fd, fcntl.LOCK_SH)
+            try:
+                entry = self._read().get(key)
+            finally:
+                fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
+
+            if not self._valid(entry):
+
+                def refresh(entries):
+                    # another process may have logged in meanwhile
+                    entry = entries.get(key)
+                    if not self._valid(entry):
+                        entry = {
+                            "token": login(),
+                            "expires": time.time() + self.ttl
+                        }
+                        entries[key] = entry
+                        logger.debug('CTM Session Cache: Login "%s"', key)
+                    return entry
+
+                entry = self._update(refresh)
+            self.tokens[key] = entry
+        return (entry["token"], entry["expires"])
+
+    def invalidate(self, key, token):
+        '''
+        Drop a token rejected by the Automation API, unless it was replaced
+
+        :param str key: Automation API url and user
+        :param str token: rejected token
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+
+        def drop(entries):
+            entry = entries.get(key)
+            if entry is not None and entry["token"] == token:
+                del entries[key]
+
+        with self.lock:
+            entry = self.tokens.get(key)
+            if entry is not None and entry["token"] == token:
+                del self.tokens[key]
+            self._update(drop)
+
+    def pop(self, key):
+        '''
+        Remove a token before the logout
+
+        :param str key: Automation API url and user
+        :return: token or None
+        :rtype: str
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+
+        def remove(entries):
+            entry = entries.pop(key, None)
+            if entry is not None and self._valid(entry):
+                return entry["token"]
+            return None
+
+        with self.lock:
+            self.tokens.pop(key, None)
+            return self._update(remove)
+
+    def close(self):
+        with self.lock:
+            if self.lock_fd is not None:
+                os.close(self.lock_fd)
+                self.lock_fd = None
+
+
+def getSessionCache(data):
+    '''
+    Get session cache as configured in CTM.session
+
+    :param dict data: project configuration
+    :return: session cache or None if disabled
+    :rtype: CtmSessionCache
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    enabled = w3rkstatt.getJsonValue(path="$.CTM.session.enabled", data=data)
+    if not enabled:
+        return None
+
+    file = w3rkstatt.getJsonValue(path="$.CTM.session.file", data=data)
+    if len(str(file)) < 1:
+        file = os.path.join(w3rkstatt.getHomeFolder(), ".w3rkstatt",
+                            "ctm_session.json")
+    ttl = w3rkstatt.getJsonValue(path="$.CTM.session.ttl", data=data)
+    if not ttl:
+        ttl = _ttl
+    refresh = w3rkstatt.getJsonValue(path="$.CTM.session.refresh", data=data)
+    if not refresh:
+        refresh = _refresh
+
+    try:
+        cache = CtmSessionCache(file=file, ttl=ttl, refresh=refresh)
+    except OSError as exp:
+        logger.error('CTM Session Cache Open Error: "%s" %s', file, exp)
+        cache = None
+    return cache
@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+# Filename: ctm_spool.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Control-M Alert Journal
+Append-only journal (one JSON record per line) for incoming alerts with a
+checkpoint per processing stage. Unfinished alerts are resumed from the last
+completed stage by ctm_alertd.py after a restart.
+
+Record: {"uuid": "...", "stage": "received", "time": 1666000000.0, "data": {...},
+         "owner": {"pid": 4711, "host": "...", "start": "..."}}
+
+Large payloads of stages without side effects (transformed, enriched) are
+journaled as digest: {"uuid": "...", "stage": "enriched", "time": ...,
+"digest": "sha256:...", "size": 1234567}. The stage is repeated on resume.
+
+An alert is owned by the process which received or resumed it, alerts of
+processes still running are not resumed.
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Initial Development
+20261018      Orchestrator          TSIM stage
+20261018      Orchestrator          Owner process of journaled alerts
+20261018      Orchestrator          Periodic compaction, digest of large stage payloads
+
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import fcntl
+import hashlib
+import socket
+import logging
+import threading
+
+# handle dev environment vs. production
+try:
+    import w3rkstatt as w3rkstatt
+except:
+    # fix import issues for modules
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    from src import w3rkstatt as w3rkstatt
+
+# Processing stages, in order
+STAGES = ("received", "transformed", "enriched", "file", "itsm", "bhom",
+          "tsim", "acknowledged")
+# Alert is finished, nothing to resume
+STAGES_FINAL = ("done", "dropped", "failed")
+# Stages with side effects in other systems, fsync before moving on
+STAGES_DURABLE = ("received", "itsm", "bhom", "tsim", "acknowledged", "done",
+                  "dropped", "failed")
+# Stages without side effects, large payloads are repeated on resume
+STAGES_REPEATABLE = ("transformed", "enriched")
+
+# Assign module defaults
+_fsyncInterval = 0.05
+_fsyncBatch = 64
+_compactSize = 16
+_compactInterval = 300
+_maxPayload = 65536
+_fileMode = 0o600
+
+logger = logging.getLogger(__name__)
+
+
+def getProcessStart(pid):
+    '''
+    Get start time of a process, tells a reused pid apart
+
+    :param int pid: process id
+    :return: start time in clock ticks after boot, None if unknown
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    try:
+        with open("/proc/" + str(pid) + "/stat", "r") as f:
+            stat = f.read()
+        # command name may contain blanks, fields follow the last ')'
+        return stat[stat.rindex(")") + 2:].split()[19]
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def getOwner():
+    '''
+    Get owner of the alerts journaled by this process
+
+    :return: pid, host and start time of this process
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    pid = os.getpid()
+    return {
+        "pid": pid,
+        "host": socket.gethostname(),
+        "start": getProcessStart(pid)
+    }
+
+
+def isOwnerAlive(owner):
+    '''
+    Check if the owner process of an alert is still running
+
+    :param dict owner: owner as returned by getOwner
+    :return: True or False, None for a process of another host
+    :rtype: bool
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    if not isinstance(owner, dict) or not owner.get("pid"):
+        # journaled before alerts had an owner
+        return False
+    if owner.get("host") != socket.gethostname():
+        return None
+
+    pid = int(owner["pid"])
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # process of another user
+        pass
+    start = owner.get("start")
+    if start is not None and getProcessStart(pid) not in (start, None):
+        # pid reused by another process
+        return False
+    return True
+
+
+class AlertJournal(object):
+    """
+    Append-only alert journal with batched fsync (group commit)
+    Writers append, one fsync covers all records written while the previous
+    fsync was running. Without durable writers waiting, records are synced
+    after 'fsync_interval' seconds or 'fsync_batch' records.
+    Several processes may append, compact() is done under an exclusive lock.
+    maintain() compacts the journal once it has 'compact_size' MB or
+    'compact_interval' seconds have passed with new records.
+    """
+
+    def __init__(self,
+                 file,
+                 fsync_interval=_fsyncInterval,
+                 fsync_batch=_fsyncBatch,
+                 compact_size=_compactSize,
+                 compact_interval=_compactInterval,
+                 max_payload=_maxPayload):
+        self.file = file
+        self.lock_file = file + ".lock"
+        self.fsync_interval = float(fsync_interval)
+        self.fsync_batch = int(fsync_batch)
+        self.compact_size = float(compact_size) * 1024 * 1024
+        self.compact_interval = float(compact_interval)
+        self.max_payload = int(max_payload)
+        self.compact_time = time.monotonic()
+        self.compact_seq = 0
+        self.compact_check = 0
+        self.seq = 0
+        self.synced = 0
+        self.waiters = 0
+        self.fd = None
+        self.lock_fd = None
+        self.lock = threading.Lock()
+        self.cond = threading.Condition(self.lock)
+        self.stop = threading.Event()
+        self.flusher = None
+
+        w3rkstatt.createFolder(os.path.dirname(file))
+        self.lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT,
+                               _fileMode)
+        self._open()
+
+    def _open(self):
+        if self.fd is not None:
+            os.close(self.fd)
+        self.fd = os.open(self.file, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                          _fileMode)
+        # terminate a torn last record, the next record gets its own line
+        with open(self.file, "rb") as f:
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    os.write(self.fd, b"\n")
+
+    def _reopen(self):
+        # journal replaced by compact() of another process
+        try:
+            if os.stat(self.file).st_ino != os.fstat(self.fd).st_ino:
+                self._open()
+        except FileNotFoundError:
+            self._open()
+
+    def _sync(self):
+        if self.synced < self.seq:
+            os.fsync(self.fd)
+            self.synced = self.seq
+            self.cond.notify_all()
+
+    def _flusher(self):
+        while True:
+            with self.lock:
+                while self.synced >= self.seq or self.waiters < 1:
+                    if self.stop.is_set():
+                        return
+                    if not self.cond.wait(self.fsync_interval) and \
+                            self.synced < self.seq:
+                        break
+                seq = self.seq
+                # compact() may replace the file during the fsync
+                fd = os.dup(self.fd)
+
+            # writers keep appending during the fsync
+            try:
+                os.fsync(fd)
+            except OSError as exp:
+                logger.error('CTM Journal Sync Error: %s', exp)
+            finally:
+                os.close(fd)
+
+            with self.lock:
+                self.synced = max(self.synced, seq)
+                self.cond.notify_all()
+
+    def start(self):
+        '''
+        Start background fsync thread, without it durable records are synced at once
+
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        if self.flusher is None:
+            self.flusher = threading.Thread(target=self._flusher,
+                                            name="ctm-journal-sync",
+                                            daemon=True)
+            self.flusher.start()
+
+    def append(self, record, durable=False):
+        '''
+        Append a record, wait for the shared fsync if durable
+
+        :param dict record: journal record
+        :param bool durable: return only after the record is on disk
+        :return: sequence number
+        :rtype: int
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            fcntl.flock(self.lock_fd, fcntl.LOCK_SH)
+            try:
+                self._reopen()
+                os.write(self.fd, line.encode("utf-8"))
+            finally:
+                fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
+            self.seq += 1
+            seq = self.seq
+            if self.flusher is None:
+                if durable or self.seq - self.synced >= self.fsync_batch:
+                    self._sync()
+            elif durable or self.seq - self.synced >= self.fsync_batch:
+                self.waiters += 1
+                self.cond.notify_all()
+                while self.synced < seq:
+                    self.cond.wait()
+                self.waiters -= 1
+        return seq
+
+    def receive(self, data, id=None):
+        '''
+        Journal a new alert
+
+        :param dict data: alert arguments as returned by ctmAlert2Dict
+        :param str id: alert uuid, generated if None
+        :return: journal entry
+        :rtype: dict
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        if id is None:
+            id = str(uuid.uuid4())
+        self.append(
+            {
+                "uuid": id,
+                "stage": "received",
+                "time": time.time(),
+                "data": data,
+                "owner": getOwner()
+            },
+            durable=True)
+        return {"uuid": id, "data": data, "stages": {}, "attempts": 0}
+
+    def mark(self, id, stage, payload=None):
+        '''
+        Journal a completed stage of an alert
+
+        :param str id: alert uuid
+        :param str stage: one of STAGES or STAGES_FINAL
+        :param payload: stage result needed to resume, JSON serializable
+        :return: sequence number
+        :rtype: int
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        record = {"uuid": id, "stage": stage, "time": time.time()}
+        if payload is not None and stage in STAGES_REPEATABLE:
+            sPayload = json.dumps(payload, separators=(",", ":"))
+            if len(sPayload) > self.max_payload:
+                # keep the journal small, the stage is repeated on resume
+                record["digest"] = "sha256:" + hashlib.sha256(
+                    sPayload.encode("utf-8")).hexdigest()
+                record["size"] = len(sPayload)
+                payload = None
+        if payload is not None:
+            record["data"] = payload
+        return self.append(record, durable=stage in STAGES_DURABLE)
+
+    def _read(self):
+        entries = {}
+        try:
+            with open(self.file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        id = record["uuid"]
+                        stage = record["stage"]
+                    except (ValueError, KeyError, TypeError):
+                        # torn write of a crash
+                        continue
+
+                    if stage == "received":
+                        entries[id] = {
+                            "uuid": id,
+                            "data": record.get("data"),
+                            "stages": {},
+                            "attempts": 0,
+                            "owner": record.get("owner"),
+                            "time": record.get("time", 0),
+                            "records": [line]
+                        }
+                        continue
+
+                    entry = entries.get(id)
+                    if entry is None:
+                        continue
+                    entry["records"].append(line)
+                    if stage == "resumed":
+                        entry["attempts"] += 1
+                        entry["owner"] = record.get("owner")
+                        entry["time"] = record.get("time", 0)
+                    elif "digest" not in record:
+                        entry["stages"][stage] = record.get("data")
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def pending(self, lease=0):
+        '''
+        Get unfinished alerts of ended processes in order of arrival
+
+        :param float lease: seconds an alert of another host stays with its owner
+        :return: journal entries with 'uuid', 'data', 'stages', 'attempts', 'owner' and 'time'
+        :rtype: list
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        entries = []
+        now = time.time()
+        for entry in self._read().values():
+            if any(stage in entry["stages"] for stage in STAGES_FINAL):
+                continue
+            alive = isOwnerAlive(entry["owner"])
+            if alive:
+                continue
+            if alive is None and now - entry["time"] < float(lease):
+                continue
+            del entry["records"]
+            entries.append(entry)
+        return entries
+
+    def compact(self):
+        '''
+        Rewrite the journal with the records of unfinished alerts only
+
+        :return: number of unfinished alerts
+        :rtype: int
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        fileTemp = self.file + ".tmp"
+        with self.lock:
+            fcntl.flock(self.lock_fd, fcntl.LOCK_EX)
+            try:
+                count = 0
+                with open(fileTemp, "w", encoding="utf-8") as f:
+                    for entry in self._read().values():
+                        if any(stage in entry["stages"]
+                               for stage in STAGES_FINAL):
+                            continue
+                        f.writelines(entry["records"])
+                        count += 1
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.chmod(fileTemp, _fileMode)
+                os.replace(fileTemp, self.file)
+                dirFd = os.open(os.path.dirname(self.file), os.O_RDONLY)
+                try:
+                    os.fsync(dirFd)
+                finally:
+                    os.close(dirFd)
+                self._open()
+                # records of unfinished alerts are on disk, release waiters
+                self.synced = self.seq
+                self.compact_seq = self.seq
+                self.compact_time = time.monotonic()
+                self.cond.notify_all()
+            finally:
+                fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
+        return count
+
+    def maintain(self):
+        '''
+        Compact the journal if it is too large or too old, cheap if not
+
+        :return: number of unfinished alerts, None if not compacted
+        :rtype: int
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        now = time.monotonic()
+        if now < self.compact_check:
+            return None
+        self.compact_check = now + 1.0
+        try:
+            size = os.path.getsize(self.file)
+        except OSError:
+            return None
+        if size < self.compact_size:
+            if now - self.compact_time < self.compact_interval:
+                return None
+            if self.seq == self.compact_seq:
+                return None
+        count = self.compact()
+        logger.info('CTM Journal: Compacted %s bytes, %s unfinished alerts',
+                    size, count)
+        return count
+
+    def close(self):
+        self.stop.set()
+        with self.lock:
+            self.cond.notify_all()
+        if self.flusher is not None:
+            self.flusher.join()
+            self.flusher = None
+        with self.lock:
+            if self.fd is not None:
+                self._sync()
+                os.close(self.fd)
+                self.fd = None
+            if self.lock_fd is not None:
+                os.close(self.lock_fd)
+                self.lock_fd = None
+
+
+class AlertCheckpoint(object):
+    """
+    Stage checkpoints of one alert
+    Without a journal every stage is executed, nothing is recorded.
+    """
+
+    def __init__(self, journal=None, entry=None):
+        self.journal = journal
+        self.entry = entry
+        if entry is not None:
+            self.stages = entry["stages"]
+        else:
+            self.stages = {}
+
+    def done(self, stage):
+        return stage in self.stages
+
+    def get(self, stage, default=None):
+        return self.stages.get(stage, default)
+
+    def mark(self, stage, payload=None):
+        self.stages[stage] = payload
+        if self.journal is not None:
+            self.journal.mark(id=self.entry["uuid"],
+                              stage=stage,
+                              payload=payload)
+
+    def run(self, stage, func, **kwargs):
+        '''
+        Execute a stage once, return the journaled result on resume
+
+        :param str stage: one of STAGES
+        :param func: stage function
+        :param kwargs: stage function arguments
+        :return: stage function result
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        if self.done(stage):
+            return self.get(stage)
+        value = func(**kwargs)
+        self.mark(stage, value)
+        return value
+
+
+def getJournal(data):
+    '''
+    Get alert journal as configured in CTM.alerts.journal
+
+    :param dict data: project configuration
+    :return: journal or None if disabled
+    :rtype: AlertJournal
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    enabled = w3rkstatt.getJsonValue(path="$.CTM.alerts.journal.enabled",
+                                     data=data)
+    if not enabled:
+        return None
+
+    file = w3rkstatt.getJsonValue(path="$.CTM.alerts.journal.file", data=data)
+    if len(str(file)) < 1:
+        file = os.path.join(w3rkstatt.getHomeFolder(), ".w3rkstatt", "spool",
+                            "ctm_alerts.journal")
+    fsync_interval = w3rkstatt.getJsonValue(
+        path="$.CTM.alerts.journal.fsync_interval", data=data)
+    if not fsync_interval:
+        fsync_interval = _fsyncInterval
+    fsync_batch = w3rkstatt.getJsonValue(
+        path="$.CTM.alerts.journal.fsync_batch", data=data)
+    if not fsync_batch:
+        fsync_batch = _fsyncBatch
+    compact_size = w3rkstatt.getJsonValue(
+        path="$.CTM.alerts.journal.compact_size", data=data)
+    if not compact_size:
+        compact_size = _compactSize
+    compact_interval = w3rkstatt.getJsonValue(
+        path="$.CTM.alerts.journal.compact_interval", data=data)
+    if not compact_interval:
+        compact_interval = _compactInterval
+    max_payload = w3rkstatt.getJsonValue(
+        path="$.CTM.alerts.journal.max_payload", data=data)
+    if not max_payload:
+        max_payload = _maxPayload
+
+    try:
+        journal = AlertJournal(file=file,
+                               fsync_interval=fsync_interval,
+                               fsync_batch=fsync_batch,
+                               compact_size=compact_size,
+                               compact_interval=compact_interval,
+                               max_payload=max_payload)
+    except OSError as exp:
+        logger.error('CTM Journal Open Error: "%s" %s', file, exp)
+        journal = None
+    return journal
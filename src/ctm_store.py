@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+# Filename: ctm_store.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Control-M Alert Store
+Append enriched alerts as compact records (one JSON object per line) to
+rolling segment files instead of one file per alert. The active segment is
+sealed after 'max_bytes' or 'max_age' seconds and optionally compressed.
+Every segment has an offset index to read a single alert by alert id.
+
+Active segment: <prefix>.ndjson, index <prefix>.idx
+Sealed segment: <prefix>-<start>-<end>.ndjson[.gz|.zst], index <prefix>-<start>-<end>.idx
+Index record: {"alert_id": "81", "type": "job", "offset": 0, "length": 1234, "time": 1666000000.0}
+Records of type 'update' add late job log / output to an alert.
+Sealed segments are compressed by the alert daemon, ctm_alerts.py only seals.
+Compressed segments consist of independent gzip members / zstd frames of
+about 1 MB of whole records, the index records the compressed frame:
+  "frame_offset": 0, "frame_length": 456, "frame_start": 0
+A lookup decompresses one frame only. Sealed indexes are cached.
+
+Usage: ctm_store.py alert_id
+       ctm_store.py --compress   compress sealed segments, without the alert daemon
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Initial Development
+20261018      Orchestrator          Compress sealed segments in the daemon only
+20261018      Orchestrator          Seekable compressed segments, cached sealed indexes
+
+"""
+
+import os
+import sys
+import glob
+import gzip
+import json
+import bisect
+import time
+import fcntl
+import logging
+import threading
+
+# handle dev environment vs. production
+try:
+    import w3rkstatt as w3rkstatt
+except:
+    # fix import issues for modules
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    from src import w3rkstatt as w3rkstatt
+
+try:
+    # optional, zstd compression of sealed segments
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compression of sealed segments: none, gzip, zstd
+COMPRESS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+# fsync policy: always, interval, never
+FSYNC = ("always", "interval", "never")
+
+# Assign module defaults
+_segmentPrefix = "ctm-alerts"
+_maxBytes = 64 * 1024 * 1024
+_maxAge = 3600
+_compress = "gzip"
+_fsync = "interval"
+_fsyncInterval = 1.0
+_fileMode = 0o600
+_timeFormat = '%Y%m%d%H%M%S'
+_frameBytes = 1024 * 1024
+_indexCacheSize = 64
+
+logger = logging.getLogger(__name__)
+
+
+class AlertStore(object):
+    """
+    Rolling NDJSON segments with offset index
+    Several processes may append, the active segment is written and sealed
+    under an exclusive lock. With 'background' sealed segments of all
+    processes are compressed in background threads, otherwise they are left
+    to a background process, e.g. the alert daemon.
+    """
+
+    def __init__(self,
+                 folder,
+                 prefix=_segmentPrefix,
+                 max_bytes=_maxBytes,
+                 max_age=_maxAge,
+                 compress=_compress,
+                 fsync=_fsync,
+                 fsync_interval=_fsyncInterval,
+                 background=True):
+        self.folder = folder
+        self.prefix = prefix
+        self.file = os.path.join(folder, prefix + ".ndjson")
+        self.index_file = os.path.join(folder, prefix + ".idx")
+        self.lock_file = os.path.join(folder, prefix + ".lock")
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age)
+        self.compress = str(compress)
+        self.fsync = str(fsync)
+        self.fsync_interval = float(fsync_interval)
+        self.fd = None
+        self.index_fd = None
+        self.start_time = 0
+        self.synced = time.monotonic()
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.background = bool(background)
+        self.workers = []
+        self.compressing = set()
+        # sealed index file -> (file state, alert id -> index entries)
+        self.index_cache = {}
+        self.index_lock = threading.Lock()
+
+        if self.compress not in COMPRESS:
+            logger.error('CTM Store: Unknown compression "%s"', self.compress)
+            self.compress = "none"
+        if self.compress == "zstd" and zstandard is None:
+            logger.error('CTM Store: zstandard not installed, use gzip')
+            self.compress = "gzip"
+        if self.fsync not in FSYNC:
+            logger.error('CTM Store: Unknown fsync policy "%s"', self.fsync)
+            self.fsync = _fsync
+
+        w3rkstatt.createFolder(folder)
+        self.lock_fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT,
+                               _fileMode)
+
+        # sealed, not yet compressed segments of a previous run
+        if self.background:
+            self.compressSealed()
+
+    def _open(self):
+        self._close()
+        self.fd = os.open(self.file, os.O_RDWR | os.O_APPEND | os.O_CREAT,
+                          _fileMode)
+        self.index_fd = os.open(self.index_file,
+                                os.O_RDWR | os.O_APPEND | os.O_CREAT,
+                                _fileMode)
+        # segment start time, first record of the index
+        with open(self.index_file, "rb") as f:
+            header = f.readline()
+        try:
+            self.start_time = json.loads(header)["start"]
+        except (ValueError, KeyError, TypeError):
+            self.start_time = time.time()
+            self._write(self.index_fd, {"start": self.start_time})
+
+    def _close(self):
+        for fd in (self.fd, self.index_fd):
+            if fd is not None:
+                os.close(fd)
+        self.fd = None
+        self.index_fd = None
+
+    def _reopen(self):
+        # active segment sealed by another process
+        try:
+            if self.fd is None or \
+                    os.stat(self.file).st_ino != os.fstat(self.fd).st_ino:
+                self._open()
+        except FileNotFoundError:
+            self._open()
+
+    def _write(self, fd, record):
+        # returns offset of the record
+        offset = os.fstat(fd).st_size
+        # terminate a torn last record, the next record gets its own line
+        if offset > 0 and os.pread(fd, 1, offset - 1) != b"\n":
+            os.write(fd, b"\n")
+            offset += 1
+        line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+        data = (line + "\n").encode("utf-8")
+        os.write(fd, data)
+        return offset, len(data)
+
+    def _sync(self, force=False):
+        if not self.dirty:
+            return
+        now = time.monotonic()
+        if force or self.fsync == "always" or \
+                (self.fsync == "interval" and
+                 now - self.synced >= self.fsync_interval):
+            os.fsync(self.fd)
+            os.fsync(self.index_fd)
+            self.synced = now
+            self.dirty = False
+
+    def _due(self):
+        size = os.fstat(self.fd).st_size
+        if size < 1:
+            return False
+        return size >= self.max_bytes or \
+            time.time() - self.start_time >= self.max_age
+
+    def _rotate(self):
+        # seal the active segment, keep start and end time in the name
+        self.dirty = True
+        self._sync(force=True)
+        base = self.prefix + "-" + \
+            time.strftime(_timeFormat, time.localtime(self.start_time)) + \
+            "-" + time.strftime(_timeFormat)
+        name = base
+        i = 0
+        while os.path.exists(os.path.join(self.folder, name + ".idx")):
+            i += 1
+            name = base + "-" + str(i)
+        path = os.path.join(self.folder, name + ".ndjson")
+        os.rename(self.file, path)
+        os.rename(self.index_file, os.path.join(self.folder, name + ".idx"))
+        self._open()
+        logger.info('CTM Store: Segment sealed "%s"', path)
+        return path
+
+    def _seal(self, path):
+        if self.compress == "none" or path in self.compressing:
+            return
+        self.compressing.add(path)
+        worker = threading.Thread(target=self._compress,
+                                  args=(path, ),
+                                  name="ctm-store-compress")
+        worker.start()
+        self.workers = [w for w in self.workers if w.is_alive()]
+        self.workers.append(worker)
+
+    def compressSealed(self):
+        '''
+        Compress sealed segments in background threads, also of other processes
+
+        :return: number of segments to compress
+        :rtype: int
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        if self.compress == "none":
+            return 0
+        count = 0
+        for path in self.getSegments():
+            if path != self.file and path.endswith(".ndjson") and \
+                    path not in self.compressing:
+                self._seal(path)
+                count += 1
+        return count
+
+    def _compress(self, path):
+        try:
+            self._compressSegment(path)
+        finally:
+            self.compressing.discard(path)
+
+    def _compressFrame(self, data):
+        if self.compress == "zstd":
+            return zstandard.ZstdCompressor().compress(data)
+        return gzip.compress(data)
+
+    def _decompressFrame(self, segment, data):
+        if segment.endswith(".zst"):
+            if zstandard is None:
+                raise ValueError("zstandard not installed: " + segment)
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def _compressSegment(self, path):
+        target = path + COMPRESS[self.compress]
+        temp = target + "." + str(os.getpid()) + ".tmp"
+        index = self._getIndexFile(path)
+        indexTemp = index + "." + str(os.getpid()) + ".tmp"
+        try:
+            # independent frames of whole records: (start, offset, length)
+            lFrames = []
+            with open(path, "rb") as src:
+                with open(temp, "wb") as dst:
+                    start = 0
+                    while True:
+                        data = src.read(_frameBytes)
+                        if not data:
+                            break
+                        data += src.readline()
+                        frame = self._compressFrame(data)
+                        lFrames.append((start, dst.tell(), len(frame)))
+                        dst.write(frame)
+                        start += len(data)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+            # frame of every record, in place before the segment is replaced
+            self._writeFrameIndex(index, indexTemp, lFrames)
+            os.chmod(temp, _fileMode)
+            os.replace(indexTemp, index)
+            os.rename(temp, target)
+            os.unlink(path)
+        except FileNotFoundError:
+            # compressed by another process
+            for file in (temp, indexTemp):
+                if os.path.exists(file):
+                    os.unlink(file)
+        except Exception as exp:
+            logger.error('CTM Store: Compress Error "%s": %s', path, exp)
+            for file in (temp, indexTemp):
+                if os.path.exists(file):
+                    os.unlink(file)
+
+    def _writeFrameIndex(self, index, temp, frames):
+        lStarts = [start for (start, offset, length) in frames]
+        with open(index, "rb") as src:
+            with open(temp, "wb") as dst:
+                for line in src:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "offset" in entry and len(frames) > 0:
+                        i = bisect.bisect_right(lStarts, entry["offset"]) - 1
+                        start, offset, length = frames[max(i, 0)]
+                        entry["frame_offset"] = offset
+                        entry["frame_length"] = length
+                        entry["frame_start"] = start
+                    record = json.dumps(entry,
+                                        separators=(",", ":"),
+                                        ensure_ascii=False)
+                    dst.write((record + "\n").encode("utf-8"))
+                dst.flush()
+                os.fsync(dst.fileno())
+        os.chmod(temp, _fileMode)
+
+    def append(self, record, alert_id, type="job"):
+        '''
+        Append an alert record to the active segment
+
+        :param dict record: alert record
+        :param str alert_id: alert id for the offset index
+        :param str type: alert type, 'update' for a partial record
+        :return: segment file and offset
+        :rtype: tuple
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        sealed = None
+        with self.lock:
+            fcntl.flock(self.lock_fd, fcntl.LOCK_EX)
+            try:
+                self._reopen()
+                if self._due():
+                    sealed = self._rotate()
+                offset, length = self._write(self.fd, record)
+                self._write(
+                    self.index_fd, {
+                        "alert_id": str(alert_id),
+                        "type": type,
+                        "offset": offset,
+                        "length": length,
+                        "time": time.time()
+                    })
+                self.dirty = True
+                self._sync()
+            finally:
+                fcntl.flock(self.lock_fd, fcntl.LOCK_UN)
+
+        if sealed is not None and self.background:
+            # includes segments sealed by ctm_alerts.py processes
+            self.compressSealed()
+        return (self.file, offset)
+
+    def update(self, alert_id, key, value):
+        '''
+        Add a late value to a stored alert, e.g. the job log
+
+        :param str alert_id: alert id
+        :param str key: alert record key
+        :param value: new value, stored as [value]
+        :return: segment file and offset
+        :rtype: tuple
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        return self.append(record={key: [value]},
+                           alert_id=alert_id,
+                           type="update")
+
+    def getSegments(self):
+        '''
+        Get segment files, oldest first, the active segment last
+
+        :return: segment files
+        :rtype: list
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        lSegments = []
+        pattern = os.path.join(self.folder, self.prefix + "-*.idx")
+        for index in sorted(glob.glob(pattern), key=self._getSegmentKey):
+            base = index[:-len(".idx")]
+            for suffix in (".ndjson", ".ndjson.gz", ".ndjson.zst"):
+                if os.path.exists(base + suffix):
+                    lSegments.append(base + suffix)
+                    break
+        if os.path.exists(self.file):
+            lSegments.append(self.file)
+        return lSegments
+
+    def _getSegmentKey(self, index):
+        # start, end, counter of segments sealed within the same second
+        name = os.path.basename(index)[len(self.prefix) + 1:-len(".idx")]
+        parts = name.split("-") + ["0"]
+        try:
+            counter = int(parts[2])
+        except ValueError:
+            counter = 0
+        return (parts[0], parts[1] if len(parts) > 2 else "", counter)
+
+    def _getIndexFile(self, segment):
+        base = segment
+        for suffix in (".gz", ".zst", ".ndjson"):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        return base + ".idx"
+
+    def _loadIndex(self, index):
+        # alert id -> index entries, in order of the segment
+        jIndex = {}
+        with open(index, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if "alert_id" in entry:
+                    jIndex.setdefault(entry["alert_id"], []).append(entry)
+        return jIndex
+
+    def _readIndex(self, segment, alert_id):
+        index = self._getIndexFile(segment)
+        try:
+            if index == self.index_file:
+                # active segment, still growing
+                return self._loadIndex(index).get(alert_id, [])
+
+            stat = os.stat(index)
+            state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            with self.index_lock:
+                cached = self.index_cache.get(index)
+            if cached is None or cached[0] != state:
+                cached = (state, self._loadIndex(index))
+                with self.index_lock:
+                    self.index_cache.pop(index, None)
+                    self.index_cache[index] = cached
+                    while len(self.index_cache) > _indexCacheSize:
+                        del self.index_cache[next(iter(self.index_cache))]
+            return cached[1].get(alert_id, [])
+        except FileNotFoundError:
+            return []
+
+    def _readRecord(self, segment, entry):
+        if "frame_offset" in entry and segment.endswith((".gz", ".zst")):
+            # decompress the frame of the record only
+            with open(segment, "rb") as f:
+                f.seek(entry["frame_offset"])
+                frame = f.read(entry["frame_length"])
+            start = entry["offset"] - entry["frame_start"]
+            data = self._decompressFrame(segment, frame)
+            return json.loads(data[start:start + entry["length"]])
+
+        # segment of a previous version, one compressed stream
+        if segment.endswith(".zst"):
+            if zstandard is None:
+                raise ValueError("zstandard not installed: " + segment)
+            with open(segment, "rb") as f:
+                with zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                    reader.seek(entry["offset"])
+                    data = reader.read(entry["length"])
+        elif segment.endswith(".gz"):
+            with gzip.open(segment, "rb") as f:
+                f.seek(entry["offset"])
+                data = f.read(entry["length"])
+        else:
+            with open(segment, "rb") as f:
+                f.seek(entry["offset"])
+                data = f.read(entry["length"])
+        return json.loads(data)
+
+    def get(self, alert_id):
+        '''
+        Read a stored alert, newest record of the alert id with its updates
+
+        :param str alert_id: alert id
+        :return: alert record or None if not found
+        :rtype: dict
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        alert_id = str(alert_id)
+        for attempt in range(2):
+            lUpdates = []
+            try:
+                for segment in reversed(self.getSegments()):
+                    for entry in reversed(self._readIndex(segment, alert_id)):
+                        record = self._readRecord(segment, entry)
+                        if entry.get("type") != "update":
+                            for update in reversed(lUpdates):
+                                record.update(update)
+                            return record
+                        lUpdates.append(record)
+                return None
+            except FileNotFoundError:
+                # segment sealed or compressed while reading
+                continue
+        return None
+
+    def close(self):
+        '''
+        Sync and close the active segment, wait for running compressions
+
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        with self.lock:
+            if self.fd is not None:
+                self._sync(force=True)
+            self._close()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+
+
+def getStore(data, folder, background=True):
+    '''
+    Get alert store as configured in CTM.alerts.store
+
+    :param dict data: project configuration
+    :param str folder: default folder of the segments
+    :param bool background: compress sealed segments in this process
+    :return: store or None if alerts are written as single files
+    :rtype: AlertStore
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    mode = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.mode", data=data)
+    if mode != "ndjson":
+        return None
+
+    store_folder = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.folder",
+                                          data=data)
+    if len(str(store_folder)) < 1:
+        store_folder = os.path.join(folder, "alerts")
+    prefix = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.prefix",
+                                    data=data)
+    if not prefix:
+        prefix = _segmentPrefix
+    max_bytes = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.max_bytes",
+                                       data=data)
+    if not max_bytes:
+        max_bytes = _maxBytes
+    max_age = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.max_age",
+                                     data=data)
+    if not max_age:
+        max_age = _maxAge
+    compress = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.compress",
+                                      data=data)
+    if not compress:
+        compress = _compress
+    fsync = w3rkstatt.getJsonValue(path="$.CTM.alerts.store.fsync", data=data)
+    if not fsync:
+        fsync = _fsync
+    fsync_interval = w3rkstatt.getJsonValue(
+        path="$.CTM.alerts.store.fsync_interval", data=data)
+    if not fsync_interval:
+        fsync_interval = _fsyncInterval
+
+    return AlertStore(folder=store_folder,
+                      prefix=prefix,
+                      max_bytes=max_bytes,
+                      max_age=max_age,
+                      compress=compress,
+                      fsync=fsync,
+                      fsync_interval=fsync_interval,
+                      background=background)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.ERROR)
+    if len(sys.argv) < 2:
+        print("Usage: ctm_store.py alert_id | --compress")
+        sys.exit(1)
+
+    jCfgData = w3rkstatt.getProjectConfig()
+    logFolder = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder",
+                                       data=jCfgData)
+    alertStore = getStore(data=jCfgData, folder=logFolder, background=False)
+    if alertStore is None:
+        print("Message: CTM.alerts.store.mode is not 'ndjson'")
+        sys.exit(1)
+
+    if sys.argv[1] == "--compress":
+        count = alertStore.compressSealed()
+        alertStore.close()
+        print("Message: Compressed " + str(count) + " sealed segments")
+        sys.exit(0)
+
+    jAlert = alertStore.get(alert_id=sys.argv[1])
+    if jAlert is None:
+        print("Message: Alert " + sys.argv[1] + " not found")
+        sys.exit(1)
+    print(json.dumps(jAlert, ensure_ascii=False, indent=4))
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# Filename: ctm_storm.py
+"""
+(c) 2020 Volker Scheithauer
+Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+documentation files (the "Software"), to deal in the Software without restriction, including without limitation the
+rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software, and to permit
+persons to whom the Software is furnished to do so, subject to the following conditions:
+The above copyright notice and this permission notice (including the next paragraph) shall be included in all copies or
+substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE
+WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR
+COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+https://opensource.org/licenses/GPL-3.0
+# SPDX-License-Identifier: GPL-3.0-or-later
+For information on SDPX, https://spdx.org/licenses/GPL-3.0-or-later.html
+
+Control-M Alert Storm Handling
+The first alert of a key is processed at once and creates the incident and
+event of the storm. Near-identical transformed alerts following it within a
+sliding time window are coalesced into one representative alert, which
+updates the incident and event of the first alert and is acknowledged for
+all members. One storm yields one incident.
+
+Representative alert of the follow-up alerts:
+  occurrences          number of alerts of the storm, incl. the first alert
+  first_occurrence     send_time of the first alert
+  last_occurrence      send_time of the last alert
+  coalesced_alert_ids  alert ids of the first alert and the group
+
+Change Log
+Date (YMD)    Name                  What
+--------      ------------------    ------------------------
+20261018      Orchestrator          Initial Development
+20261018      Orchestrator          Process the first alert of a key at once
+20261018      Orchestrator          Update the incident of the first alert of a storm
+
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+
+# handle dev environment vs. production
+try:
+    import w3rkstatt as w3rkstatt
+except:
+    # fix import issues for modules
+    sys.path.append(
+        os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+    from src import w3rkstatt as w3rkstatt
+
+# Assign module defaults
+_coalesceKey = ["system_category", "job_id", "host_id", "message_summary"]
+_coalesceWindow = 10
+_coalesceMaxHold = 60
+_stormLeaderWait = 300
+
+logger = logging.getLogger(__name__)
+
+
+class AlertStorm(object):
+    """
+    First alert of a storm and the integration ids created for it
+    Groups of follow-up alerts wait for the first alert to be processed.
+    """
+
+    def __init__(self, entry, data):
+        self.entry = entry
+        self.alert_id = str(data.get("alert_id")).strip()
+        self.send_time = data.get("send_time")
+        self.count = 1
+        self.sinks = {}
+        self.ready = threading.Event()
+
+    def isLeader(self, entry):
+        return entry["uuid"] == self.entry["uuid"]
+
+    def finish(self, sinks):
+        '''
+        First alert processed, release the groups of follow-up alerts
+
+        :param dict sinks: integration -> id, None if the alert failed
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        if sinks:
+            self.sinks = dict(sinks)
+        self.ready.set()
+
+    def leader(self, timeout=_stormLeaderWait):
+        '''
+        Wait for the first alert, get its alert id and integration ids
+
+        :param float timeout: max. seconds to wait
+        :return: {"alert_id", "itsm", "bhom", "tsim"}, ids of failed integrations are None
+        :rtype: dict
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        if not self.ready.wait(timeout):
+            logger.warning('CTM Alert Storm: first alert %s not processed',
+                           self.alert_id)
+        jLeader = {"alert_id": self.alert_id}
+        for sink in ("itsm", "bhom", "tsim"):
+            jLeader[sink] = self.sinks.get(sink)
+        return jLeader
+
+
+class AlertCoalescer(object):
+    """
+    Group transformed alerts by key within a sliding window
+    The first alert of a key is emitted at once and opens the window. The
+    following alerts are emitted as one group 'window' seconds after the
+    last alert, or every 'max_hold' seconds during a continuous storm. All
+    groups of a storm refer to its first alert. A window without followers
+    ends the storm silently.
+    :property emit callback, receives the group: {"entry", "data", "members", "storm"}
+    """
+
+    def __init__(self,
+                 emit,
+                 key=_coalesceKey,
+                 window=_coalesceWindow,
+                 max_hold=_coalesceMaxHold):
+        self.emit = emit
+        self.key = list(key)
+        self.window = float(window)
+        self.max_hold = float(max_hold)
+        self.groups = {}
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def getKey(self, data):
+        return tuple(str(data.get(field)) for field in self.key)
+
+    def add(self, entry, data):
+        '''
+        Add a transformed 'New' alert to its group
+
+        :param dict entry: journal entry of the alert
+        :param dict data: transformed alert
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        key = self.getKey(data)
+        now = time.monotonic()
+        with self.cond:
+            group = self.groups.get(key)
+            if group is None:
+                # first alert, no added latency
+                stormAlert = AlertStorm(entry=entry, data=data)
+                self.groups[key] = {
+                    "first": now,
+                    "last": now,
+                    "members": [],
+                    "count": 1,
+                    "storm": stormAlert
+                }
+            else:
+                group["last"] = now
+                group["members"].append((entry, data))
+                group["storm"].count += 1
+                group["count"] = group["storm"].count
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run,
+                                               name="ctm-alert-coalesce",
+                                               daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+        if group is None:
+            self._send({
+                "entry": entry,
+                "data": data,
+                "members": [entry],
+                "storm": stormAlert
+            })
+
+    def _due(self, group):
+        return min(group["last"] + self.window, group["first"] + self.max_hold)
+
+    def _run(self):
+        while True:
+            lGroups = []
+            with self.cond:
+                while len(self.groups) < 1:
+                    self.cond.wait()
+                now = time.monotonic()
+                for key, group in list(self.groups.items()):
+                    if self._due(group) <= now:
+                        lGroups.append(self.groups.pop(key))
+                        if group["last"] + self.window > now:
+                            # storm continues, next group updates the same incident
+                            self.groups[key] = {
+                                "first": now,
+                                "last": group["last"],
+                                "members": [],
+                                "count": group["count"],
+                                "storm": group["storm"]
+                            }
+                if len(lGroups) < 1:
+                    wait = min(
+                        self._due(group)
+                        for group in self.groups.values()) - now
+                    self.cond.wait(wait)
+                    continue
+
+            for group in lGroups:
+                if len(group["members"]) > 0:
+                    self._emit(group)
+
+    def _emit(self, group):
+        stormAlert = group["storm"]
+        lMembers = group["members"]
+        entry, data = lMembers[0]
+        data = dict(data)
+        data["occurrences"] = group["count"]
+        data["first_occurrence"] = stormAlert.send_time
+        data["last_occurrence"] = lMembers[-1][1].get("send_time")
+        data["coalesced_alert_ids"] = [stormAlert.alert_id] + [
+            str(member.get("alert_id")).strip()
+            for (member_entry, member) in lMembers
+        ]
+        logger.info('CTM Alert Storm: %s alerts coalesced into %s',
+                    len(lMembers), stormAlert.alert_id)
+        lEntries = [member_entry for (member_entry, member) in lMembers]
+        self._send({
+            "entry": entry,
+            "data": data,
+            "members": lEntries,
+            "storm": stormAlert
+        })
+
+    def _send(self, group):
+        try:
+            self.emit(group)
+        except Exception as exp:
+            logger.error('CTM Alert Storm Emit Error: %s', exp)
+
+    def flush(self):
+        '''
+        Emit all open groups at once, e.g. on shutdown
+
+        :return: number of emitted groups
+        :rtype: int
+        :raises ValueError: N/A
+        :raises TypeError: N/A
+        '''
+        with self.cond:
+            lGroups = [
+                group for group in self.groups.values()
+                if len(group["members"]) > 0
+            ]
+            self.groups = {}
+        for group in lGroups:
+            self._emit(group)
+        return len(lGroups)
+
+    def size(self):
+        with self.cond:
+            return sum(len(group["members"]) for group in self.groups.values())
+
+
+def getCoalescer(data, emit):
+    '''
+    Get alert coalescer as configured in CTM.alerts.coalesce
+
+    :param dict data: project configuration
+    :param emit: callback for the representative alert of a group
+    :return: coalescer or None if disabled
+    :rtype: AlertCoalescer
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    enabled = w3rkstatt.getJsonValue(path="$.CTM.alerts.coalesce.enabled",
+                                     data=data)
+    if not enabled:
+        return None
+
+    key = w3rkstatt.getJsonValue(path="$.CTM.alerts.coalesce.key", data=data)
+    if not key:
+        key = _coalesceKey
+    window = w3rkstatt.getJsonValue(path="$.CTM.alerts.coalesce.window",
+                                    data=data)
+    if not window:
+        window = _coalesceWindow
+    max_hold = w3rkstatt.getJsonValue(path="$.CTM.alerts.coalesce.max_hold",
+                                      data=data)
+    if not max_hold:
+        max_hold = _coalesceMaxHold
+
+    return AlertCoalescer(emit=emit, key=key, window=window, max_hold=max_hold)
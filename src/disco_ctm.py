@@ -26,6 +26,7 @@ Change Log
 Date (YMD)    Name                  What
 --------      ------------------    ------------------------
 20210709      Volker Scheithauer    Inital Code
+20261018      Orchestrator          Resolve own host name on first use
 
 """
 
@@ -52,15 +53,16 @@ import jsonpath_rw_ext
 from jsonpath_ng.ext import parse
 
 # Get configuration from bmcs_core.json
-jCfgData   = w3rkstatt.getProjectConfig()
-cfgFolder  = w3rkstatt.getJsonValue(path="$.DEFAULT.config_folder",data=jCfgData)
-logFolder  = w3rkstatt.getJsonValue(path="$.DEFAULT.log_folder",data=jCfgData)
-tmpFolder  = w3rkstatt.getJsonValue(path="$.DEFAULT.template_folder",data=jCfgData)
-cryptoFile = w3rkstatt.getJsonValue(path="$.DEFAULT.crypto_file",data=jCfgData)
+cfg   = w3rkstatt.getConfig()
+jCfgData   = cfg.data
+cfgFolder  = cfg.default.config_folder
+logFolder  = cfg.default.log_folder
+tmpFolder  = cfg.default.template_folder
+cryptoFile = cfg.default.crypto_file
 
-data_folder = w3rkstatt.getJsonValue(path="$.DEFAULT.data_folder",data=jCfgData)
-ctm_host    = w3rkstatt.getJsonValue(path="$.CTM.host",data=jCfgData)
-ctm_port    = w3rkstatt.getJsonValue(path="$.CTM.port",data=jCfgData)
+data_folder = cfg.default.data_folder
+ctm_host    = cfg.ctm.host
+ctm_port    = cfg.ctm.port
 
 # Assign module defaults
 _localDebug = False
@@ -74,13 +76,10 @@ _timeFormat = '%d %b %Y %H:%M:%S,%f'
 _ctmActiveApi = False
 
 logger   = w3rkstatt.logging.getLogger(__name__) 
-logFile  = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file",data=jCfgData)
-loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel",data=jCfgData)
+logFile  = cfg.default.log_file
+loglevel = cfg.default.loglevel
 epoch    = time.time()
 hostName = w3rkstatt.getHostName()
-hostIP   = w3rkstatt.getHostIP(hostName)
-hostFqdn = w3rkstatt.getHostFqdn(hostName)
-domain   = w3rkstatt.getHostDomain(hostFqdn)
 sUuid    = w3rkstatt.sUuid
 
 def getCtmAgents(ctmApiClient,ctmServer):
@@ -135,6 +135,11 @@ FILES_REQUIRED=(
     "core_bhom.py"
     "core_tso.py"
     "ctm_alerts.py"
+    "ctm_alertd.py"
+    "ctm_alerts_client.py"
+    "ctm_spool.py"
+    "ctm_storm.py"
+    "ctm_store.py"
     "disco_ctm.py"
     "w3rkstatt.py"
     "ctm_alerts.sh"
@@ -27,6 +27,7 @@ Date (YMD)    Name                  What
 20210521      Volker Scheithauer    Consolidate test cases
 20210527      Volker Scheithauer    Update UAT
 20220715      Volker Scheithauer    Update UAT
+20261018      Orchestrator          Resolve own host name on first use
 
 """
 
@@ -76,9 +77,6 @@ logFile = w3rkstatt.getJsonValue(path="$.DEFAULT.log_file", data=jCfgData)
 loglevel = w3rkstatt.getJsonValue(path="$.DEFAULT.loglevel", data=jCfgData)
 epoch = str(time.time())
 hostName = w3rkstatt.getHostName()
-hostIP = w3rkstatt.getHostIP(hostName)
-hostFqdn = w3rkstatt.getHostFqdn(hostName)
-domain = w3rkstatt.getHostDomain(hostFqdn)
 
 # Assign module defaults
 _modVer = "20.21.05.00"
@@ -265,6 +263,7 @@ def testChangeCreate(token):
 
 
 def tsimDefineEvent():
+    hostFqdn = w3rkstatt.getHostFqdn(hostName)
     # Create a dictionary to hold the attributes for the event.
     # Be sure to use valid slot names as the keys.
     event_data = {}
@@ -276,8 +275,8 @@ def tsimDefineEvent():
     event_data['instancename'] = hostFqdn
     event_data['itsm_product_name'] = 'Control-M'
     event_data['mc_host'] = 'ctm-em.trybmc.com'
-    event_data['mc_host_address'] = hostIP
-    event_data['mc_location'] = domain
+    event_data['mc_host_address'] = w3rkstatt.getHostIP(hostName)
+    event_data['mc_location'] = w3rkstatt.getHostDomain(hostFqdn)
     event_data['mc_object'] = 'Job'
     event_data['mc_object_class'] = 'Control-M'
     event_data['mc_origin'] = 'Enterprise Manager'
@@ -310,6 +309,7 @@ def tsimDefineEvent():
 
 
 def bhomDefineEvent():
+    hostFqdn = w3rkstatt.getHostFqdn(hostName)
     # Create a dictionary to hold the attributes for the event.
     # Be sure to use valid slot names as the keys.
     event_severity_list = [
@@ -329,7 +329,7 @@ def bhomDefineEvent():
     event_data['alias'] = 'BMC_ComputerSystem:' + hostFqdn + "'"
     event_data['status'] = 'OPEN'
     event_data['priority'] = 'PRIORITY_3'
-    event_data['location'] = domain
+    event_data['location'] = w3rkstatt.getHostDomain(hostFqdn)
     event_data['instancename'] = hostFqdn
     event_data['cdmclass'] = 'BMC_ComputerSystem'
     event_data['componentalias'] = 'BMC_ComputerSystem:' + hostFqdn + "'"
@@ -622,7 +622,7 @@ if __name__ == "__main__":
     logger.info('System Platform: %s ', w3rkstatt.platform.system())
     logger.info('Log Level: %s', loglevel)
     logger.info('Host Name: %s', hostName)
-    logger.info('Host IP: %s', hostIP)
+    logger.info('Host IP: %s', w3rkstatt.getHostIP(hostName))
     logger.info('CTM Url: %s', ctm.ctm_url)
     logger.info('CTM User: %s', ctm.ctm_user)
     logger.info('Epoch: %s', epoch)
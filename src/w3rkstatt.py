@@ -28,6 +28,19 @@ Date (YMD)    Name                  What
 20210513      Volker Scheithauer    Add Password Encryption
 20220715      Volker Scheithauer    Add API Key Encryption
 20230522      Volker Scheithauer    Update API key issues
+20261018      Orchestrator          Add concurrent task graph
+20261018      Orchestrator          Add retry scheduler with backoff
+20261018      Orchestrator          Task graph tasks with own worker pool
+20261018      Orchestrator          Cache compiled jsonPath expressions
+20261018      Orchestrator          Load-once typed project config
+20261018      Orchestrator          Hot reload of project config
+20261018      Orchestrator          Cached host name resolution
+20261018      Orchestrator          Decrypt-once secret store
+20261018      Orchestrator          Import pandas, jsonpath_ng and crypto on first use
+20261018      Orchestrator          Stream csv reports in typed row batches
+20261018      Orchestrator          Bound host resolution cache
+20261018      Orchestrator          Infer csv column types like pandas
+20261018      Orchestrator          Read only project config content
 
 """
 
@@ -46,37 +59,37 @@ import urllib
 import json
 import sys
 import random
+import heapq
+import threading
+import functools
+import concurrent.futures
+import types
+import importlib.util
+import csv
+import math
+import hashlib
+from base64 import b64encode, b64decode
+from dataclasses import dataclass, field
 from os.path import expanduser
 
 from io import StringIO
 from pathlib import Path
 from urllib.parse import urlparse
 
-import pandas as pd
-from jsonpath_ng import jsonpath
-from jsonpath_ng.ext import parse
-
-try:
-    # Cryptodome
-    from base64 import b64encode, b64decode
-    from Cryptodome.Cipher import AES
-    from Cryptodome.Util.Padding import pad, unpad
-    from Cryptodome.Random import get_random_bytes
-except:
-    # Crypto ?
-    from Crypto.Cipher import AES
-    from Crypto.Random import get_random_bytes
-    from Crypto.Util.Padding import pad, unpad
-    from Crypto.Random import get_random_bytes
+# pandas, jsonpath_ng and Cryptodome are imported on first use,
+# the alert path does not need them at start
 
 _modVer = "20.23.05.00"
 _timeFormat = '%d %b %Y %H:%M:%S,%f'
 _localDebug = False
 _SecureDebug = True
-
+_jsonPathSimple = re.compile(r"^\$((?:\.[A-Za-z_][A-Za-z0-9_\-]*)+)$")
+_jsonPathKeywords = ("where", "wherenot")
+_jsonPathMissing = object()
 
 # Global functions
 
+
 def getRandomNumber(l):
     '''
     Generate a random 10 digit number
@@ -87,7 +100,7 @@ def getRandomNumber(l):
     :raises ValueError: N/A
     :raises TypeError: N/A
     '''
-    minimum = pow(10, l-1)
+    minimum = pow(10, l - 1)
     maximum = pow(10, l) - 1
     value = int(random.randint(minimum, maximum))
     return value
@@ -427,6 +440,79 @@ def writeJsonFile(file, content):
     return status
 
 
+def lazyImport(name):
+    '''
+    Import a module, the module code runs on first attribute access
+
+    :param str name: module name
+    :return: module
+    :rtype: module
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError("No module named '" + name + "'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+@functools.lru_cache(maxsize=512)
+def getJsonPath(path):
+    '''
+    Compile a jsonPath expression, cached per expression
+
+    Simple child paths like $.a.b.c are returned as a tuple of keys,
+    everything else as a compiled jsonpath_ng expression
+
+    :param str path: jsonPath expression
+    :return: keys or compiled expression
+    :rtype: tuple
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    simple = _jsonPathSimple.match(path)
+    if simple:
+        keys = tuple(simple.group(1)[1:].split("."))
+        if not any(key in _jsonPathKeywords for key in keys):
+            return keys
+
+    from jsonpath_ng.ext import parse
+    return parse(path)
+
+
+def getJsonPathValue(keys, data):
+    '''
+    Walk json content along a simple jsonPath
+
+    Follows jsonpath_ng semantics: only objects providing get() are
+    traversed, a missing key or any other type is no match
+
+    :param tuple keys: keys from getJsonPath
+    :param dict data: json content
+    :return: content or _jsonPathMissing
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    value = data
+    for key in keys:
+        try:
+            value = value.get(key, _jsonPathMissing)
+        except (TypeError, AttributeError):
+            return _jsonPathMissing
+        if value is _jsonPathMissing:
+            break
+    return value
+
+
 def getJsonValue(path, data):
     '''
     Extract data from json content using jsonPath
@@ -438,7 +524,13 @@ def getJsonValue(path, data):
     :raises ValueError: N/A
     :raises TypeError: N/A    
     '''
-    jpexp = parse(path)
+    jpexp = getJsonPath(path)
+    if isinstance(jpexp, tuple):
+        value = getJsonPathValue(keys=jpexp, data=data)
+        if value is _jsonPathMissing:
+            value = ""
+        return value
+
     match = jpexp.find(data)
     try:
         value = match[0].value
@@ -460,7 +552,13 @@ def getJsonValues(path, data):
     :raises TypeError: N/A    
     '''
 
-    jpexp = parse(path)
+    jpexp = getJsonPath(path)
+    if isinstance(jpexp, tuple):
+        value = getJsonPathValue(keys=jpexp, data=data)
+        if value is _jsonPathMissing:
+            return []
+        return [value]
+
     values = [match.value for match in jpexp.find(data)]
     return values
 
@@ -691,7 +789,152 @@ def encodeUrl(data):
     return data
 
 
+class HostResolver:
+    '''
+    Cache host name resolution results
+
+    Successful lookups are kept for ttl seconds, failed lookups for
+    negative_ttl seconds. Concurrent lookups of the same host wait for
+    the first one instead of asking the resolver again. Once max_entries
+    are cached, expired entries are removed, then the oldest ones.
+    '''
+
+    def __init__(self, ttl=300, negative_ttl=30, max_entries=4096):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(int(max_entries), 1)
+        self.cache = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def resolve(self, kind, hostname, func):
+        '''
+        Get a cached result or call func(hostname)
+
+        :param str kind: lookup type, e.g. ip or fqdn
+        :param str hostname: hostname or ip address
+        :param function func: uncached lookup
+        :return: lookup result
+        :rtype: str
+        '''
+        key = (kind, hostname)
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            waiter = self.pending.get(key)
+            owner = waiter is None
+            if owner:
+                waiter = {"event": threading.Event(), "value": None}
+                self.pending[key] = waiter
+
+        if not owner:
+            waiter["event"].wait()
+            return waiter["value"]
+
+        value = None
+        try:
+            value = func(hostname)
+        finally:
+            if value:
+                expires = time.monotonic() + self.ttl
+            else:
+                expires = time.monotonic() + self.negative_ttl
+            with self.lock:
+                # re-insert, the cache is kept in order of insertion
+                self.cache.pop(key, None)
+                if len(self.cache) >= self.max_entries:
+                    self._prune()
+                self.cache[key] = (expires, value)
+                del self.pending[key]
+            waiter["value"] = value
+            waiter["event"].set()
+        return value
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [k for k, v in self.cache.items() if v[0] <= now]:
+            del self.cache[key]
+        # still full, drop the oldest entries
+        lKeys = list(self.cache)[:len(self.cache) - self.max_entries + 1]
+        for key in lKeys:
+            del self.cache[key]
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+def getHostResolver():
+    '''
+    Get shared host name resolution cache, DEFAULT.dns.ttl and
+    DEFAULT.dns.negative_ttl in seconds, DEFAULT.dns.max_entries
+
+    :return: host resolver
+    :rtype: HostResolver
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    global hostResolver
+    if hostResolver is None:
+        cfg = getConfig()
+        ttl = cfg.default.get("dns.ttl")
+        if not ttl:
+            ttl = 300
+        negative_ttl = cfg.default.get("dns.negative_ttl")
+        if not negative_ttl:
+            negative_ttl = 30
+        max_entries = cfg.default.get("dns.max_entries")
+        if not max_entries:
+            max_entries = 4096
+        hostResolver = HostResolver(ttl=ttl,
+                                    negative_ttl=negative_ttl,
+                                    max_entries=max_entries)
+    return hostResolver
+
+
+def prewarmHosts(hostnames, workers=4):
+    '''
+    Resolve hosts in the background to fill the host resolution cache
+
+    :param list hostnames: hostnames
+    :param int workers: concurrent lookups
+    :return: background thread
+    :rtype: Thread
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    lHosts = [host for host in dict.fromkeys(hostnames) if host]
+
+    def prewarm():
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers) as executor:
+            list(
+                executor.map(lambda host: getHostDetails(hostname=host),
+                             lHosts))
+        logger.info('Script: Prewarmed %s Hosts', len(lHosts))
+
+    thread = threading.Thread(target=prewarm,
+                              name="w3rkstatt-prewarm",
+                              daemon=True)
+    thread.start()
+    return thread
+
+
 def getHostIP(hostname):
+    '''
+    Get IP address for given hostname, cached
+
+    :param str hostname: hostname
+    :return: ip address
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    return getHostResolver().resolve("ip", hostname, resolveHostIP)
+
+
+def resolveHostIP(hostname):
     '''
     Get IP address for given hostname
 
@@ -743,6 +986,19 @@ def getHostName():
 
 
 def getHostFqdn(hostname):
+    '''
+    Get full qualified domain name for given hostname, cached
+
+    :param str hostname: hostname
+    :return: fqdn
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    return getHostResolver().resolve("fqdn", hostname, resolveHostFqdn)
+
+
+def resolveHostFqdn(hostname):
     '''
     Get full qualified domain name for given hostnamr
 
@@ -781,6 +1037,22 @@ def getHostDomain(hostname):
     return domain
 
 
+def getHostDetails(hostname):
+    '''
+    Get IP address, full qualified domain name and domain for given hostname
+
+    :param str hostname: hostname
+    :return: {"ip": ip address, "fqdn": fqdn, "domain": domain}
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    ip = getHostIP(hostname=hostname)
+    fqdn = getHostFqdn(hostname=hostname)
+    domain = ".".join(fqdn.split('.')[1:])
+    return {"ip": ip, "fqdn": fqdn, "domain": domain}
+
+
 def getHostFromFQDN(fqdn):
     '''
     Extract hostname name for given full qualified hostname
@@ -796,6 +1068,19 @@ def getHostFromFQDN(fqdn):
 
 
 def getHostByIP(hostIP):
+    '''
+    Get hostname name for given ip address, cached
+
+    :param str hostIP: ip address
+    :return: hostname
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    return getHostResolver().resolve("name", hostIP, resolveHostByIP)
+
+
+def resolveHostByIP(hostIP):
     '''
     Get hostname name for given ip address
 
@@ -843,6 +1128,222 @@ def getHostAddressInfo(hostname, port):
         return False
 
 
+def runTaskGraph(tasks, executor, timeout=30):
+    '''
+    Run tasks concurrently, a task starts when its required tasks are done
+
+    Task definition: {"func": callable, "args": dict, "requires": [task names],
+    "default": result on error or timeout, "timeout": seconds,
+    "executor": own worker pool}
+    Results of required tasks are passed to func as keyword arguments named
+    after the required task. A task running longer than its timeout is not
+    waited for, its default is used instead.
+
+    :param dict tasks: task name -> task definition
+    :param concurrent.futures.Executor executor: bounded worker pool, used by tasks without own pool
+    :param int timeout: default timeout per task in seconds
+    :return: task name -> result
+    :rtype: dict
+    :raises ValueError: unknown or circular requirement
+    :raises TypeError: N/A    
+    '''
+    results = {}
+    running = {}
+    waiting = dict(tasks)
+
+    for name, task in tasks.items():
+        for required in task.get("requires", []):
+            if required not in tasks:
+                raise ValueError("Unknown task requirement: " + required)
+
+    while len(waiting) > 0 or len(running) > 0:
+        # start tasks whose requirements are met
+        for name, task in list(waiting.items()):
+            requires = task.get("requires", [])
+            if all(required in results for required in requires):
+                args = dict(task.get("args", {}))
+                for required in requires:
+                    args[required] = results[required]
+                future = task.get("executor",
+                                  executor).submit(task["func"], **args)
+                deadline = time.monotonic() + task.get("timeout", timeout)
+                running[future] = (name, deadline)
+                del waiting[name]
+
+        if len(running) < 1:
+            raise ValueError("Circular task requirement: " +
+                             ", ".join(waiting))
+
+        now = time.monotonic()
+        wait = max(0,
+                   min(deadline for name, deadline in running.values()) - now)
+        done, pending = concurrent.futures.wait(
+            running,
+            timeout=wait,
+            return_when=concurrent.futures.FIRST_COMPLETED)
+
+        for future in done:
+            name, deadline = running.pop(future)
+            try:
+                results[name] = future.result()
+            except Exception as exp:
+                logger.error('Script: Task "%s" Error: %s', name, exp)
+                results[name] = tasks[name].get("default")
+
+        now = time.monotonic()
+        for future in list(pending):
+            name, deadline = running[future]
+            if deadline <= now:
+                # thread keeps running, result is dropped
+                future.cancel()
+                del running[future]
+                logger.error('Script: Task "%s" Timeout', name)
+                results[name] = tasks[name].get("default")
+
+    return results
+
+
+def getBackoffDelay(attempt, delay=2, backoff=2, limit=60):
+    '''
+    Exponential backoff with jitter, half of the delay is random
+
+    :param int attempt: number of failed attempts, starting with 0
+    :param float delay: delay after the first attempt in seconds
+    :param float backoff: delay multiplier per attempt
+    :param float limit: max. delay in seconds
+    :return: delay in seconds
+    :rtype: float
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    value = min(float(limit), float(delay) * float(backoff)**attempt)
+    return value / 2 + random.uniform(0, value / 2)
+
+
+class RetryScheduler(object):
+    """
+    Run delayed tasks on a worker pool, no thread sleeps while waiting
+    A single timer thread hands due tasks over to the executor.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.tasks = []
+        self.active = 0
+        self.seq = 0
+        self.cond = threading.Condition()
+        self.thread = None
+
+    def schedule(self, delay, func, **kwargs):
+        '''
+        Run func(**kwargs) on the executor after delay seconds
+
+        :param float delay: seconds
+        :param func: task function
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A    
+        '''
+        with self.cond:
+            self.seq += 1
+            self.active += 1
+            heapq.heappush(self.tasks,
+                           (time.monotonic() + delay, self.seq, func, kwargs))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._timer,
+                                               name="retry-scheduler",
+                                               daemon=True)
+                self.thread.start()
+            self.cond.notify_all()
+
+    def retry(self,
+              func,
+              args,
+              check,
+              callback,
+              delay=2,
+              backoff=2,
+              limit=60,
+              deadline=300):
+        '''
+        Call func until check(result) is True or the deadline is reached,
+        then call callback(result, status). The first attempt is after delay.
+
+        :param func: task function
+        :param dict args: task function arguments
+        :param check: result validation, returns bool
+        :param callback: receives last result and check status
+        :param float delay: delay after the first attempt in seconds
+        :param float backoff: delay multiplier per attempt
+        :param float limit: max. delay in seconds
+        :param float deadline: give up after this many seconds
+        :return: None
+        :raises ValueError: N/A
+        :raises TypeError: N/A    
+        '''
+        expires = time.monotonic() + deadline
+
+        def attempt(number):
+            result = None
+            status = False
+            try:
+                result = func(**args)
+                status = check(result)
+            except Exception as exp:
+                logger.error('Script: Retry Error: %s', exp)
+
+            wait = getBackoffDelay(attempt=number + 1,
+                                   delay=delay,
+                                   backoff=backoff,
+                                   limit=limit)
+            if status or time.monotonic() + wait > expires:
+                callback(result, status)
+            else:
+                self.schedule(wait, attempt, number=number + 1)
+
+        self.schedule(getBackoffDelay(attempt=0,
+                                      delay=delay,
+                                      backoff=backoff,
+                                      limit=limit),
+                      attempt,
+                      number=0)
+
+    def _run(self, func, kwargs):
+        try:
+            func(**kwargs)
+        except Exception as exp:
+            logger.error('Script: Scheduled Task Error: %s', exp)
+        finally:
+            with self.cond:
+                self.active -= 1
+                self.cond.notify_all()
+
+    def _timer(self):
+        while True:
+            with self.cond:
+                while len(self.tasks) < 1:
+                    self.cond.wait()
+                due = self.tasks[0][0] - time.monotonic()
+                if due > 0:
+                    self.cond.wait(due)
+                    continue
+                due, seq, func, kwargs = heapq.heappop(self.tasks)
+            self.executor.submit(self._run, func, kwargs)
+
+    def join(self, timeout=None):
+        '''
+        Wait until all scheduled tasks, including their retries, are done
+
+        :param float timeout: max. seconds to wait, None waits forever
+        :return: all tasks done
+        :rtype: bool
+        :raises ValueError: N/A
+        :raises TypeError: N/A    
+        '''
+        with self.cond:
+            return self.cond.wait_for(lambda: self.active < 1, timeout)
+
+
 def getCryptoKeyFile():
     '''
     Get fully qualified file name to support encryption / decryption functions
@@ -861,6 +1362,26 @@ def getCryptoKeyFile():
     return sCryptoKeyFileName
 
 
+def getCrypto():
+    '''
+    Import AES and padding from Cryptodome or Crypto on first use
+
+    :return: AES, pad, unpad
+    :rtype: tuple
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    try:
+        # Cryptodome
+        from Cryptodome.Cipher import AES
+        from Cryptodome.Util.Padding import pad, unpad
+    except ImportError:
+        # Crypto ?
+        from Crypto.Cipher import AES
+        from Crypto.Util.Padding import pad, unpad
+    return AES, pad, unpad
+
+
 def encrypt(data, sKeyFileName=""):
     '''
     Symmetrically encrypt data 
@@ -879,7 +1400,8 @@ def encrypt(data, sKeyFileName=""):
     else:
         sCryptoKeyFile = sKeyFileName
 
-    key = getCryptoKey(sCryptoKeyFile)
+    key = getSecretStore().getKey(sKeyFileName=sCryptoKeyFile)
+    AES, pad, unpad = getCrypto()
     # cipher = AES.new(key.encode(), AES.MODE_CBC)
     cipher = AES.new(key, AES.MODE_CBC)
     value = b64encode(cipher.iv).decode('utf-8') + b64encode(
@@ -893,7 +1415,7 @@ def encrypt(data, sKeyFileName=""):
 
 def decrypt(data, sKeyFileName=""):
     '''
-    Symmetrically decrypt data 
+    Symmetrically decrypt data, each value is decrypted once per process
 
     :param str data: The data to symmetrically decrypt
     :param str sKeyFileName: file that contains the encryption key, if empty: use default base of 'sCryptoKeyFileName'
@@ -902,7 +1424,25 @@ def decrypt(data, sKeyFileName=""):
     :raises ValueError: N/A
     :raises TypeError: N/A    
     '''
+    if len(sKeyFileName) < 1:
+        sCryptoKeyFile = getCryptoKeyFile()
+    else:
+        sCryptoKeyFile = sKeyFileName
+
+    return getSecretStore().decrypt(data=data, sKeyFileName=sCryptoKeyFile)
+
+
+def decryptData(data, key):
+    '''
+    Symmetrically decrypt data with a given key
 
+    :param str data: The data to symmetrically decrypt
+    :param bytes key: encryption key
+    :return: decrypted data 
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
     if "ENC[" in data:
         start = data.find('ENC[') + 4
         end = data.find(']', start)
@@ -910,12 +1450,7 @@ def decrypt(data, sKeyFileName=""):
     else:
         sPwd = data
 
-    if len(sKeyFileName) < 1:
-        sCryptoKeyFile = getCryptoKeyFile()
-    else:
-        sCryptoKeyFile = sKeyFileName
-
-    key = getCryptoKey(sCryptoKeyFile)
+    AES, pad, unpad = getCrypto()
     cipher = AES.new(key, AES.MODE_CBC, b64decode(sPwd[0:int(sPwd[-2:]):1]))
     value = unpad(cipher.decrypt(b64decode(sPwd[int(sPwd[-2:]):len(sPwd):1])),
                   AES.block_size).decode('utf-8')
@@ -955,6 +1490,109 @@ def getCryptoKey(sKeyFileName):
     return value
 
 
+class SecretStore:
+    '''
+    Keep crypto keys and decrypted values in memory
+
+    The key file is read once and checked for changes at most every
+    interval seconds. Decrypted values are held as bytearrays and zeroed
+    when the key changes or the store is cleared.
+    '''
+
+    def __init__(self, interval=5):
+        self.interval = interval
+        self.keys = {}
+        self.secrets = {}
+        self.lock = threading.Lock()
+
+    def _stat(self, file):
+        try:
+            info = os.stat(file)
+        except OSError:
+            return None
+        return (info.st_ino, info.st_mtime_ns, info.st_size)
+
+    def _zero(self, file=None):
+        for key in [key for key in self.secrets if file in (None, key[0])]:
+            secret = self.secrets.pop(key)[1]
+            secret[:] = bytes(len(secret))
+
+    def getKey(self, sKeyFileName):
+        '''
+        Get symmetric crypto key, read from file on first use or change
+
+        :param str sKeyFileName: file that contains the encryption key
+        :return: key
+        :rtype: bytes
+        '''
+        with self.lock:
+            entry = self.keys.get(sKeyFileName)
+            now = time.monotonic()
+            if entry is not None and entry["checked"] + self.interval > now:
+                return entry["key"]
+            stat = self._stat(sKeyFileName)
+            if entry is not None and stat == entry["stat"]:
+                entry["checked"] = now
+                return entry["key"]
+
+            if entry is not None:
+                logger.info('Script: Crypto File Changed: "%s"', sKeyFileName)
+            self._zero(file=sKeyFileName)
+            key = getCryptoKey(sKeyFileName)
+            self.keys[sKeyFileName] = {
+                "key": key,
+                "stat": self._stat(sKeyFileName),
+                "checked": now
+            }
+            return key
+
+    def decrypt(self, data, sKeyFileName):
+        '''
+        Decrypt a value, cached per key file and encrypted value
+
+        :param str data: The data to symmetrically decrypt
+        :param str sKeyFileName: file that contains the encryption key
+        :return: decrypted data
+        :rtype: str
+        '''
+        key = self.getKey(sKeyFileName=sKeyFileName)
+        with self.lock:
+            entry = self.secrets.get((sKeyFileName, data))
+            if entry is not None and entry[0] == key:
+                return entry[1].decode('utf-8')
+
+        value = decryptData(data=data, key=key)
+        with self.lock:
+            self.secrets[(sKeyFileName, data)] = (key,
+                                                  bytearray(value, 'utf-8'))
+        return value
+
+    def clear(self):
+        '''
+        Zero and drop all keys and decrypted values
+        '''
+        with self.lock:
+            self._zero()
+            self.keys.clear()
+
+
+def getSecretStore():
+    '''
+    Get shared secret store
+
+    :return: secret store
+    :rtype: SecretStore
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    global secretStore
+    if secretStore is None:
+        with secretStoreLock:
+            if secretStore is None:
+                secretStore = SecretStore()
+    return secretStore
+
+
 def encryptPwd(data, sKeyFileName=""):
     '''
     Symmetrically encrypt password 
@@ -1016,6 +1654,7 @@ def convertCsv2Panda(data, keepDuplicate=False):
     :raises ValueError: N/A
     :raises TypeError: N/A    
     '''
+    import pandas as pd
     df = pd.read_csv(StringIO(data))
     df = df.drop_duplicates(keep=keepDuplicate)
     return df
@@ -1031,6 +1670,7 @@ def convertJson2Panda(data, keepDuplicate=False):
     :raises ValueError: N/A
     :raises TypeError: N/A    
     '''
+    import pandas as pd
     df = pd.read_json(StringIO(data), orient='records')
     df = df.drop_duplicates(keep=keepDuplicate)
     return df
@@ -1042,6 +1682,219 @@ def convertJson2Csv(data):
     return csvData
 
 
+# pandas read_csv defaults: missing values, booleans and numbers
+csvNaValues = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null"
+])
+csvBoolValues = {
+    "True": True,
+    "TRUE": True,
+    "true": True,
+    "False": False,
+    "FALSE": False,
+    "false": False
+}
+csvIntPattern = re.compile(r"\s*[+-]?\d+\s*")
+csvFloatPattern = re.compile(
+    r"\s*[+-]?((\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|inf|infinity)\s*",
+    re.IGNORECASE)
+
+
+def getCsvValueType(value):
+    '''
+    Type of one csv field: na, bool, int, float or str
+
+    :param str value: csv field
+    :return: type
+    :rtype: str
+    '''
+    if value in csvNaValues:
+        return "na"
+    if value in csvBoolValues:
+        return "bool"
+    if csvIntPattern.fullmatch(value):
+        return "int"
+    if csvFloatPattern.fullmatch(value):
+        return "float"
+    return "str"
+
+
+def getCsvColumnType(types):
+    '''
+    Type of a csv column as inferred by panda read_csv
+
+    :param set types: field types of the column, see getCsvValueType
+    :return: int, float, bool or str
+    :rtype: str
+    '''
+    if types == {"int"}:
+        return "int"
+    # missing values turn an int column into float
+    if types <= {"int", "float", "na"}:
+        return "float"
+    if types <= {"bool", "na"}:
+        return "bool"
+    # mixed column, fields are kept as text
+    return "str"
+
+
+def convertCsvValue(value, replaceEmpty=False, dtype=None):
+    '''
+    Convert one csv field like panda read_csv / to_json
+
+    :param str value: csv field
+    :param boolean replaceEmpty: replace missing value with default value
+    :param str dtype: column type of getCsvColumnType, None uses the field type
+    :return: value
+    :rtype: int, float, bool, str or None
+    '''
+    if dtype is None:
+        dtype = getCsvColumnType({getCsvValueType(value)})
+    if value in csvNaValues:
+        if replaceEmpty:
+            return "Not Defined"
+        return None
+    if dtype == "int":
+        return int(value)
+    if dtype == "float":
+        number = float(value)
+        # nan and inf are not valid json, panda writes null
+        if math.isfinite(number):
+            return number
+        return None
+    if dtype == "bool":
+        return csvBoolValues[value]
+    return value
+
+
+def getCsvRowDigest(row):
+    '''
+    Fixed size digest of a converted csv row, used for duplicate detection
+
+    :param list row: converted csv fields
+    :return: digest
+    :rtype: bytes
+    '''
+    return hashlib.blake2b("\x1f".join(map(repr, row)).encode("utf-8"),
+                           digest_size=16).digest()
+
+
+def iterCsvRows(file, dtypes=None, replaceEmpty=False):
+    '''
+    Read csv rows, converted if the column types are given
+
+    :param str file: csv file name, fully qualified
+    :param list dtypes: column types, None returns the fields as text
+    :param boolean replaceEmpty: replace missing value with default value
+    :return: generator of the header, then one list per row
+    :rtype: generator
+    '''
+    with open(file, newline="", encoding="utf-8") as csvFile:
+        reader = csv.reader(csvFile)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        for row in reader:
+            if dtypes is not None:
+                row = [
+                    convertCsvValue(value,
+                                    replaceEmpty=replaceEmpty,
+                                    dtype=dtype)
+                    for value, dtype in zip(row, dtypes)
+                ]
+            yield row
+
+
+def iterCsvFile(file, keepDuplicate=False, replaceEmpty=False, batchSize=1000):
+    '''
+    Read a csv file in batches of typed records, without loading the file
+
+    Records match panda read_csv / drop_duplicates / to_json: a first pass
+    infers the column types, so a column with one text field keeps all its
+    fields as text and missing values turn an int column into float.
+    Duplicates are compared after the conversion. "first" needs one more
+    pass, "last" and False count row digests in a second pass. Memory is
+    bounded by one batch plus the digest index, about 150 bytes per
+    distinct row.
+
+    :param str file: csv file name, fully qualified
+    :param str keepDuplicate: "first", "last" or False to drop all duplicates
+    :param boolean replaceEmpty: replace missing value with default value
+    :param int batchSize: records per batch
+    :return: generator of record lists
+    :rtype: generator
+    :raises ValueError: unknown keepDuplicate
+    :raises TypeError: N/A
+    '''
+    if keepDuplicate not in ("first", "last", False):
+        raise ValueError("keepDuplicate must be 'first', 'last' or False")
+
+    # column types of all rows, like panda before drop_duplicates
+    reader = iterCsvRows(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    types = [set() for key in header]
+    for row in reader:
+        for i, value in enumerate(row[:len(types)]):
+            types[i].add(getCsvValueType(value))
+    dtypes = [getCsvColumnType(columnTypes) for columnTypes in types]
+
+    # digest to index of the last occurrence, -1 once a row repeats
+    # if all duplicates are dropped
+    rows = {}
+    if keepDuplicate != "first":
+        reader = iterCsvRows(file, dtypes=dtypes, replaceEmpty=replaceEmpty)
+        next(reader)
+        for index, row in enumerate(reader):
+            digest = getCsvRowDigest(row)
+            if keepDuplicate is False and digest in rows:
+                index = -1
+            rows[digest] = index
+
+    seen = set()
+    reader = iterCsvRows(file, dtypes=dtypes, replaceEmpty=replaceEmpty)
+    next(reader)
+    batch = []
+    for index, row in enumerate(reader):
+        digest = getCsvRowDigest(row)
+        if keepDuplicate == "first":
+            if digest in seen:
+                continue
+            seen.add(digest)
+        elif rows[digest] != index:
+            continue
+        batch.append(dict(zip(header, row)))
+        if len(batch) >= batchSize:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def writeNdjsonFile(file, batches):
+    '''
+    Write record batches as newline delimited json, one record per line
+
+    :param str file: target file name, fully qualified
+    :param iterable batches: record lists, e.g. from iterCsvFile
+    :return: number of records
+    :rtype: int
+    :raises ValueError: N/A
+    :raises TypeError: N/A
+    '''
+    records = 0
+    with open(file, "w", encoding="utf-8") as ndjsonFile:
+        for batch in batches:
+            for record in batch:
+                ndjsonFile.write(json.dumps(record) + "\n")
+            records += len(batch)
+    return records
+
+
 def copyFile(srcFile, dstFile, override=False):
     '''
     Copy file from src to dst
@@ -1226,7 +2079,6 @@ def encryptPwds(file, data, sKeyFileName=""):
                 sCfgData[pItem]["jks_secure"] = securePwd
                 sCfgData[pItem]["jks_pwd"] = securePwd
 
-
         if _localDebug:
             logger.debug('Core: Security Function: "%s" ', "Encrypt")
             logger.debug('Core: Security Solution: "%s" ', pItem)
@@ -1397,21 +2249,49 @@ def getProjectConfig():
     '''
     Get Project Config 
 
+    The config file is read once per process, all callers share the
+    same read only content, copy.deepcopy() gives a mutable copy
+
     :param:
     :return: project config
-    :rtype: dict
+    :rtype: LockedDict
     :raises ValueError: N/A
     :raises TypeError: N/A    
     '''
+    return getConfig().data
+
+
+def getProjectConfigFileName():
+    '''
+    Get Project Config file name, ~/.w3rkstatt/configs/<hostname>.json
 
+    :param:
+    :return: config file name, fully qualified
+    :rtype: str
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
     sHomeFolder = getHomeFolder()
     coreProjectFolder = os.path.join(sHomeFolder, ".w3rkstatt")
     coreProjecConfigFolder = os.path.join(coreProjectFolder, "configs")
 
     # Get Custom Config File & Content
     sConfigFileName = sHostname + ".json"
-    sProjectConfigFileName = os.path.join(coreProjecConfigFolder,
-                                          sConfigFileName)
+    return os.path.join(coreProjecConfigFolder, sConfigFileName)
+
+
+def loadProjectConfig():
+    '''
+    Read Project Config from disk
+
+    :param:
+    :return: project config
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+
+    sProjectConfigFileName = getProjectConfigFileName()
     sCfgFilesConfigFileStatus = getFileStatus(sProjectConfigFileName)
 
     if sCfgFilesConfigFileStatus:
@@ -1422,12 +2302,589 @@ def getProjectConfig():
     return sCfgFileContent
 
 
+def freezeJson(data):
+    '''
+    Read only copy of json content
+
+    :param dict data: json content
+    :return: dicts as mapping proxies, lists as tuples
+    :rtype: mappingproxy
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    if isinstance(data, dict):
+        return types.MappingProxyType({
+            key: freezeJson(value)
+            for key, value in data.items()
+        })
+    if isinstance(data, list):
+        return tuple(freezeJson(value) for value in data)
+    return data
+
+
+def _readOnlyJson(self, *args, **kwargs):
+    raise TypeError("'" + type(self).__name__ +
+                    "' object is read only, use copy.deepcopy()")
+
+
+def thawJson(data):
+    '''
+    Mutable copy of json content
+
+    :param dict data: json content, e.g. from lockJson
+    :return: dicts and lists
+    :rtype: dict
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    if isinstance(data, dict):
+        return {key: thawJson(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [thawJson(value) for value in data]
+    return data
+
+
+class LockedDict(dict):
+    '''
+    Read only dict of lockJson, still a dict for jsonPath, json.dumps and
+    isinstance checks
+    '''
+    __setitem__ = __delitem__ = __ior__ = _readOnlyJson
+    clear = pop = popitem = setdefault = update = _readOnlyJson
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thawJson(self)
+
+    def __reduce__(self):
+        return (type(self), (dict(self), ))
+
+
+class LockedList(list):
+    '''
+    Read only list of lockJson
+    '''
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readOnlyJson
+    append = extend = insert = remove = pop = clear = _readOnlyJson
+    sort = reverse = _readOnlyJson
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thawJson(self)
+
+    def __reduce__(self):
+        return (type(self), (list(self), ))
+
+
+def lockJson(data):
+    '''
+    Read only copy of json content that keeps the dict and list types
+
+    :param dict data: json content
+    :return: LockedDict and LockedList content
+    :rtype: LockedDict
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    if isinstance(data, dict):
+        return LockedDict(
+            (key, lockJson(value)) for key, value in data.items())
+    if isinstance(data, (list, tuple)):
+        return LockedList(lockJson(value) for value in data)
+    return data
+
+
+@dataclass(frozen=True)
+class ConfigSection:
+    '''
+    Read only view of one project config section
+
+    Common keys are typed attributes, everything else is available
+    through get()
+    '''
+    name: str
+    data: types.MappingProxyType
+    host: str = ""
+    port: str = ""
+    ssl: bool = False
+    ssl_verification: bool = False
+    user: str = ""
+    pwd: str = ""
+    demo: bool = False
+    debug: bool = False
+    url: str = ""
+
+    @classmethod
+    def fromJson(cls, name, data, **derived):
+        '''
+        Build a section from raw json content
+
+        :param str name: section name, e.g. CTM
+        :param dict data: project config
+        :param derived: precomputed values
+        :return: config section
+        :rtype: ConfigSection
+        '''
+        section = data.get(name, {})
+        if not isinstance(section, dict):
+            section = {}
+        values = {}
+        for key in cls.__dataclass_fields__:
+            if key in ("name", "data") or key in derived:
+                continue
+            # same as getJsonValue, missing keys are ""
+            values[key] = section.get(key, "")
+        values.update(derived)
+        return cls(name=name, data=freezeJson(section), **values)
+
+    def get(self, path, default=""):
+        '''
+        Get a nested value, e.g. section.get("alerts.store.mode")
+
+        :param str path: dot separated keys below the section
+        :param default: value if the key does not exist
+        :return: content
+        :rtype: str
+        '''
+        value = getJsonPathValue(keys=tuple(path.split(".")), data=self.data)
+        if value is _jsonPathMissing:
+            value = default
+        return value
+
+
+@dataclass(frozen=True)
+class DefaultConfig(ConfigSection):
+    loglevel: str = ""
+    env_name: str = ""
+    crypto_file: str = ""
+    config_file: str = ""
+    config_folder: str = ""
+    log_file: str = ""
+    log_folder: str = ""
+    data_folder: str = ""
+    template_folder: str = ""
+
+
+@dataclass(frozen=True)
+class CtmConfig(ConfigSection):
+    aapi: str = ""
+    server: str = ""
+    datacenters: types.MappingProxyType = field(
+        default_factory=lambda: types.MappingProxyType({}))
+
+
+@dataclass(frozen=True)
+class ItsmConfig(ConfigSection):
+    api_namespace: str = ""
+    api_version: str = ""
+    mappings_file: str = ""
+    jwt: str = ""
+
+
+@dataclass(frozen=True)
+class BhomConfig(ConfigSection):
+    api_version: str = ""
+    api_namespace: str = ""
+    api_key: str = ""
+    api_secret: str = ""
+    tenant: str = ""
+    ssl_ignore: bool = False
+    url_ims: str = ""
+    url_event: str = ""
+
+
+@dataclass(frozen=True)
+class TsimConfig(ConfigSection):
+    cell: str = ""
+    routing: str = ""
+    tenant: str = ""
+    ssl_ignore: bool = False
+
+
+@dataclass(frozen=True)
+class SnowConfig(ConfigSection):
+    api_namespace: str = ""
+    api_version: str = ""
+
+
+@dataclass(frozen=True)
+class MailConfig(ConfigSection):
+    display: str = ""
+    template: str = ""
+
+
+@dataclass(frozen=True)
+class CtmBridgeConfig(ConfigSection):
+    html: str = ""
+    api: str = ""
+    tso_process: str = ""
+
+
+@dataclass(frozen=True)
+class ProjectConfig:
+    '''
+    Read only project config, loaded once per process by getConfig()
+    '''
+    data: LockedDict
+    default: DefaultConfig
+    ctm: CtmConfig
+    itsm: ItsmConfig
+    bhom: BhomConfig
+    tsim: TsimConfig
+    tso: ConfigSection
+    snow: SnowConfig
+    mail: MailConfig
+    ctm_bridge: CtmBridgeConfig
+
+    @classmethod
+    def fromJson(cls, data):
+        '''
+        Build the project config and its derived values
+
+        :param dict data: project config
+        :return: project config
+        :rtype: ProjectConfig
+        '''
+        ctm = getJsonValue(path="$.CTM", data=data)
+        if not isinstance(ctm, dict):
+            ctm = {}
+        ctm_host = str(ctm.get("host", ""))
+        ctm_url = "https://" + ctm_host + ":" + str(ctm.get("port", "")) + str(
+            ctm.get("aapi", "")) + "/"
+
+        # data center name -> host, first entry wins like the jsonPath filter
+        datacenters = {}
+        lDataCenters = ctm.get("datacenter", [])
+        if not isinstance(lDataCenters, list):
+            lDataCenters = []
+        for datacenter in lDataCenters:
+            if isinstance(datacenter, dict) and "name" in datacenter:
+                datacenters.setdefault(str(datacenter["name"]),
+                                       datacenter.get("host", ""))
+
+        itsm = getJsonValue(path="$.ITSM", data=data)
+        if not isinstance(itsm, dict):
+            itsm = {}
+        if itsm.get("ssl", ""):
+            itsm_protocol = "https://"
+        else:
+            itsm_protocol = "http://"
+        itsm_base = itsm_protocol + str(itsm.get("host", "")) + ":" + str(
+            itsm.get("port", "")) + "/api"
+        itsm_url = itsm_base + "/" + str(itsm.get(
+            "api_namespace", "")) + "/" + str(itsm.get("api_version", ""))
+
+        bhom_host = str(getJsonValue(path="$.BHOM.host", data=data))
+
+        tso = getJsonValue(path="$.TSO", data=data)
+        if not isinstance(tso, dict):
+            tso = {}
+        tso_ssl = tso.get("ssl", "")
+        tso_port = str(tso.get("port", ""))
+        if tso_ssl:
+            tso_protocol = "https://"
+        else:
+            tso_protocol = "http://"
+        if (tso_port == "443") and (tso_ssl == True):
+            tso_url = tso_protocol + str(tso.get("host", "")) + "/baocdp"
+        else:
+            tso_url = tso_protocol + str(tso.get(
+                "host", "")) + ":" + tso_port + "/baocdp"
+
+        snow = getJsonValue(path="$.SNOW", data=data)
+        if not isinstance(snow, dict):
+            snow = {}
+        if snow.get("ssl", ""):
+            snow_protocol = "https://"
+        else:
+            snow_protocol = "http://"
+        snow_url = snow_protocol + str(snow.get("host", "")) + ":" + str(
+            snow.get("port", "")) + "/api"
+
+        return cls(data=lockJson(data),
+                   default=DefaultConfig.fromJson("DEFAULT", data),
+                   ctm=CtmConfig.fromJson(
+                       "CTM",
+                       data,
+                       url=ctm_url,
+                       server=getHostFromFQDN(ctm_host),
+                       datacenters=types.MappingProxyType(datacenters)),
+                   itsm=ItsmConfig.fromJson("ITSM",
+                                            data,
+                                            url=itsm_url,
+                                            jwt=itsm_base + "/jwt"),
+                   bhom=BhomConfig.fromJson("BHOM",
+                                            data,
+                                            url_ims="https://" + bhom_host +
+                                            "/ims/api/v1/",
+                                            url_event="https://" + bhom_host +
+                                            "/events-service/api/v1.0/"),
+                   tsim=TsimConfig.fromJson("TSIM", data),
+                   tso=ConfigSection.fromJson("TSO", data, url=tso_url),
+                   snow=SnowConfig.fromJson("SNOW", data, url=snow_url),
+                   mail=MailConfig.fromJson("MAIL", data),
+                   ctm_bridge=CtmBridgeConfig.fromJson("CTM_BRIDGE", data))
+
+
+def getConfig():
+    '''
+    Get shared project config, read from disk on first use
+
+    :param:
+    :return: project config
+    :rtype: ProjectConfig
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    global projectConfig
+    if projectConfig is None:
+        with projectConfigLock:
+            if projectConfig is None:
+                projectConfig = ProjectConfig.fromJson(loadProjectConfig())
+    return projectConfig
+
+
+def onConfigReload(callback):
+    '''
+    Register a function called with the new ProjectConfig after a reload
+
+    Modules use it to refresh values derived from the config at import
+
+    :param function callback: callback(cfg)
+    :return: callback
+    :rtype: function
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    configReloadHooks.append(callback)
+    return callback
+
+
+def validateConfig(data):
+    '''
+    Check project config content before it replaces the current one
+
+    :param dict data: project config
+    :return: list of problems, empty if valid
+    :rtype: list
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    problems = []
+    if not isinstance(data, dict) or not data:
+        return ["config is empty or not a json object"]
+    for section in ("DEFAULT", "CTM"):
+        if not isinstance(data.get(section), dict):
+            problems.append("section " + section + " is missing")
+    debug = getJsonValue(path="$.DEFAULT.debug", data=data)
+    if not isinstance(debug, dict):
+        problems.append("section DEFAULT.debug is missing")
+    datacenters = getJsonValue(path="$.CTM.datacenter", data=data)
+    if datacenters != "" and not isinstance(datacenters, list):
+        problems.append("CTM.datacenter is not a list")
+    return problems
+
+
+def reloadConfig():
+    '''
+    Read the project config again and swap it in
+
+    The new config is validated and fully built before it replaces the
+    current one, an invalid file keeps the current config. Registered
+    reload hooks run afterwards.
+
+    :param:
+    :return: True if the new config is active
+    :rtype: bool
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    global projectConfig, hostResolver
+    try:
+        jData = loadProjectConfig()
+        problems = validateConfig(data=jData)
+        if problems:
+            logger.error('Config Reload: Rejected "%s"', "; ".join(problems))
+            return False
+        cfg = ProjectConfig.fromJson(jData)
+    except Exception as e:
+        logger.error('Config Reload: Rejected "%s"', e)
+        return False
+
+    with projectConfigLock:
+        projectConfig = cfg
+    getJsonPath.cache_clear()
+    hostResolver = None
+    if secretStore is not None:
+        secretStore.clear()
+    logger.info('Config Reload: Active')
+
+    for callback in list(configReloadHooks):
+        try:
+            callback(cfg)
+        except Exception as e:
+            logger.error('Config Reload: Hook "%s" failed: %s',
+                         getattr(callback, "__module__", ""), e)
+    return True
+
+
+class FileWatcher:
+    '''
+    Poll files for changes and call back on modification
+
+    Files are compared by mtime and size every interval seconds, a
+    change is reported once the file is stable for one interval, so a
+    half written file is not picked up.
+    '''
+
+    def __init__(self, interval=5):
+        self.interval = interval
+        self.files = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _stat(self, file):
+        try:
+            info = os.stat(file)
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    def watch(self, file, callback):
+        '''
+        Add a file, callback(file) runs after each change
+
+        :param str file: file name, fully qualified
+        :param function callback: callback(file)
+        '''
+        with self.lock:
+            self.files[file] = {
+                "stat": self._stat(file),
+                "pending": None,
+                "callback": callback
+            }
+
+    def unwatch(self, file):
+        with self.lock:
+            self.files.pop(file, None)
+
+    def check(self):
+        '''
+        Compare all files once and run callbacks for changed files
+
+        :return: changed files
+        :rtype: list
+        '''
+        changed = []
+        with self.lock:
+            items = list(self.files.items())
+        for file, entry in items:
+            stat = self._stat(file)
+            if stat == entry["stat"]:
+                entry["pending"] = None
+                continue
+            if stat is None or stat != entry["pending"]:
+                # wait one more interval until the writer is done
+                entry["pending"] = stat
+                continue
+            entry["stat"] = stat
+            entry["pending"] = None
+            changed.append(file)
+            logger.info('File Watcher: Changed "%s"', file)
+            try:
+                entry["callback"](file)
+            except Exception as e:
+                logger.error('File Watcher: Callback for "%s" failed: %s',
+                             file, e)
+        return changed
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run,
+                                           name="w3rkstatt-watcher",
+                                           daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+
+
+def getFileWatcher():
+    '''
+    Get shared file watcher, the project config file is always watched
+
+    :param:
+    :return: file watcher
+    :rtype: FileWatcher
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    global fileWatcher
+    if fileWatcher is None:
+        interval = getConfig().default.get("reload.interval")
+        if not interval:
+            interval = 5
+        watcher = FileWatcher(interval=interval)
+        watcher.watch(file=getProjectConfigFileName(),
+                      callback=lambda file: reloadConfig())
+        fileWatcher = watcher
+    return fileWatcher
+
+
+def watchFile(file, callback):
+    '''
+    Reload a file derived from the project config when it changes
+
+    :param str file: file name, fully qualified
+    :param function callback: callback(file)
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    getFileWatcher().watch(file=file, callback=callback)
+
+
+def watchConfig():
+    '''
+    Start watching the project config for long running processes,
+    enabled by DEFAULT.reload.enabled
+
+    :param:
+    :return: file watcher or None if disabled
+    :rtype: FileWatcher
+    :raises ValueError: N/A
+    :raises TypeError: N/A    
+    '''
+    if not getConfig().default.get("reload.enabled"):
+        return None
+    return getFileWatcher().start()
+
+
 # Create a custom logger
 pFolder = getProjectFolder()
 hFolder = getHomeFolder()
 sHostname = str(getHostName()).lower()
 sPlatform = platform.system()
 sUuid = str(uuid.uuid4())
+projectConfig = None
+projectConfigLock = threading.Lock()
+configReloadHooks = []
+fileWatcher = None
+hostResolver = None
+secretStore = None
+secretStoreLock = threading.Lock()
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":